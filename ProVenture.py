@@ -18,7 +18,13 @@ Run: python ProVenture_REVISED.py
 Requires: pygame, Pillow
 """
 
-import pygame, sys, os, json, time, random, math
+import pygame, sys, os, json, time, random, math, sqlite3, struct, zlib, argparse, functools
+import hashlib, hmac, base64, threading, queue, csv, shutil, atexit, heapq, mmap, itertools, cProfile, pstats
+import gc, tracemalloc, weakref, ctypes
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from array import array
+from io import BytesIO
 from pathlib import Path
 from copy import deepcopy
 from PIL import Image, ImageSequence
@@ -36,9 +42,28 @@ INFO_COLOR = (200, 200, 200)
 HUD_MSG_COLOR = (255, 255, 200)
 USERS_FILE = "users.json"
 
+# Save storage
+SAVE_MODE = "json"  # "json" = one users.json per game process, "shared" = SQLite store several processes can use at once
+SHARED_USERS_FILE = "users.db"
+SHARED_SAVE_JOURNAL = "WAL"  # Use "DELETE" when users.db lives on a network drive (WAL needs local shared memory)
+SHARED_SAVE_TIMEOUT = 10.0  # Seconds to wait for another process's write to finish
+SAVE_COMPRESSION = "zlib"  # Binary saves (USERS_FILE ending in .pvs): "none", "zlib" or "lzma"
+SAVE_FSYNC = "batched"  # "none", "batched" (flush to disk at most every SAVE_FSYNC_INTERVAL seconds) or "always"
+SAVE_FSYNC_INTERVAL = 2.0
+SAVE_BACKUPS = 3  # Older generations kept as users.json.1 (newest) .. users.json.3
+SAVE_BACKUP_INTERVAL = 600  # Seconds between generations; the first save of each session always makes one
+
+# Passwords (hashed on a background thread, plaintext saves are upgraded on next login)
+PASSWORD_KDF = "pbkdf2_sha256"  # "pbkdf2_sha256" or "scrypt"
+PBKDF2_ITERATIONS = 600000
+PROVISION_PBKDF2_ITERATIONS = 10000  # accounts import --quick-hash only; raised to PBKDF2_ITERATIONS at first login
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 15, 8, 1
+ARCHIVE_FILE = "users_archive.json"
+
 # Game constants
 TILE = 40
 ROWS, COLS = 15, 20
+CHUNK_TILES = 8  # Mazes are drawn from cached CHUNK_TILES x CHUNK_TILES blocks of tiles
 PLAYER_RADIUS = TILE // 3
 MAZES_COUNT = 4
 
@@ -68,6 +93,33 @@ QUIZ_EASY_ITEMS = {"wood": (1, 2), "rope": (0, 1), "metal": (0, 1), "sail": (0,
 QUIZ_AVERAGE_ITEMS = {"wood": (2, 3), "rope": (1, 2), "metal": (1, 1), "sail": (0, 1), "points": (75, 125)}
 QUIZ_DIFFICULT_ITEMS = {"wood": (3, 4), "rope": (2, 3), "metal": (1, 2), "sail": (1, 2), "points": (150, 200)}
 
+# Question bank (.json is read whole, .db is an SQLite bank read a page at a time,
+# .pqp is a compiled question pack memory-mapped from disk)
+QUESTION_BANK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "questions.json")
+QUESTION_PAGE_SIZE = 256
+QUESTION_PAGE_CACHE = 64  # Pages of question text kept in memory
+BOSS_QUESTION_COUNT = 30
+MAX_CHOICES = 6  # Largest question the pack compiler accepts; bounds the permutation tables
+
+# Adaptive questions: fresh quizzes move up a difficulty once the player answers this share right
+DIFFICULTY_ORDER = ("easy", "average", "difficult")
+ADAPTIVE_TARGET_ACCURACY = 0.75
+REVIEW_BASE_INTERVAL = 3600  # Seconds before a correctly answered question is due again; doubles per streak
+REVIEW_MAX_BOX = 6
+LATENCY_SMOOTHING = 0.3
+
+# Quiz telemetry: answer events are buffered in memory and appended to this file in batches
+TELEMETRY_FILE = "quiz_events.jsonl"
+TELEMETRY_CAPACITY = 4096
+TELEMETRY_FLUSH_INTERVAL = 5.0
+
+# Frame-time recordings (python ProVenture.py --record-frames)
+FRAME_RECORD_FILE = "frame_times.json"
+PROFILE_DIR = "profiles"  # python ProVenture.py --profile writes one .pstats file per scene here
+SCENE_TEST_USER = "scene_test"  # Throwaway account for --scene, removed again on exit
+MEMORY_LOG_FILE = "memory_log.jsonl"  # python ProVenture.py --memory logs every scene change here
+MEMORY_BUDGET_MB = 1024  # Warn when the game gets bigger than this (school laptops have 4 GB)
+
 # Crafting
 SHIP_CRAFT_REQUIREMENTS = {"wood": 8, "rope": 5, "metal": 4, "sail": 2}
 
@@ -105,16 +157,140 @@ CHARACTERS = {
 # Settings
 SETTINGS = {
     "volume": 0.5,
-    "muted": False
+    "muted": False,
+    "fullscreen": False,
+    "smooth_scaling": True  # Off: nearest-neighbour window scaling, cheaper on machines without a GPU
+}
+
+# Music: scene -> file in resources/sounds
+MUSIC_TRACKS = {
+    "login": "loginsound.mp3",
+    "story": "STORY.MP3",
+    "menu": "intro.mp3",
+    "game": "INGAME_SOUND.mp3",
+    "boss": "boss_music.mp3",
+    "victory": "Credit.MP3",
+    "credits": "Credit.MP3"
+}
+MUSIC_FADE_MS = 800  # Scene track change: the old track fades out over half, then the new one fades in
+
+# Sound effects: name -> (file in resources/sounds/sfx, priority, volume share, tone used when the file is missing)
+# A tone is (waveform, start Hz, end Hz, seconds). Higher priorities may cut off lower ones when all channels are busy.
+SFX = {
+    "swing": ("swing.wav", 1, 0.35, ("noise", 900, 300, 0.07)),
+    "hit": ("hit.wav", 2, 0.6, ("square", 220, 110, 0.08)),
+    "crit": ("crit.wav", 3, 0.7, ("square", 660, 330, 0.15)),
+    "enemy_death": ("enemy_death.wav", 3, 0.6, ("noise", 400, 60, 0.3)),
+    "player_hurt": ("player_hurt.wav", 4, 0.7, ("square", 160, 70, 0.2)),
+    "door": ("door.wav", 4, 0.6, ("sine", 300, 600, 0.25)),
+    "correct": ("correct.wav", 5, 0.7, ("sine", 660, 990, 0.25)),
+    "wrong": ("wrong.wav", 5, 0.7, ("square", 200, 140, 0.3))
 }
+SFX_CHANNELS = 6  # Mixer channels reserved for effects
+SFX_MIN_INTERVAL = 0.05  # Seconds before the same effect may start again
+
+# ------------------- COMMAND LINE -------------------
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="ProVenture", description="Educational maze adventure. Run without a command to play.")
+    parser.add_argument("--fullscreen", action="store_true", help="start in fullscreen")
+    parser.add_argument("--pixelated", action="store_true", help="scale the picture with nearest-neighbour (faster on weak machines)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR",
+                        help=f"profile each scene with cProfile and write DIR/<scene>.pstats on exit (default: {PROFILE_DIR})")
+    parser.add_argument("--scene", choices=["game_screen", "boss_fight_screen"],
+                        help=f"skip login and the menus and start this scene as a throwaway '{SCENE_TEST_USER}' account")
+    parser.add_argument("--memory", nargs="?", const=MEMORY_LOG_FILE, metavar="FILE",
+                        help=f"log Python heap, surface memory by asset and scene, and resident memory at every scene change (default file: {MEMORY_LOG_FILE})")
+    parser.add_argument("--record-frames", nargs="?", const=FRAME_RECORD_FILE, metavar="FILE",
+                        help=f"record every frame's time and write per-scene percentiles on exit (default file: {FRAME_RECORD_FILE})")
+    commands = parser.add_subparsers(dest="command")
+
+    convert = commands.add_parser("convert-save", help="convert a save file between JSON (.json) and binary (.pvs)")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    convert.add_argument("--compression", choices=["none", "zlib", "lzma"], default=None,
+                         help=f"compression for binary targets (default: {SAVE_COMPRESSION})")
+
+    accounts = commands.add_parser("accounts", help="bulk classroom account tools")
+    actions = accounts.add_subparsers(dest="action", required=True)
+    imp = actions.add_parser("import", help="create or update accounts from a CSV with username,password,character columns")
+    imp.add_argument("csv")
+    imp.add_argument("--reset-progress", action="store_true", help="also start existing accounts on a new game")
+    imp.add_argument("--quick-hash", action="store_true",
+                     help=f"hash at {PROVISION_PBKDF2_ITERATIONS} PBKDF2 iterations for a fast import; "
+                          "each account is upgraded to the full work factor at its first login")
+    exp = actions.add_parser("export", help="write all accounts and their progress to a CSV")
+    exp.add_argument("csv")
+    prune = actions.add_parser("prune", help="archive (or delete) accounts nobody has logged into for a while")
+    prune.add_argument("--inactive-days", type=float, required=True)
+    prune.add_argument("--delete", action="store_true", help="delete instead of moving them to the archive file")
+    prune.add_argument("--archive", default=ARCHIVE_FILE)
+    prune.add_argument("--dry-run", action="store_true")
+
+    question_db = commands.add_parser("question-db", help="build an SQLite question bank (.db) from JSON question files")
+    question_db.add_argument("sources", nargs="+")
+    question_db.add_argument("target")
+
+    pack = commands.add_parser("question-pack", help="validate JSON question files and compile them into a question pack (.pqp)")
+    pack.add_argument("sources", nargs="+")
+    pack.add_argument("target")
+
+    assets = commands.add_parser("build-assets", help="pre-resize images into resources/optimized for faster loading")
+    assets.add_argument("--force", action="store_true", help="rebuild everything, not just what changed")
+
+    commands.add_parser("asset-manifest", help="record the size and hash of every game asset in resources/manifest.json")
+
+    report = commands.add_parser("quiz-report", help="per-question difficulty and discrimination from logged quiz answers")
+    report.add_argument("--events", default=TELEMETRY_FILE)
+    report.add_argument("--csv", help="also write the table to this CSV file")
+
+    compare = commands.add_parser("compare-frames", help="compare two --record-frames recordings scene by scene")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--tolerance", type=float, default=0.10,
+                         help="fail when a scene's p95/p99 frame time or hitch rate grows by more than this share (default: 0.10)")
+    return parser
+
+# Only parse our own command line; importing the module gets the defaults and never exits
+ARGS = build_arg_parser().parse_args(sys.argv[1:]) if __name__ == "__main__" else build_arg_parser().parse_args([])
+if ARGS.command:
+    # Headless tools never open a window or an audio device
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
 
 # Colors & fonts
+pygame.mixer.pre_init(44100, -16, 2, 512)  # Small buffer so effects start within a frame
+# Real pixels on high-DPI Windows displays instead of a blurry bitmap-stretched window
+os.environ.setdefault("SDL_WINDOWS_DPI_AWARENESS", "permonitorv2")
 pygame.init()
 # Center window on screen
 os.environ['SDL_VIDEO_CENTERED'] = '1'
 pygame.display.set_caption("ProVenture")
-screen = pygame.display.set_mode((WIN_W, WIN_H))
-clock = pygame.time.Clock()
+SETTINGS["fullscreen"] = SETTINGS["fullscreen"] or ARGS.fullscreen
+SETTINGS["smooth_scaling"] = SETTINGS["smooth_scaling"] and not ARGS.pixelated
+
+def open_window():
+    """The game always draws to a WIN_W x WIN_H surface. SDL scales it to whatever size the
+    window or screen is (letterboxed, on the GPU where there is one) and maps mouse positions
+    back to those coordinates, so no screen needs to know the real resolution."""
+    if ARGS.command:
+        return pygame.display.set_mode((WIN_W, WIN_H))
+    # Read when the renderer is created, so it cannot change while the window is open
+    os.environ["SDL_RENDER_SCALE_QUALITY"] = "linear" if SETTINGS["smooth_scaling"] else "nearest"
+    flags = pygame.SCALED | pygame.RESIZABLE
+    if SETTINGS["fullscreen"]:
+        flags |= pygame.FULLSCREEN
+    return pygame.display.set_mode((WIN_W, WIN_H), flags)
+
+def toggle_fullscreen():
+    global screen
+    try:
+        pygame.display.toggle_fullscreen()
+    except pygame.error:
+        return  # Not supported by this video driver; start with --fullscreen instead
+    SETTINGS["fullscreen"] = not SETTINGS["fullscreen"]
+    screen = pygame.display.get_surface()
+
+screen = open_window()
 FONT = pygame.font.SysFont("consolas", 18)
 BIG = pygame.font.SysFont("consolas", 28)
 SMALL = pygame.font.SysFont("consolas", 14)
@@ -123,164 +299,1584 @@ HUGE = pygame.font.SysFont("consolas", 48)
 WHITE = (255, 255, 255)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# ------------------- Frame Recording -------------------
+FRAME_RECORD_CAPACITY = 1 << 20  # About 4.8 hours at 60 FPS; frames past that are counted, not kept
+FRAME_HITCH_MS = 1000 / 30  # Longer than two 60 Hz frames: a stutter players notice
+FRAME_PERCENTILES = (50, 95, 99)
+
+class FrameRecorder:
+    """Duration of every frame and the scene it belonged to, in arrays allocated up front so
+    recording costs two stores per frame. save() writes percentiles and hitches per scene."""
+    def __init__(self, path=None):
+        self.path = path
+        size = FRAME_RECORD_CAPACITY if path else 0
+        self.times = array("f", [0.0]) * size  # ms
+        self.scene_ids = array("B", [0]) * size
+        self.count = 0
+        self.dropped = 0
+        self.scenes = ["main"]  # scene id -> name
+        self.ids = {"main": 0}
+        self.scene_id = 0
+        self.last = time.perf_counter_ns()
+
+    def enter(self, name):
+        """Charge the following frames to scene name"""
+        scene_id = self.ids.get(name)
+        if scene_id is None:
+            scene_id = self.ids[name] = len(self.scenes)
+            self.scenes.append(name)
+        self.scene_id = scene_id
+
+    def frame(self):
+        if self.path is None:
+            return
+        now = time.perf_counter_ns()
+        if self.count < len(self.times):
+            self.times[self.count] = (now - self.last) / 1e6
+            self.scene_ids[self.count] = self.scene_id
+            self.count += 1
+        else:
+            self.dropped += 1
+        self.last = now
+
+    def summary(self):
+        by_scene = {}
+        for scene_id, ms in zip(self.scene_ids[:self.count], self.times[:self.count]):
+            by_scene.setdefault(scene_id, []).append(ms)
+        scenes = {}
+        for scene_id, times in by_scene.items():
+            times.sort()
+            stats = {f"p{p}": round(times[max(0, math.ceil(p / 100 * len(times)) - 1)], 2) for p in FRAME_PERCENTILES}
+            stats.update(frames=len(times), seconds=round(sum(times) / 1000, 1), max=round(times[-1], 2),
+                         hitches=sum(1 for ms in times if ms > FRAME_HITCH_MS))
+            scenes[self.scenes[scene_id]] = stats
+        return {"recorded": time.strftime("%Y-%m-%d %H:%M:%S"), "hitch_ms": round(FRAME_HITCH_MS, 2),
+                "dropped": self.dropped, "scenes": scenes}
+
+    def save(self):
+        if self.path is not None and self.count:
+            _write_json(self.path, self.summary())
+
+class FrameClock:
+    """pygame's Clock (which cannot be subclassed) reporting every tick to the frame recorder"""
+    def __init__(self, recorder):
+        self.clock = pygame.time.Clock()
+        self.recorder = recorder
+
+    def tick(self, framerate=0):
+        ms = self.clock.tick(framerate)
+        self.recorder.frame()
+        return ms
+
+    def get_fps(self):
+        return self.clock.get_fps()
+
+SCENE_STACK = []  # Scene functions currently running, innermost last
+
+def scene(fn):
+    """Mark a screen function as a scene: frames recorded while it runs are charged to it"""
+    name = fn.__name__
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        SCENE_STACK.append(name)
+        memory_monitor.transition("enter", name)
+        frame_recorder.enter(name)
+        scene_profiler.switch(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            SCENE_STACK.pop()
+            frame_recorder.enter(SCENE_STACK[-1] if SCENE_STACK else "main")
+            scene_profiler.switch(SCENE_STACK[-1] if SCENE_STACK else None)
+            memory_monitor.transition("exit", name)
+    return run
+
+def _change(before, after):
+    if not before:
+        return "" if not after else "   new"
+    return f"{(after - before) / before * 100:+6.0f}%"
+
+def compare_frames(before, after, tolerance):
+    """Table rows comparing two recordings scene by scene, and the scenes that got slower"""
+    rows, regressions = [], []
+    for name in sorted(set(before["scenes"]) | set(after["scenes"])):
+        old, new = before["scenes"].get(name), after["scenes"].get(name)
+        if old is None or new is None:
+            rows.append(f"{name:<24} only in {'after' if old is None else 'before'}")
+            continue
+        cells = [f"{key} {old[key]:7.2f} -> {new[key]:7.2f} {_change(old[key], new[key])}" for key in ("p50", "p95", "p99", "max")]
+        old_rate = old["hitches"] / old["frames"] * 1000
+        new_rate = new["hitches"] / new["frames"] * 1000
+        cells.append(f"hitches/1000 {old_rate:6.1f} -> {new_rate:6.1f}")
+        slower = any(new[key] > old[key] * (1 + tolerance) for key in ("p95", "p99")) or new_rate > old_rate * (1 + tolerance) + 1
+        if slower:
+            regressions.append(name)
+        rows.append(f"{name:<24} " + " | ".join(cells) + ("   SLOWER" if slower else ""))
+    return rows, regressions
+
+def compare_frames_command(args):
+    before, after = _read_json(args.before), _read_json(args.after)
+    if before is None or after is None:
+        print(f"cannot read {args.before if before is None else args.after}", file=sys.stderr)
+        return 1
+    rows, regressions = compare_frames(before, after, args.tolerance)
+    print("frame times in ms, before -> after")
+    for row in rows:
+        print(row)
+    if regressions:
+        print(f"slower by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+frame_recorder = FrameRecorder(ARGS.record_frames)
+atexit.register(frame_recorder.save)
+clock = FrameClock(frame_recorder)
+
+# ------------------- Scene Profiling -------------------
+PROFILE_REPORT_LINES = 40  # Functions listed in each scene's text summary
+
+class SceneProfiler:
+    """One cProfile session per scene (python ProVenture.py --profile). Only the innermost
+    running scene's session is enabled, so time in a nested screen is not counted twice;
+    repeated visits add up in the same session."""
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.profiles = {}
+        self.active = None
+
+    def switch(self, name):
+        """Profile scene name from now on (None: stop profiling)"""
+        if self.directory is None:
+            return
+        if self.active is not None:
+            self.active.disable()
+        self.active = None if name is None else self.profiles.setdefault(name, cProfile.Profile())
+        if self.active is not None:
+            self.active.enable()
+
+    def save(self):
+        """Write <scene>.pstats (for pstats, snakeviz or gprof2dot) and a <scene>.txt summary"""
+        if self.active is not None:
+            self.active.disable()
+            self.active = None
+        if not self.profiles:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for name, profile in self.profiles.items():
+            path = os.path.join(self.directory, name)
+            profile.dump_stats(path + ".pstats")
+            with open(path + ".txt", "w", encoding="utf-8") as f:
+                stats = pstats.Stats(profile, stream=f)
+                stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+            print(f"{path}.pstats: {stats.total_calls} calls, {stats.total_tt:.1f}s")
+
+scene_profiler = SceneProfiler(ARGS.profile)
+atexit.register(scene_profiler.save)
+
+# ------------------- Memory Diagnostics -------------------
+MEMORY_GROWTH_MB = 8  # Flag a scene that is this much bigger than on its previous visit
+MEMORY_TOP_ASSETS = 10  # Biggest assets listed per transition
+MEMORY_TOP_SITES = 8  # Allocation sites listed when a scene grew
+
+if sys.platform == "win32":
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong)] + [
+            (field, ctypes.c_size_t) for field in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                                                   "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                                                   "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+def resident_bytes():
+    """Resident memory of the whole process (Python, SDL, drivers), or None where unknown"""
+    if sys.platform == "win32":
+        counters = _ProcessMemoryCounters(cb=ctypes.sizeof(_ProcessMemoryCounters))
+        process = ctypes.windll.kernel32.GetCurrentProcess
+        process.restype = ctypes.c_void_p
+        ok = ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.c_void_p(process()), ctypes.byref(counters), counters.cb)
+        return counters.WorkingSetSize if ok else None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _mb(n):
+    return round(n / 2 ** 20, 2)
+
+class MemoryMonitor:
+    """Memory diagnostics (python ProVenture.py --memory).
+
+    Pixel data lives in SDL's heap, where tracemalloc cannot see it, so loaded surfaces are
+    tracked separately through weak references tagged with their asset and the scene that
+    loaded them. Every scene enter/exit appends one JSON line with Python heap, surface
+    bytes by asset and scene, and resident memory; entering a scene again compares against
+    its previous visit and reports the allocation sites that grew.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.surfaces = []  # (weakref to surface, asset, scene)
+        self.visits = {}  # scene -> (tracemalloc snapshot, bytes) when it was last entered
+        if path is not None:
+            tracemalloc.start()
+            open(path, "w").close()
+
+    def track(self, asset, surfaces):
+        """Account surfaces (a list) to asset and the running scene; returns them unchanged"""
+        if self.path is not None:
+            scene = SCENE_STACK[-1] if SCENE_STACK else "main"
+            self.surfaces.extend((weakref.ref(surf), asset, scene) for surf in surfaces)
+        return surfaces
+
+    def surface_usage(self):
+        """Bytes of live tracked pixel data by asset and by scene; a subsurface counts its parent once"""
+        by_asset, by_scene, seen, alive = {}, {}, set(), []
+        for entry in self.surfaces:
+            surf = entry[0]()
+            if surf is None:
+                continue
+            alive.append(entry)
+            root = surf.get_abs_parent()
+            if id(root) in seen:
+                continue
+            seen.add(id(root))
+            size = root.get_pitch() * root.get_height()
+            by_asset[entry[1]] = by_asset.get(entry[1], 0) + size
+            by_scene[entry[2]] = by_scene.get(entry[2], 0) + size
+        self.surfaces = alive
+        return by_asset, by_scene
+
+    def transition(self, event, name):
+        if self.path is None:
+            return
+        gc.collect()  # Count what is really still referenced, not what is waiting for the collector
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        traced, peak = tracemalloc.get_traced_memory()
+        by_asset, by_scene = self.surface_usage()
+        surfaces = sum(by_asset.values())
+        rss = resident_bytes()
+        record = {"time": round(time.time(), 3), "event": event, "scene": name, "depth": len(SCENE_STACK),
+                  "python_mb": _mb(traced), "python_peak_mb": _mb(peak), "surfaces_mb": _mb(surfaces),
+                  "resident_mb": None if rss is None else _mb(rss),
+                  "surfaces_by_scene_mb": {scene: _mb(n) for scene, n in sorted(by_scene.items())},
+                  "top_assets_mb": {asset: _mb(n) for asset, n in sorted(by_asset.items(), key=lambda item: -item[1])[:MEMORY_TOP_ASSETS]}}
+        warnings = []
+        if event == "enter":
+            previous = self.visits.get(name)
+            if previous is not None and traced + surfaces - previous[1] > MEMORY_GROWTH_MB * 2 ** 20:
+                record["growth_mb"] = _mb(traced + surfaces - previous[1])
+                record["growth_sites"] = [str(stat) for stat in snapshot.compare_to(previous[0], "lineno")[:MEMORY_TOP_SITES]]
+                warnings.append(f"{name} is {record['growth_mb']} MB bigger than on its previous visit")
+            self.visits[name] = (snapshot, traced + surfaces)
+        total = rss if rss is not None else traced + surfaces
+        if total > MEMORY_BUDGET_MB * 2 ** 20:
+            record["over_budget"] = True
+            warnings.append(f"{_mb(total)} MB is over the {MEMORY_BUDGET_MB} MB budget")
+        for warning in warnings:
+            print(f"memory ({event} {name}): {warning}", file=sys.stderr)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+memory_monitor = MemoryMonitor(ARGS.memory)
+
+# ------------------- Optimized Assets -------------------
+IMAGE_DIR = os.path.join(BASE_DIR, "resources", "images")
+OPTIMIZED_DIR = os.path.join(BASE_DIR, "resources", "optimized")
+OPTIMIZED_INDEX = os.path.join(OPTIMIZED_DIR, "index.json")
+
+# Size each image in resources/images is shown at; build-assets pre-resizes these
+ASSET_TARGETS = {
+    "crosshair.png": (30, 30),
+    "DOOR.png": (40, 40),
+    "QABOX.png": (40, 40),
+    "block.png": (50, 50),
+    "path.png": (TILE, TILE),
+    "wall.png": (TILE, TILE),
+    "grim.png": (300, 300),
+    "mazeback.png": (WIN_W, WIN_H),
+    "LDback.jpg": (WIN_W, WIN_H),
+    "TUTORIALB.jpg": (WIN_W, WIN_H),
+    "Game_Over_bg.jpg": (WIN_W, WIN_H),
+    "SETTINGS_bg.jpg": (WIN_W, WIN_H),
+    "Bg_Door_select.jpg": (WIN_W, WIN_H),
+    "boss_bg.jpg": (WIN_W, WIN_H),
+    "q_a.jpg": (WIN_W, WIN_H),
+    "Tank_idle.gif": (60, 60),
+    "Tank_walk.gif": (60, 60),
+    "Tank_attack.gif": (60, 60),
+    "Tank_boss.gif": (60, 60),
+    "Knight_idle.gif": (60, 60),
+    "Knight_walk.gif": (60, 60),
+    "Knight_attack.gif": (60, 60),
+    "Knight_boss.gif": (60, 60),
+    "Assasin_idle.gif": (60, 60),
+    "Assasin_walk.gif": (60, 60),
+    "Assasin_attack.gif": (60, 60),
+    "Assasin_boss.gif": (60, 60),
+    "Enemy.gif": (60, 60),
+    "background.gif": (WIN_W, WIN_H),
+    "MAINMENUBACK.gif": (WIN_W, WIN_H),
+    "Character_select.gif": (WIN_W, WIN_H),
+    "STORY SCENE.gif": (WIN_W, WIN_H),
+    "CREDITS.gif": (WIN_W, WIN_H),
+    "Tutorial.gif": (500, 300)
+}
+
+def load_asset_index():
+    try:
+        with open(OPTIMIZED_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+ASSET_INDEX = load_asset_index()
+
+def optimized_entry(name, size):
+    """Index entry of the optimized variant of name at size, or None when there is none
+    or the original changed since it was built (one stat, no hashing)"""
+    entry = ASSET_INDEX.get(name)
+    if entry is None or tuple(entry["size"]) != tuple(size):
+        return None
+    try:
+        st = os.stat(os.path.join(IMAGE_DIR, name))
+    except OSError:
+        st = None  # Shipping only the optimized variant is fine
+    if st is not None and (st.st_size != entry["source_size"] or st.st_mtime_ns != entry["source_mtime_ns"]):
+        return None
+    return entry if os.path.exists(os.path.join(OPTIMIZED_DIR, entry["file"])) else None
+
+def load_image(name, size=None, alpha=True):
+    """An image from resources/images at its display size, from the optimized build when present"""
+    entry = optimized_entry(name, size) if size else None
+    if entry:
+        surf = pygame.image.load(os.path.join(OPTIMIZED_DIR, entry["file"]))
+        surf = surf.convert_alpha() if alpha else surf.convert()
+    else:
+        surf = pygame.image.load(os.path.join(IMAGE_DIR, name))
+        surf = surf.convert_alpha() if alpha else surf.convert()
+    if size and surf.get_size() != tuple(size):
+        surf = pygame.transform.scale(surf, size)
+    return memory_monitor.track(name, [surf])[0]
+
 #----------for characters def so that wont repeat------------
-def load_gif_frames(path, size=(60, 60)):
+def load_gif_frames(path, size=(60, 60), with_durations=False):
+    entry = optimized_entry(os.path.basename(path), size) if os.path.dirname(os.path.abspath(path)) == IMAGE_DIR else None
+    if entry:
+        # An optimized GIF is one sheet with the frames row by row
+        sheet = pygame.image.load(os.path.join(OPTIMIZED_DIR, entry["file"])).convert_alpha()
+        w, h = entry.get("frame_size", size)
+        columns = entry["columns"]
+        frames = [sheet.subsurface(((i % columns) * w, (i // columns) * h, w, h)) for i in range(entry["frames"])]
+        if (w, h) != tuple(size):
+            frames = [pygame.transform.scale(frame, size) for frame in frames]
+        memory_monitor.track(os.path.basename(path), frames)
+        return (frames, entry["durations"]) if with_durations else frames
     gif = Image.open(path)
     frames = []
+    durations = []
     try:
         while True:
             fr = gif.copy().convert("RGBA")
             fr = fr.resize(size)
             pg_fr = pygame.image.frombytes(fr.tobytes(), fr.size, "RGBA").convert_alpha()
             frames.append(pg_fr)
+            durations.append(gif.info.get("duration", 100))
             gif.seek(gif.tell() + 1)
     except EOFError:
         pass
-    return frames
+    memory_monitor.track(os.path.basename(path), frames)
+    return (frames, durations) if with_durations else frames
+
+def load_optional_frames(name, size, with_durations=False):
+    """Frames of a GIF from resources/images that the game can do without (the cutscenes); none when it is missing"""
+    try:
+        return load_gif_frames(os.path.join(IMAGE_DIR, name), size, with_durations)
+    except FileNotFoundError:
+        return ([], []) if with_durations else []
+
+def _has_alpha(img):
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        return img.convert("RGBA").getextrema()[3][0] < 255
+    return False
+
+def build_asset(name, size):
+    """One image (or every GIF frame) resized to size and encoded: (bytes, extension, extra index fields)"""
+    img = Image.open(os.path.join(IMAGE_DIR, name))
+    out = BytesIO()
+    if img.width < size[0] or img.height < size[1]:
+        size = img.size  # Art shown larger than it was drawn is scaled up at load; stored upscaled it only grows
+    if getattr(img, "n_frames", 1) > 1 or name.lower().endswith(".gif"):
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(img):
+            durations.append(frame.info.get("duration", 100))
+            frames.append(frame.convert("RGBA").resize(size, Image.LANCZOS))
+        w, h = size
+        columns = max(1, min(len(frames), 4096 // w))
+        rows = (len(frames) + columns - 1) // columns
+        sheet = Image.new("RGBA", (columns * w, rows * h))
+        for i, frame in enumerate(frames):
+            sheet.paste(frame, ((i % columns) * w, (i // columns) * h))
+        extra = {"frames": len(frames), "columns": columns, "frame_size": list(size), "durations": durations}
+        if max(sheet.size) <= 16383:
+            # Lossless WebP comes out smaller than the GIF and decodes twice as fast as PNG
+            sheet.save(out, "WEBP", lossless=True, method=4)
+            return out.getvalue(), "webp", extra
+        sheet.save(out, "PNG", optimize=True)
+        return out.getvalue(), "png", extra
+    if _has_alpha(img):
+        img.convert("RGBA").resize(size, Image.LANCZOS).save(out, "PNG", optimize=True)
+        return out.getvalue(), "png", {}
+    # Opaque art (the big backgrounds) compresses far better as lossy WebP
+    img.convert("RGB").resize(size, Image.LANCZOS).save(out, "WEBP", quality=90, method=6)
+    return out.getvalue(), "webp", {}
+
+def build_assets(force=False):
+    """Bring resources/optimized up to date with ASSET_TARGETS; returns (built, up to date, missing) names"""
+    os.makedirs(OPTIMIZED_DIR, exist_ok=True)
+    index = {} if force else load_asset_index()
+    built, current, missing = [], [], []
+    for name, size in ASSET_TARGETS.items():
+        try:
+            st = os.stat(os.path.join(IMAGE_DIR, name))
+        except OSError:
+            missing.append(name)
+            index.pop(name, None)
+            continue
+        old = index.get(name)
+        if (old and tuple(old["size"]) == size and old["source_size"] == st.st_size
+                and old["source_mtime_ns"] == st.st_mtime_ns and os.path.exists(os.path.join(OPTIMIZED_DIR, old["file"]))):
+            current.append(name)
+            continue
+        data, ext, extra = build_asset(name, size)
+        digest = hashlib.sha256(data).hexdigest()
+        # Content-hashed names: a rebuild never overwrites a file a running game has open
+        filename = f"{os.path.splitext(name)[0].replace(' ', '_')}.{size[0]}x{size[1]}.{digest[:12]}.{ext}"
+        with open(os.path.join(OPTIMIZED_DIR, filename), "wb") as f:
+            f.write(data)
+        index[name] = dict(file=filename, size=list(size), sha256=digest, bytes=len(data),
+                           source_size=st.st_size, source_mtime_ns=st.st_mtime_ns, **extra)
+        built.append(name)
+    keep = {entry["file"] for entry in index.values()} | {os.path.basename(OPTIMIZED_INDEX)}
+    for filename in os.listdir(OPTIMIZED_DIR):
+        if filename not in keep:
+            os.remove(os.path.join(OPTIMIZED_DIR, filename))
+    with open(OPTIMIZED_INDEX + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(OPTIMIZED_INDEX + ".tmp", OPTIMIZED_INDEX)
+    return built, current, missing
+
+def build_assets_command(args):
+    built, current, missing = build_assets(args.force)
+    index = load_asset_index()
+    for name in built:
+        print(f"{name}: {index[name]['source_size']} -> {index[name]['bytes']} bytes ({index[name]['file']})")
+    for name in missing:
+        print(f"{name}: not found, skipped")
+    before = sum(entry["source_size"] for entry in index.values())
+    after = sum(entry["bytes"] for entry in index.values())
+    print(f"{len(built)} built, {len(current)} up to date, {len(missing)} missing; {before} -> {after} bytes")
+    return 0
+
+# ------------------- Asset Manifest -------------------
+ASSET_MANIFEST = os.path.join(BASE_DIR, "resources", "manifest.json")
+# Stats of files whose hash was re-checked on this machine (a fresh checkout has new mtimes)
+ASSET_STAT_CACHE = os.path.join(BASE_DIR, "resources", "manifest.local.json")
+
+# The game runs without these: cutscenes are skipped and a missing track keeps the current one playing
+OPTIONAL_ASSETS = {
+    "resources/images/STORY SCENE.gif",
+    "resources/images/Tutorial.gif",
+    "resources/images/Character_select.gif",
+    "resources/images/CREDITS.gif",
+    "resources/sounds/" + MUSIC_TRACKS["boss"]
+}
+# Meant to be edited (the question bank): only checked to exist, never hashed
+EDITABLE_ASSETS = {os.path.relpath(QUESTION_BANK_FILE, BASE_DIR).replace(os.sep, "/")}
+# Tools that never show a picture; a damaged image does not stop them
+ASSET_FREE_COMMANDS = {"asset-manifest", "accounts", "convert-save", "quiz-report", "compare-frames"}
+
+def referenced_assets():
+    """Every file the game loads, relative to BASE_DIR -> whether it may be missing"""
+    names = [f"resources/images/{name}" for name in ASSET_TARGETS]
+    names.append("resources/images/button.png")
+    names.append("resources/font/loginfont.ttf")
+    names.append("resources/sounds/Jumpscare.mp3")
+    names.extend(f"resources/sounds/{filename}" for filename in MUSIC_TRACKS.values())
+    names.append(os.path.relpath(QUESTION_BANK_FILE, BASE_DIR).replace(os.sep, "/"))
+    assets = {name: name in OPTIONAL_ASSETS for name in names}
+    # Sound effects fall back to synthesized tones
+    assets.update({f"resources/sounds/sfx/{entry[0]}": True for entry in SFX.values()})
+    return assets
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json(path, data):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def build_asset_manifest():
+    """Size, mtime and sha256 of every referenced asset that is present; returns (manifest, missing)"""
+    files, missing = {}, []
+    for name, optional in sorted(referenced_assets().items()):
+        path = os.path.join(BASE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            missing.append(name)
+            continue
+        if name in EDITABLE_ASSETS:
+            continue
+        files[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(path), "optional": optional}
+    return {"version": 1, "files": files}, missing
+
+def check_assets():
+    """Missing and corrupt asset names, checked against the manifest.
+
+    Costs one stat per file: a file is only hashed when its size or mtime differs
+    from what the manifest (or the local stat cache) recorded. Without a manifest
+    only presence is checked.
+    """
+    manifest = _read_json(ASSET_MANIFEST) or {"files": {}}
+    cache = _read_json(ASSET_STAT_CACHE) or {}
+    missing, corrupt = [], []
+    cache_changed = False
+    for name, optional in referenced_assets().items():
+        path = os.path.join(BASE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            image = name[len("resources/images/"):] if name.startswith("resources/images/") else None
+            # Shipping only the optimized variant of an image is fine
+            if not optional and not (image and optimized_entry(image, ASSET_TARGETS.get(image))):
+                missing.append(name)
+            continue
+        entry = manifest["files"].get(name)
+        if entry is None or name in EDITABLE_ASSETS:
+            continue
+        stamp = [st.st_size, st.st_mtime_ns]
+        if stamp == [entry["size"], entry["mtime_ns"]] or cache.get(name) == stamp + [entry["sha256"]]:
+            continue
+        if st.st_size != entry["size"] or file_sha256(path) != entry["sha256"]:
+            corrupt.append(name)
+            continue
+        cache[name] = stamp + [entry["sha256"]]
+        cache_changed = True
+    if cache_changed:
+        try:
+            _write_json(ASSET_STAT_CACHE, cache)
+        except OSError:
+            pass  # Read-only install: just hash again next time
+    return missing, corrupt
+
+def asset_manifest_command(args):
+    manifest, missing = build_asset_manifest()
+    _write_json(ASSET_MANIFEST, manifest)
+    optional = referenced_assets()
+    for name in missing:
+        print(f"{name}: not found{' (optional)' if optional[name] else ''}")
+    total = sum(entry["size"] for entry in manifest["files"].values())
+    print(f"Wrote {ASSET_MANIFEST}: {len(manifest['files'])} files, {total} bytes")
+    return 0
+
+def require_assets():
+    """Stop with a readable list instead of a FileNotFoundError halfway through loading"""
+    missing, corrupt = check_assets()
+    if not missing and not corrupt:
+        return
+    print("ProVenture cannot start, the install is incomplete:", file=sys.stderr)
+    for name in missing:
+        print(f"  missing: {name}", file=sys.stderr)
+    for name in corrupt:
+        print(f"  corrupt (does not match resources/manifest.json): {name}", file=sys.stderr)
+    print("Reinstall the game, or run 'ProVenture.py asset-manifest' if the files were changed on purpose.", file=sys.stderr)
+    sys.exit(1)
+
+# Runs before anything below decodes a file; only for the game itself, so importing the
+# module never exits or writes the stat cache
+if __name__ == "__main__" and ARGS.command not in ASSET_FREE_COMMANDS:
+    require_assets()
 
 # ------------------- LOAD RESOURCES -------------------
 
-crosshair_img = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "crosshair.png")).convert_alpha()
-crosshair_img = pygame.transform.scale(crosshair_img, (30, 30))
+crosshair_img = load_image("crosshair.png", (30, 30))
 pygame.mouse.set_visible(False)
 
 grim_sound = pygame.mixer.Sound(os.path.join(BASE_DIR, "resources", "sounds", "Jumpscare.mp3"))
-grim_sound.set_volume(0.6)
 
-door_block = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "DOOR.png")).convert_alpha()
-door_block = pygame.transform.scale(door_block, (40, 40))
+door_block = load_image("DOOR.png", (40, 40))
 
-question_block = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "QABOX.png")).convert_alpha()
-question_block = pygame.transform.scale(question_block, (40, 40))
+question_block = load_image("QABOX.png", (40, 40))
 
-block_path_img = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "block.png"))
-block_path_img = pygame.transform.scale(block_path_img, (50, 50))
+block_path_img = load_image("block.png", (50, 50))
 
-path_img = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "path.png")).convert()
-path_img = pygame.transform.scale(path_img, (TILE, TILE))
+path_img = load_image("path.png", (TILE, TILE), alpha=False)
 
-button_img = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "button.png")).convert_alpha()
+button_img = load_image("button.png")
 
 custom_font_login = pygame.font.Font(os.path.join(BASE_DIR, "resources", "font", "loginfont.ttf"), 28)
 
-wall_img = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "wall.png")).convert_alpha()
-wall_img = pygame.transform.scale(wall_img, (TILE, TILE))
+wall_img = load_image("wall.png", (TILE, TILE))
 
-maze_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "mazeback.png")).convert()
-maze_bg = pygame.transform.scale(maze_bg, (WIN_W, WIN_H))
+maze_bg = load_image("mazeback.png", (WIN_W, WIN_H), alpha=False)
 
-leaderboard_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "LDback.jpg")).convert()
-leaderboard_bg = pygame.transform.scale(leaderboard_bg, (WIN_W, WIN_H))
+leaderboard_bg = load_image("LDback.jpg", (WIN_W, WIN_H), alpha=False)
 
-Tutorial_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "TUTORIALB.jpg")).convert()
-Tutorial_bg = pygame.transform.scale(Tutorial_bg, (WIN_W, WIN_H))
+Tutorial_bg = load_image("TUTORIALB.jpg", (WIN_W, WIN_H), alpha=False)
 
-gameover_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "Game_Over_bg.jpg")).convert()
-gameover_bg = pygame.transform.scale(gameover_bg, (WIN_W, WIN_H))
+gameover_bg = load_image("Game_Over_bg.jpg", (WIN_W, WIN_H), alpha=False)
 
-settings_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "SETTINGS_bg.jpg")).convert()
-settings_bg = pygame.transform.scale(settings_bg, (WIN_W, WIN_H))
+settings_bg = load_image("SETTINGS_bg.jpg", (WIN_W, WIN_H), alpha=False)
 
-Door_selec_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "Bg_Door_select.jpg")).convert()
-Door_selec_bg = pygame.transform.scale(Door_selec_bg, (WIN_W, WIN_H))
+Door_selec_bg = load_image("Bg_Door_select.jpg", (WIN_W, WIN_H), alpha=False)
 
-Boss_final_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "boss_bg.jpg")).convert()
-Boss_final_bg = pygame.transform.scale(Boss_final_bg, (WIN_W, WIN_H))
+Boss_final_bg = load_image("boss_bg.jpg", (WIN_W, WIN_H), alpha=False)
 
-q_a_bg = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "q_a.jpg")).convert()
-q_a_bg = pygame.transform.scale(q_a_bg, (WIN_W, WIN_H))
+q_a_bg = load_image("q_a.jpg", (WIN_W, WIN_H), alpha=False)
 
-Tank_image = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Tank_idle.gif"))
-tank_frame_index = 0
-tank_frame_timer = 0
+# Grim image (for boss)
+grim_image = load_image("grim.png", (300, 300))
+
+# ------------------- Sprite Animation -------------------
+ANIMATION_TICK = 0.01  # Resolution of the precomputed frame tables, in seconds
+
+# (sprite set, state) -> (GIF in resources/images, seconds per frame, loops).
+# A new character only needs rows here and an entry in CHARACTERS.
+ANIMATIONS = {
+    ("Tank", "idle"): ("Tank_idle.gif", 0.10, True),
+    ("Tank", "walk"): ("Tank_walk.gif", 0.09, True),
+    ("Tank", "attack"): ("Tank_attack.gif", 0.30, False),
+    ("Tank", "boss"): ("Tank_boss.gif", 0.10, True),
+    ("Assassin", "idle"): ("Assasin_idle.gif", 0.08, True),
+    ("Assassin", "walk"): ("Assasin_walk.gif", 0.07, True),
+    ("Assassin", "attack"): ("Assasin_attack.gif", 0.05, False),
+    ("Assassin", "boss"): ("Assasin_boss.gif", 0.10, True),
+    ("Knight", "idle"): ("Knight_idle.gif", 0.12, True),
+    ("Knight", "walk"): ("Knight_walk.gif", 0.10, True),
+    ("Knight", "attack"): ("Knight_attack.gif", 0.06, False),
+    ("Knight", "boss"): ("Knight_boss.gif", 0.10, True),
+    ("Enemy", "walk"): ("Enemy.gif", 0.10, True)
+}
 
-Tank_image_run = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Tank_walk.gif"))
-tank_walk_frame_index = 0
-tank_walk_frame_timer = 0
+class Animation:
+    """Frames as (atlas page, rect) plus a table of which frame shows at each ANIMATION_TICK,
+    so finding the frame for a point in time is one index instead of a loop over durations"""
+    def __init__(self, frames, durations, loop=True):
+        self.frames = frames
+        self.durations = durations
+        self.loop = loop
+        table = array("H")
+        for i, seconds in enumerate(durations):
+            table.extend([i] * max(1, round(seconds / ANIMATION_TICK)))
+        self.table = table
+        self.length = len(table) * ANIMATION_TICK
+
+    def frame_at(self, t):
+        i = int(t / ANIMATION_TICK)
+        if i >= len(self.table):
+            i = i % len(self.table) if self.loop else len(self.table) - 1
+        return self.frames[self.table[i]]
+
+    def scaled(self, size):
+        scaled = [pygame.transform.scale(page.subsurface(rect), size) for page, rect in self.frames]
+        return Animation([(frame, frame.get_rect()) for frame in scaled], self.durations, self.loop)
+
+class AnimationSet:
+    """The animations of one sprite, by state"""
+    def __init__(self, animations):
+        self.animations = animations
+        self.sizes = {}
+
+    def scaled(self, size, *states):
+        """Some of the states (all by default) at another size, scaled once and kept"""
+        key = (size, states)
+        if key not in self.sizes:
+            self.sizes[key] = AnimationSet({state: anim.scaled(size) for state, anim in self.animations.items()
+                                            if not states or state in states})
+        return self.sizes[key]
+
+class Animator:
+    """Playback position of one entity in an AnimationSet, advanced by game time"""
+    def __init__(self, animation_set, state="idle"):
+        self.set = animation_set
+        self.state = state
+        self.time = 0.0
+
+    def play(self, state):
+        """Switch state, starting it from its first frame; the current state keeps playing"""
+        if state != self.state:
+            self.state = state
+            self.time = 0.0
 
-Tank_image_attack = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Tank_attack.gif"))
-tank_attack_frame_index = 0
-tank_attack_frame_timer = 0
+    def update(self, dt):
+        self.time += dt
+
+    @property
+    def animation(self):
+        return self.set.animations.get(self.state) if self.set else None
+
+    @property
+    def finished(self):
+        anim = self.animation
+        return anim is None or (not anim.loop and self.time >= anim.length)
+
+    @property
+    def frame(self):
+        anim = self.animation
+        return anim.frame_at(self.time) if anim and anim.frames else None
+
+# Every animation frame is packed into a few atlas pages, kept in resources/atlas between runs
+ATLAS_DIR = os.path.join(BASE_DIR, "resources", "atlas")
+ATLAS_INDEX = os.path.join(ATLAS_DIR, "atlas.json")
+ATLAS_PAGE_SIZE = 1024
+
+def pack_shelves(sizes, page_size=ATLAS_PAGE_SIZE):
+    """Place rectangles row by row, tallest first, starting a new page when one is full.
+    Returns (page, x, y) for each size in order and the used height of every page."""
+    placements = [None] * len(sizes)
+    heights = [0]
+    x = y = shelf = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x + w > page_size:
+            x, y, shelf = 0, y + shelf, 0
+        if y + h > page_size:
+            heights.append(0)
+            x = y = shelf = 0
+        placements[i] = (len(heights) - 1, x, y)
+        x += w
+        shelf = max(shelf, h)
+        heights[-1] = max(heights[-1], y + h)
+    return placements, heights
+
+def atlas_key(table):
+    """Changes whenever the table or any source GIF (or its optimized build) does"""
+    parts = []
+    for (name, state), (filename, frame_time, loop) in sorted(table.items()):
+        try:
+            st = os.stat(os.path.join(IMAGE_DIR, filename))
+            stamp = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            stamp = None
+        entry = optimized_entry(filename, (60, 60))
+        parts.append([name, state, filename, stamp, entry["file"] if entry else None])
+    return hashlib.sha256(json.dumps([ATLAS_PAGE_SIZE, parts]).encode("utf-8")).hexdigest()[:16]
+
+def build_atlas(table, key, cache=True):
+    """Decode every GIF in table, pack the frames and (with cache) write the pages; returns (pages, index)"""
+    frames, spans = [], {}
+    for (name, state), (filename, frame_time, loop) in table.items():
+        decoded = load_gif_frames(os.path.join(IMAGE_DIR, filename))
+        spans[f"{name}/{state}"] = (len(frames), len(decoded))
+        frames.extend(decoded)
+    placements, heights = pack_shelves([frame.get_size() for frame in frames])
+    pages = [pygame.Surface((ATLAS_PAGE_SIZE, h), pygame.SRCALPHA) for h in heights]
+    for frame, (page, x, y) in zip(frames, placements):
+        pages[page].blit(frame, (x, y))
+    rects = [[page, x, y, frame.get_width(), frame.get_height()] for frame, (page, x, y) in zip(frames, placements)]
+    index = {"key": key, "pages": [f"atlas.{key}.{n}.webp" for n in range(len(pages))],
+             "animations": {anim: rects[start:start + count] for anim, (start, count) in spans.items()}}
+    if not cache:
+        return [page.convert_alpha() for page in pages], index
+    try:
+        os.makedirs(ATLAS_DIR, exist_ok=True)
+        for page, filename in zip(pages, index["pages"]):
+            image = Image.frombytes("RGBA", page.get_size(), pygame.image.tobytes(page, "RGBA"))
+            image.save(os.path.join(ATLAS_DIR, filename), "WEBP", lossless=True, exact=True)
+        for filename in os.listdir(ATLAS_DIR):
+            if filename.startswith("atlas.") and filename not in index["pages"]:
+                os.remove(os.path.join(ATLAS_DIR, filename))
+        _write_json(ATLAS_INDEX, index)
+    except OSError as e:
+        print(f"Could not cache the sprite atlas: {e}")  # Read-only install: rebuilt on every start
+    return [page.convert_alpha() for page in pages], index
+
+def load_atlas(table, cache=True):
+    key = atlas_key(table)
+    index = _read_json(ATLAS_INDEX)
+    if index and index.get("key") == key:
+        try:
+            return [pygame.image.load(os.path.join(ATLAS_DIR, filename)).convert_alpha() for filename in index["pages"]], index
+        except (OSError, pygame.error):
+            pass
+    return build_atlas(table, key, cache)
+
+def load_animation_sets(table, cache=True):
+    pages, index = load_atlas(table, cache)
+    memory_monitor.track("sprite atlas", pages)
+    sets = {}
+    for (name, state), (filename, frame_time, loop) in table.items():
+        frames = [(pages[page], pygame.Rect(x, y, w, h)) for page, x, y, w, h in index["animations"][f"{name}/{state}"]]
+        sets.setdefault(name, {})[state] = Animation(frames, [frame_time] * len(frames), loop)
+    return {name: AnimationSet(animations) for name, animations in sets.items()}
+
+# Importing the module (tests, tools) reads a cached atlas but never writes into resources/
+ANIMATION_SETS = load_animation_sets(ANIMATIONS, cache=__name__ == "__main__")
+
+print(f"Loaded {len(ANIMATION_SETS['Enemy'].animations['walk'].frames)} frames from Enemy.gif")
+
+def animate_player(player, dt):
+    """Pick the player's animation state and advance it by dt seconds of game time"""
+    animator = player.animator
+    if player.is_attacking:
+        animator.play("attack")
+    else:
+        animator.play("walk" if player.is_moving else "idle")
+    animator.update(dt)
+    # The attack plays once, then the player goes back to walking or standing
+    if player.is_attacking and animator.finished:
+        player.is_attacking = False
+        animator.play("walk" if player.is_moving else "idle")
 
-Knight_image = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Knight_idle.gif"))
-knight_frame_index = 0
-knight_frame_timer = 0
+# ------------------- JSON Utilities -------------------
+class SaveSyncer:
+    """Applies SAVE_FSYNC. "batched" flushes at most once per interval; a save that
+    lands in between is flushed by a timer thread (and at exit) instead of right away."""
+    def __init__(self):
+        self.last_sync = 0.0
+        self.pending = set()
+        self.timer = None
+        self.lock = threading.Lock()
 
-Knight_image_run = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Knight_walk.gif"))
-knight_walk_frame_index = 0
-knight_walk_frame_timer = 0
+    def due(self):
+        if SAVE_FSYNC == "always":
+            return True
+        return SAVE_FSYNC == "batched" and time.monotonic() - self.last_sync >= SAVE_FSYNC_INTERVAL
+
+    def synced(self, path):
+        fsync_dir(path)
+        with self.lock:
+            self.last_sync = time.monotonic()
+            self.pending.discard(path)
+
+    def schedule(self, path):
+        with self.lock:
+            self.pending.add(path)
+            if self.timer is None:
+                delay = max(0.0, SAVE_FSYNC_INTERVAL - (time.monotonic() - self.last_sync))
+                self.timer = threading.Timer(delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            paths, self.pending = self.pending, set()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.last_sync = time.monotonic()
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDWR)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                fsync_dir(path)
+            except OSError as e:
+                print(f"Could not flush {path} to disk: {e}")
+
+def fsync_dir(path):
+    """Make a rename durable (not possible, or needed, on Windows)"""
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+save_syncer = SaveSyncer()
+atexit.register(save_syncer.flush)
+
+def backup_paths(path):
+    return [f"{path}.{i}" for i in range(1, SAVE_BACKUPS + 1)]
+
+_last_backup = {}  # absolute path -> time.monotonic() of the last generation this session
+
+def rotate_backups(path):
+    """Keep the file about to be replaced as generation .1, at most once per
+    SAVE_BACKUP_INTERVAL, so a burst of autosaves cannot push out every good copy"""
+    if SAVE_BACKUPS <= 0 or not os.path.exists(path):
+        return
+    key = os.path.abspath(path)
+    now = time.monotonic()
+    if key in _last_backup and now - _last_backup[key] < SAVE_BACKUP_INTERVAL:
+        return
+    _last_backup[key] = now
+    backups = backup_paths(path)
+    for newer, older in reversed(list(zip(backups, backups[1:]))):
+        if os.path.exists(newer):
+            os.replace(newer, older)
+    try:
+        os.link(path, backups[0])  # no copy, and path never stops existing
+    except OSError:
+        shutil.copy2(path, backups[0])
 
-Knight_image_attack = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Knight_attack.gif"))
-knight_attack_frame_index = 0
-knight_attack_frame_timer = 0
+def atomic_write(path, data, compression=None):
+    tmp = path + ".tmp"
+    sync_now = save_syncer.due()
+    with open(tmp, "wb") as f:
+        f.write(encode_save(path, data, compression))
+        if sync_now:
+            f.flush()
+            os.fsync(f.fileno())
+    rotate_backups(path)
+    os.replace(tmp, path)
+    if sync_now:
+        save_syncer.synced(path)
+    elif SAVE_FSYNC == "batched":
+        save_syncer.schedule(path)
 
-Assasin_image = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Assasin_idle.gif"))
-assassin_frame_index = 0
-assassin_frame_timer = 0
+def read_save_file(path):
+    with open(path, "rb") as f:
+        return decode_save(path, f.read())
 
-Assasin_image_run = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Assasin_walk.gif"))
-assassin_walk_frame_index = 0
-assassin_walk_frame_timer = 0
+def load_json_or_default(path, default):
+    candidates = [p for p in [path] + backup_paths(path) if os.path.exists(p)]
+    if not candidates:
+        atomic_write(path, default)
+        return deepcopy(default)
+    for candidate in candidates:
+        try:
+            data = read_save_file(candidate)
+        except Exception as e:
+            print(f"Error loading {candidate}: {e}", file=sys.stderr)
+            continue
+        if candidate != path:
+            # Keep the damaged file for inspection and put the good generation back in place
+            print(f"Recovered {path} from backup {candidate}; the damaged file is kept as {path}.corrupt-*",
+                  file=sys.stderr)
+            if os.path.exists(path):
+                os.replace(path, f"{path}.corrupt-{int(time.time())}")
+            atomic_write(path, data)
+        return data
+    print(f"No readable copy of {path}, recreating with default (damaged file kept as .corrupt).", file=sys.stderr)
+    if os.path.exists(path):
+        os.replace(path, f"{path}.corrupt-{int(time.time())}")
+    atomic_write(path, default)
+    return deepcopy(default)
 
-Assasin_image_attack = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Assasin_attack.gif"))
-assassin_attack_frame_index = 0
-assassin_attack_frame_timer = 0
+DEFAULT_USERS = {"users": {}}
 
-Tank_image_boss = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Tank_boss.gif"))
-Assasin_image_boss = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Assasin_boss.gif"))
-Knight_image_boss = load_gif_frames(os.path.join(BASE_DIR, "resources", "images", "Knight_boss.gif"))
+# ------------------- Binary Save Format -------------------
+# Layout: magic, format version, compression id, CRC32 of the uncompressed body, body.
+# The body holds every profile as compact JSON minus the bulky fields, which follow as
+# packed sections per user: enemy snapshots as little-endian float/int columns, and
+# quiz_progress as its raw tile bitmaps plus interned answered-question ids. Version 1
+# saves packed the older completed_quizzes list instead (one tile bitmap per maze plus
+# interned question ids, order not kept); profiles not yet moved to quiz_progress still
+# use that section.
+SAVE_MAGIC = b"PVSV"
+SAVE_FORMAT_VERSION = 2
+SAVE_HEADER = struct.Struct("<4sBBI")
+SAVE_COMPRESSIONS = {"none": 0, "zlib": 1, "lzma": 2}
+PACKED_ENEMIES, PACKED_QUIZZES, PACKED_PROGRESS = 1, 2, 4
+ENEMY_FIELDS = ("x", "y", "hp", "level")
+MAX_EXACT_FLOAT_INT = 2 ** 53
+
+def is_binary_save(path):
+    return not path.lower().endswith(".json")
+
+def _parse_tile_quiz_id(quiz_id):
+    """'maze2_quiz_3_10' -> (2, 3, 10); None for question ids or anything non-canonical"""
+    parts = quiz_id.split("_")
+    if len(parts) != 4 or not parts[0].startswith("maze") or parts[1] != "quiz":
+        return None
+    nums = (parts[0][4:], parts[2], parts[3])
+    if not all(n.isdigit() and n.isascii() and (n == "0" or n[0] != "0") for n in nums):
+        return None
+    return tuple(int(n) for n in nums)
 
+def _packable_enemies(value):
+    if not isinstance(value, list):
+        return False
+    for enemy in value:
+        if not isinstance(enemy, dict) or len(enemy) != 4 or any(k not in enemy for k in ENEMY_FIELDS):
+            return False
+        level = enemy["level"]
+        if type(level) is not int or not -2 ** 63 <= level < 2 ** 63:
+            return False
+        for field in ("x", "y", "hp"):
+            v = enemy[field]
+            if type(v) is int:
+                if abs(v) >= MAX_EXACT_FLOAT_INT:
+                    return False
+            elif type(v) is not float:
+                return False
+    return True
 
-    
-# Load enemy GIF
-gif = Image.open(os.path.join(BASE_DIR, "resources", "images", "Enemy.gif"))
-frames = []
-try:
-    while True:
-        frame = gif.copy().convert("RGBA")
-        frame = frame.resize((60, 60))
-        pygame_frame = pygame.image.frombytes(frame.tobytes(), frame.size, "RGBA").convert_alpha()
-        frames.append(pygame_frame)
-        gif.seek(gif.tell() + 1)
-except EOFError:
-    pass
+def _packable_quizzes(value):
+    return isinstance(value, list) and all(isinstance(q, str) for q in value) and len(set(value)) == len(value)
 
-print(f"Loaded {len(frames)} frames from Enemy.gif")
+def _packable_progress(value):
+    """Only quiz_progress exactly as CompletionTracker.to_profile writes it"""
+    if not isinstance(value, dict) or sorted(value) != ["seen", "tiles"]:
+        return False
+    if not isinstance(value["seen"], list) or not all(isinstance(q, str) for q in value["seen"]):
+        return False
+    if not isinstance(value["tiles"], dict):
+        return False
+    for entry in value["tiles"].values():
+        if not isinstance(entry, list) or len(entry) != 2:
+            return False
+        cols, bits = entry
+        if type(cols) is not int or cols < 0 or not isinstance(bits, str):
+            return False
+        try:
+            if base64.b64encode(base64.b64decode(bits, validate=True)).decode("ascii") != bits:
+                return False
+        except ValueError:
+            return False
+    return True
 
-# Grim image (for boss)
-grim_image = pygame.image.load(os.path.join(BASE_DIR, "resources", "images", "grim.png")).convert_alpha()
-grim_image = pygame.transform.scale(grim_image, (300, 300))
+class _SaveWriter:
+    def __init__(self):
+        self.strings = {}
+        self.out = bytearray()
+
+    def varint(self, n):
+        out = self.out
+        while n >= 0x80:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def intern(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def enemies(self, enemies):
+        n = len(enemies)
+        self.varint(n)
+        flags = bytearray(n)
+        for i, enemy in enumerate(enemies):
+            flags[i] = (type(enemy["x"]) is int) | (type(enemy["y"]) is int) << 1 | (type(enemy["hp"]) is int) << 2
+        self.out += struct.pack(f"<{n}d", *[e["x"] for e in enemies])
+        self.out += struct.pack(f"<{n}d", *[e["y"] for e in enemies])
+        self.out += struct.pack(f"<{n}d", *[e["hp"] for e in enemies])
+        self.out += struct.pack(f"<{n}q", *[e["level"] for e in enemies])
+        self.out += flags
+
+    def quizzes(self, quiz_ids):
+        tiles = {}
+        others = []
+        for quiz_id in quiz_ids:
+            parsed = _parse_tile_quiz_id(quiz_id)
+            if parsed:
+                tiles.setdefault(parsed[0], []).append(parsed[1:])
+            else:
+                others.append(quiz_id)
+        self.varint(len(tiles))
+        for maze_id in sorted(tiles):
+            cells = tiles[maze_id]
+            width = max(c for c, r in cells) + 1
+            bits = 0
+            for c, r in cells:
+                bits |= 1 << (r * width + c)
+            raw = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+            self.varint(maze_id)
+            self.varint(width)
+            self.varint(len(raw))
+            self.out += raw
+        indices = [self.intern(quiz_id) for quiz_id in others]
+        self.varint(len(indices))
+        self.out += struct.pack(f"<{len(indices)}I", *indices)
+
+    def progress(self, progress):
+        tiles = progress["tiles"]
+        self.varint(len(tiles))
+        for key, (cols, bits) in tiles.items():
+            raw = base64.b64decode(bits)
+            self.varint(self.intern(key))
+            self.varint(cols)
+            self.varint(len(raw))
+            self.out += raw
+        seen = [self.intern(qid) for qid in progress["seen"]]
+        self.varint(len(seen))
+        self.out += struct.pack(f"<{len(seen)}I", *seen)
+
+class _SaveReader:
+    def __init__(self, body):
+        self.body = body
+        self.pos = 0
+        self.strings = []
+
+    def varint(self):
+        body = self.body
+        n = shift = 0
+        while True:
+            b = body[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def take(self, size):
+        chunk = self.body[self.pos:self.pos + size]
+        if len(chunk) != size:
+            raise ValueError("Save file is truncated")
+        self.pos += size
+        return chunk
+
+    def enemies(self):
+        n = self.varint()
+        xs = struct.unpack(f"<{n}d", self.take(8 * n))
+        ys = struct.unpack(f"<{n}d", self.take(8 * n))
+        hps = struct.unpack(f"<{n}d", self.take(8 * n))
+        levels = struct.unpack(f"<{n}q", self.take(8 * n))
+        flags = self.take(n)
+        return [{"x": int(xs[i]) if flags[i] & 1 else xs[i],
+                 "y": int(ys[i]) if flags[i] & 2 else ys[i],
+                 "hp": int(hps[i]) if flags[i] & 4 else hps[i],
+                 "level": levels[i]} for i in range(n)]
+
+    def quizzes(self):
+        quiz_ids = []
+        for _ in range(self.varint()):
+            maze_id = self.varint()
+            width = self.varint()
+            raw = self.take(self.varint())
+            names = _tile_quiz_names(maze_id, width, len(raw) * 8)
+            for byte_index, byte in enumerate(raw):
+                if byte:
+                    base = byte_index * 8
+                    quiz_ids.extend([names[base + bit] for bit in SET_BITS[byte]])
+        n = self.varint()
+        strings = self.strings
+        quiz_ids.extend([strings[i] for i in struct.unpack(f"<{n}I", self.take(4 * n))])
+        return quiz_ids
+
+    def progress(self):
+        strings = self.strings
+        tiles = {}
+        for _ in range(self.varint()):
+            key = strings[self.varint()]
+            cols = self.varint()
+            tiles[key] = [cols, base64.b64encode(self.take(self.varint())).decode("ascii")]
+        n = self.varint()
+        return {"seen": [strings[i] for i in struct.unpack(f"<{n}I", self.take(4 * n))], "tiles": tiles}
+
+SET_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+_tile_quiz_name_cache = {}
+
+def _tile_quiz_names(maze_id, width, count):
+    """Tile quiz ids by bitmap index, built once per maze layout"""
+    names = _tile_quiz_name_cache.get((maze_id, width))
+    if names is None or len(names) < count:
+        names = [f"maze{maze_id}_quiz_{i % width}_{i // width}" for i in range(max(count, 512))]
+        _tile_quiz_name_cache[(maze_id, width)] = names
+    return names
+
+def encode_binary_save(data, compression=None):
+    compression = compression or SAVE_COMPRESSION
+    # Serialise through JSON first so keys and types match what a .json save would hold
+    skeleton = json.loads(json.dumps(data))
+    packed = _SaveWriter()
+    for record in skeleton.get("users", {}).values():
+        flags = 0
+        if _packable_enemies(record.get("enemies_state")):
+            flags |= PACKED_ENEMIES
+        if _packable_quizzes(record.get("completed_quizzes")):
+            flags |= PACKED_QUIZZES
+        if _packable_progress(record.get("quiz_progress")):
+            flags |= PACKED_PROGRESS
+        packed.out.append(flags)
+        if flags & PACKED_ENEMIES:
+            packed.enemies(record.pop("enemies_state"))
+        if flags & PACKED_QUIZZES:
+            packed.quizzes(record.pop("completed_quizzes"))
+        if flags & PACKED_PROGRESS:
+            packed.progress(record.pop("quiz_progress"))
+
+    body = _SaveWriter()
+    text = json.dumps(skeleton, separators=(",", ":")).encode("utf-8")
+    body.varint(len(text))
+    body.out += text
+    body.varint(len(packed.strings))
+    for quiz_id in packed.strings:  # dicts keep insertion order == index order
+        raw = quiz_id.encode("utf-8")
+        body.varint(len(raw))
+        body.out += raw
+    body.out += packed.out
+    body = bytes(body.out)
+
+    if compression == "zlib":
+        payload = zlib.compress(body, 6)
+    elif compression == "lzma":
+        import lzma
+        payload = lzma.compress(body)
+    else:
+        payload = body
+    header = SAVE_HEADER.pack(SAVE_MAGIC, SAVE_FORMAT_VERSION, SAVE_COMPRESSIONS[compression], zlib.crc32(body))
+    return header + payload
+
+def decode_binary_save(raw):
+    if len(raw) < SAVE_HEADER.size:
+        raise ValueError("Save file is truncated")
+    magic, version, compression, crc = SAVE_HEADER.unpack_from(raw)
+    if magic != SAVE_MAGIC:
+        raise ValueError("Not a ProVenture binary save")
+    if version > SAVE_FORMAT_VERSION:
+        raise ValueError(f"Save format version {version} is newer than this game supports")
+    body = raw[SAVE_HEADER.size:]
+    if compression == SAVE_COMPRESSIONS["zlib"]:
+        body = zlib.decompress(body)
+    elif compression == SAVE_COMPRESSIONS["lzma"]:
+        import lzma
+        body = lzma.decompress(body)
+    elif compression != SAVE_COMPRESSIONS["none"]:
+        raise ValueError(f"Unknown save compression {compression}")
+    if zlib.crc32(body) != crc:
+        raise ValueError("Save file checksum mismatch")
+
+    reader = _SaveReader(body)
+    data = json.loads(bytes(reader.take(reader.varint())).decode("utf-8"))
+    for _ in range(reader.varint()):
+        reader.strings.append(bytes(reader.take(reader.varint())).decode("utf-8"))
+    for record in data.get("users", {}).values():
+        flags = reader.take(1)[0]
+        if flags & PACKED_ENEMIES:
+            record["enemies_state"] = reader.enemies()
+        if flags & PACKED_QUIZZES:
+            record["completed_quizzes"] = reader.quizzes()
+        if flags & PACKED_PROGRESS:
+            record["quiz_progress"] = reader.progress()
+    return data
+
+def encode_save(path, data, compression=None):
+    if is_binary_save(path):
+        return encode_binary_save(data, compression)
+    text = json.dumps(data, indent=2)
+    if data:
+        # Last key holds a CRC32 of the file as it reads without that key
+        text = text[:-2] + f',\n  "_checksum": "{zlib.crc32(text.encode("utf-8")):08x}"\n}}'
+    return text.encode("utf-8")
+
+def decode_save(path, raw):
+    # Sniff rather than trust the name: backups are users.json.1, users.pvs.2, ...
+    if raw[:len(SAVE_MAGIC)] == SAVE_MAGIC:
+        return decode_binary_save(raw)
+    data = json.loads(raw.decode("utf-8"))
+    checksum = data.pop("_checksum", None)  # saves from older versions have none
+    if checksum is not None and checksum != f"{zlib.crc32(json.dumps(data, indent=2).encode('utf-8')):08x}":
+        # Still valid JSON, so most likely edited or reformatted by hand: use it rather than roll back
+        print(f"Warning: {path} does not match its checksum (edited by hand?); loading it as it is. "
+              f"Earlier copies are in {path}.1 .. {path}.{SAVE_BACKUPS}", file=sys.stderr)
+    return data
+
+def canonical_save(data):
+    """Data as a JSON round trip would see it, with completed_quizzes compared as sets"""
+    data = json.loads(json.dumps(data))
+    for record in data.get("users", {}).values():
+        if isinstance(record.get("completed_quizzes"), list):
+            record["completed_quizzes"] = sorted(record["completed_quizzes"])
+    return data
+
+def convert_save_command(args):
+    data = read_save_file(args.source)
+    atomic_write(args.target, data, args.compression)
+    if canonical_save(read_save_file(args.target)) != canonical_save(data):
+        print(f"Round trip check failed, {args.target} does not match {args.source}")
+        return 1
+    print(f"{args.source} ({os.path.getsize(args.source)} bytes) -> {args.target} "
+          f"({os.path.getsize(args.target)} bytes), {len(data.get('users', {}))} users, round trip OK")
+    return 0
+
+# ------------------- Save Stores -------------------
+class JsonUserStore:
+    """Whole-file users.json store, for one game process at a time"""
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        return load_json_or_default(self.path, DEFAULT_USERS)
+
+    def save(self, data):
+        atomic_write(self.path, data)
+
+    def refresh(self, data):
+        return False
 
-# ------------------- JSON Utilities -------------------
-def atomic_write(path, data):
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    os.replace(tmp, path)
+class UsernameTaken(ValueError):
+    """Another game process registered these usernames first; the rest of the save went through"""
+    def __init__(self, usernames):
+        super().__init__(f"Username already exists: {', '.join(usernames)}")
+        self.usernames = usernames
 
-def load_json_or_default(path, default):
-    if not os.path.exists(path):
-        atomic_write(path, default)
-        return deepcopy(default)
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        print(f"Error loading {path}, recreating with default.")
-        atomic_write(path, default)
-        return deepcopy(default)
+def merge_record(theirs, base, ours):
+    """Three-way merge of a user record: our changes since base, applied on top of theirs.
 
-DEFAULT_USERS = {"users": {}}
-users_data = load_json_or_default(USERS_FILE, DEFAULT_USERS)
+    Nested dicts (materials, question_stats, quiz_progress, ...) merge key by key, so
+    two processes touching different materials or questions both keep their change.
+    Lists and plain values are replaced whole; if both sides changed the same list
+    (say achievements), the last save wins.
+    """
+    merged = dict(theirs)
+    for key, value in ours.items():
+        if key in base and base[key] == value:
+            continue  # Untouched here
+        if isinstance(value, dict) and isinstance(theirs.get(key), dict) and isinstance(base.get(key, {}), dict):
+            merged[key] = merge_record(theirs[key], base.get(key, {}), value)
+        else:
+            merged[key] = value
+    for key in base:
+        if key not in ours:
+            merged.pop(key, None)
+    return merged
+
+class SharedUserStore:
+    """SQLite store that several game processes can share (lab PCs, network drives).
+
+    Every user is one row stamped with a revision number. save() only writes the
+    records this process changed and merges them field by field (see merge_record)
+    with whatever other processes committed meanwhile, so nobody's progress gets
+    overwritten. Creating a username another process already created raises
+    UsernameTaken instead of replacing that account. refresh()
+    asks SQLite whether anything changed and then reads only the newer rows.
+    Readers never take an exclusive lock.
+    """
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.conn = sqlite3.connect(path, timeout=SHARED_SAVE_TIMEOUT, isolation_level=None)
+        self.conn.execute(f"PRAGMA journal_mode={SHARED_SAVE_JOURNAL}")
+        self.conn.execute(f"PRAGMA synchronous={ {'none': 'OFF', 'batched': 'NORMAL'}.get(SAVE_FSYNC, 'FULL') }")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, data TEXT, rev INTEGER NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS users_rev ON users (rev)")
+        self.synced = {}  # username -> record JSON as last read from / written to the database
+        self.last_rev = 0
+        self.data_version = None
+
+    def load(self):
+        # Deleted accounts stay behind as rows without data (tombstones); they do not count
+        empty = self.conn.execute("SELECT COUNT(*) FROM users WHERE data IS NOT NULL").fetchone()[0] == 0
+        if empty and self.legacy_json and os.path.exists(self.legacy_json):
+            # First run in shared mode: bring the existing users.json accounts across
+            legacy = load_json_or_default(self.legacy_json, DEFAULT_USERS)
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for username, record in legacy.get("users", {}).items():
+                    self.conn.execute("INSERT OR IGNORE INTO users (username, data, rev) VALUES (?, ?, 1)",
+                                      (username, json.dumps(record, sort_keys=True)))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        data = deepcopy(DEFAULT_USERS)
+        self.refresh(data)
+        return data
+
+    def refresh(self, data):
+        """Pull in rows other processes changed since we last looked"""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.data_version:
+            return False
+        self.data_version = version
+
+        changed = False
+        rows = self.conn.execute("SELECT username, data, rev FROM users WHERE rev > ? ORDER BY rev", (self.last_rev,))
+        for username, text, rev in rows.fetchall():
+            self.last_rev = max(self.last_rev, rev)
+            if text == self.synced.get(username):
+                continue  # our own write coming back
+            local = data['users'].get(username)
+            clean = local is not None and json.dumps(local, sort_keys=True) == self.synced.get(username)
+            if text is None:
+                # Deleted elsewhere; keep it only if this process still has unsaved changes
+                self.synced.pop(username, None)
+                if local is not None and clean:
+                    del data['users'][username]
+                    changed = True
+                continue
+            remote = json.loads(text)
+            if local is None:
+                data['users'][username] = remote
+            elif clean:
+                # Update in place, screens hold references to the user dict
+                local.clear()
+                local.update(remote)
+            else:
+                merged = merge_record(remote, json.loads(self.synced.get(username, "{}")), local)
+                local.clear()
+                local.update(merged)
+            self.synced[username] = text
+            changed = True
+        return changed
+
+    def save(self, data):
+        dirty = {}
+        for username, record in data['users'].items():
+            text = json.dumps(record, sort_keys=True)
+            if text != self.synced.get(username):
+                dirty[username] = record
+        deleted = [username for username in self.synced if username not in data['users']]
+        if not dirty and not deleted:
+            return
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rev = self.conn.execute("SELECT COALESCE(MAX(rev), 0) FROM users").fetchone()[0] + 1
+            written, taken = {}, {}
+            for username, record in dirty.items():
+                row = self.conn.execute("SELECT data FROM users WHERE username = ?", (username,)).fetchone()
+                if row and row[0] is not None and username not in self.synced:
+                    # We are creating this user, but another process got there first
+                    taken[username] = row[0]
+                    continue
+                if row and row[0] is not None and row[0] != self.synced.get(username):
+                    # Another process changed this user since we read it: keep its changes, apply ours on top
+                    merged = merge_record(json.loads(row[0]), json.loads(self.synced[username]), record)
+                    record.clear()
+                    record.update(merged)
+                text = json.dumps(record, sort_keys=True)
+                self.conn.execute("INSERT OR REPLACE INTO users (username, data, rev) VALUES (?, ?, ?)",
+                                  (username, text, rev))
+                written[username] = text
+            for username in deleted:
+                self.conn.execute("UPDATE users SET data = NULL, rev = ? WHERE username = ?", (rev, username))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.synced.update(written)
+        for username in deleted:
+            self.synced.pop(username, None)
+        if taken:
+            # Their account stands; drop our would-be copy for theirs
+            for username, text in taken.items():
+                data['users'][username] = json.loads(text)
+                self.synced[username] = text
+            raise UsernameTaken(sorted(taken))
+
+def open_user_store():
+    if SAVE_MODE == "shared":
+        return SharedUserStore(SHARED_USERS_FILE, legacy_json=USERS_FILE)
+    return JsonUserStore(USERS_FILE)
+
+user_store = open_user_store()
+users_data = user_store.load()
 
 def save_users():
-    atomic_write(USERS_FILE, users_data)
+    user_store.save(users_data)
+
+def refresh_users():
+    """Pick up changes other game processes made to a shared save"""
+    return user_store.refresh(users_data)
+
+# ------------------- Password Hashing -------------------
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+def kdf_params(kdf):
+    if kdf == "scrypt":
+        return f"{SCRYPT_N}:{SCRYPT_R}:{SCRYPT_P}"
+    return str(PBKDF2_ITERATIONS)
+
+def _derive(kdf, params, password, salt):
+    if kdf == "scrypt":
+        n, r, p = (int(v) for v in params.split(":"))
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20)
+    if kdf == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, int(params))
+    raise ValueError(f"Unknown password KDF {kdf}")
+
+def hash_password(password, kdf=None, params=None):
+    """Slow on purpose (work factor in CONFIG); call it off the frame loop"""
+    kdf = kdf or PASSWORD_KDF
+    params = params or kdf_params(kdf)
+    salt = os.urandom(16)
+    return f"{kdf}${params}${_b64(salt)}${_b64(_derive(kdf, params, password, salt))}"
+
+def verify_password(password, stored):
+    """Returns (matches, needs_rehash) for a hash_password() string"""
+    kdf, params, salt, digest = stored.split("$")
+    derived = _derive(kdf, params, password, base64.b64decode(salt))
+    matches = hmac.compare_digest(derived, base64.b64decode(digest))
+    return matches, hash_outdated(stored)
+
+def hash_outdated(stored):
+    """Whether a stored hash (or a plaintext save, None) is below the current KDF policy"""
+    if not stored:
+        return True
+    kdf, params = stored.split("$")[:2]
+    return kdf != PASSWORD_KDF or params != kdf_params(kdf)
 
-def create_user(username, password):
-    if username in users_data['users']:
-        return False, "Username already exists."
-    users_data['users'][username] = {
-        "password": password,
+def check_credentials(password, password_hash, legacy_password):
+    """Worker-side login check; returns (ok, new_hash or None). Never touches users_data."""
+    if password_hash:
+        ok, rehash = verify_password(password, password_hash)
+    else:
+        ok = legacy_password is not None and hmac.compare_digest(legacy_password.encode("utf-8"), password.encode("utf-8"))
+        rehash = True  # plaintext from an old save
+    return ok, (hash_password(password) if ok and rehash else None)
+
+class PendingResult:
+    """Result of a background job; poll done() from the frame loop"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def done(self):
+        return self.event.is_set()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.event.set()
+        return self
+
+    def wait(self):
+        self.event.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+class BackgroundWorker:
+    """Single long-lived background thread working through a job queue in order.
+    Password hashing gets one so login screens keep animating (hashlib releases the
+    GIL while it derives keys); question scheduling gets another."""
+    def __init__(self, name):
+        self.name = name
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def submit(self, fn, *args):
+        job = PendingResult()
+        self.jobs.put((job, fn, args))
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.thread.start()
+        return job
+
+    def _run(self):
+        while True:
+            job, fn, args = self.jobs.get()
+            try:
+                job.finish(fn(*args))
+            except Exception as e:
+                job.finish(error=e)
+
+credential_worker = BackgroundWorker("credential-worker")
+
+# ------------------- Accounts -------------------
+def new_user_record(password_hash, character=None):
+    record = {
+        "password_hash": password_hash,
         "created": time.time(),
         "character": None,
         "current_maze": 1,
@@ -291,7 +1887,7 @@ def create_user(username, password):
         "lives": MAX_LIVES,
         "points": 100,
         "materials": {"wood": 0, "rope": 0, "metal": 0, "sail": 0},
-        "completed_quizzes": [],
+        "quiz_progress": {},
         "achievements": [],
         "kills": 0,
         "wins": 0,
@@ -300,17 +1896,85 @@ def create_user(username, password):
         "enemies_state": [],
         "in_boss_fight": False
     }
-    save_users()
+    if character:
+        reset_progress(record, character)
+    return record
+
+def reset_progress(record, character):
+    """Start a new game as character (stats like wins and high_score are kept)"""
+    record.update({
+        "current_maze": 1,
+        "maze_seeds": {},
+        "x": None,
+        "y": None,
+        "health": CHARACTERS[character]['health'],
+        "lives": MAX_LIVES,
+        "points": 100,
+        "materials": {"wood": 0, "rope": 0, "metal": 0, "sail": 0},
+        "quiz_progress": {},
+        "achievements": [],
+        "kills": 0,
+        "enemies_state": [],
+        "in_boss_fight": False
+    })
+    record['character'] = character
+
+def begin_create_user(username, password):
+    """Start registering; the password is hashed on the worker. Finish with finish_create_user."""
+    refresh_users()
+    if username in users_data['users']:
+        return PendingResult().finish(error=ValueError("Username already exists."))
+    return credential_worker.submit(hash_password, password)
+
+def finish_create_user(username, job):
+    if job.error:
+        return False, str(job.error)
+    refresh_users()
+    if username in users_data['users']:
+        return False, "Username already exists."
+    users_data['users'][username] = new_user_record(job.result)
+    try:
+        save_users()
+    except UsernameTaken:
+        return False, "Username already exists."
     return True, "Account created."
 
-def validate_user(username, password):
+def begin_validate_user(username, password):
+    """Start checking a login on the worker. Finish with finish_validate_user."""
+    refresh_users()
     u = users_data['users'].get(username)
     if not u:
-        return False, "No such username."
-    if u.get("password") != password:
+        return PendingResult().finish(error=ValueError("No such username."))
+    return credential_worker.submit(check_credentials, password, u.get("password_hash"), u.get("password"))
+
+def finish_validate_user(username, job):
+    if job.error:
+        return False, str(job.error)
+    ok, new_hash = job.result
+    if not ok:
         return False, "Incorrect password."
+    u = users_data['users'].get(username)
+    if u is not None:
+        if new_hash:
+            # Old plaintext password or outdated work factor: store a fresh hash
+            u["password_hash"] = new_hash
+            u.pop("password", None)
+        u["last_login"] = time.time()
+        save_users()
     return True, "Login successful."
 
+def create_user(username, password):
+    """Blocking version for tools; screens use begin_create_user/finish_create_user"""
+    job = begin_create_user(username, password)
+    job.event.wait()
+    return finish_create_user(username, job)
+
+def validate_user(username, password):
+    """Blocking version for tools; screens use begin_validate_user/finish_validate_user"""
+    job = begin_validate_user(username, password)
+    job.event.wait()
+    return finish_validate_user(username, job)
+
 def update_leaderboard(username):
     """Update player stats for leaderboard"""
     user = users_data['users'][username]
@@ -321,6 +1985,7 @@ def update_leaderboard(username):
 
 def get_leaderboard():
     """Get top 10 players by high_score, then total_items, then wins"""
+    refresh_users()
     players = []
     for username, data in users_data['users'].items():
         players.append({
@@ -341,11 +2006,200 @@ def draw_text(surf, text, pos, color=(255, 255, 255), font=FONT, center=False):
     else:
         surf.blit(text_surface, pos)
 
-def apply_volume_settings():
-    """Apply current volume settings to all sounds"""
-    vol = 0 if SETTINGS['muted'] else SETTINGS['volume']
-    pygame.mixer.music.set_volume(vol)
-    grim_sound.set_volume(vol * 0.6)
+# ------------------- Audio -------------------
+class AudioManager:
+    """Scene music and the volume of every registered sound, from one place.
+
+    Track files are read into memory ahead of time and switched on a worker thread
+    (fade out, load from memory, fade in), so screens never wait on disk or the MP3
+    decoder. Asking for the track that is already playing does nothing.
+    """
+    def __init__(self, directory, tracks):
+        self.directory = directory
+        self.tracks = tracks
+        self.current = None  # Scene whose track is playing or about to
+        self.data = {}  # scene -> file bytes
+        self.loading = {}  # scene -> PendingResult while its file is read
+        self.missing = set()
+        self.sounds = []  # (Sound, share of the master volume)
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def volume(self):
+        return 0 if SETTINGS['muted'] else SETTINGS['volume']
+
+    def register(self, sound, share=1.0):
+        self.sounds.append((sound, share))
+        sound.set_volume(self.volume() * share)
+        return sound
+
+    def apply_volume(self):
+        """Push SETTINGS to the music and every registered sound"""
+        vol = self.volume()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.set_volume(vol)
+        for sound, share in self.sounds:
+            sound.set_volume(vol * share)
+
+    def _submit(self, fn, *args):
+        job = PendingResult()
+        self.jobs.put((job, fn, args))
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="audio", daemon=True)
+            self.thread.start()
+        return job
+
+    def _run(self):
+        while True:
+            job, fn, args = self.jobs.get()
+            try:
+                job.finish(fn(*args))
+            except Exception as exc:
+                job.finish(error=exc)
+
+    def _read(self, scene):
+        path = os.path.join(self.directory, self.tracks[scene])
+        try:
+            with open(path, "rb") as f:
+                self.data[scene] = f.read()
+        except OSError:
+            if scene not in self.missing:
+                print(f"Music for '{scene}' not found: {path}")
+            self.missing.add(scene)
+
+    def preload(self, *scenes):
+        """Start reading tracks a screen is likely to need next"""
+        for scene in scenes:
+            if scene in self.tracks and scene not in self.data and scene not in self.loading and scene not in self.missing:
+                self.loading[scene] = self._submit(self._read, scene)
+
+    def _fade_out(self, ms):
+        # pygame.mixer.music.fadeout blocks the caller, so ramp the volume here instead
+        steps = max(1, ms // 20)
+        for i in range(steps, 0, -1):
+            pygame.mixer.music.set_volume(self.volume() * i / steps)
+            time.sleep(ms / steps / 1000)
+        pygame.mixer.music.stop()
+
+    def _switch(self, scene, fade_ms):
+        if scene not in self.data:
+            self._read(scene)
+        self.loading.pop(scene, None)
+        data = self.data.get(scene)
+        if data is None or self.current != scene:
+            return  # Missing file (the old track keeps playing), or another switch came after this one
+        if pygame.mixer.music.get_busy():
+            self._fade_out(fade_ms // 2)
+        pygame.mixer.music.load(BytesIO(data), self.tracks[scene].rsplit(".", 1)[-1].lower())
+        pygame.mixer.music.set_volume(self.volume())
+        pygame.mixer.music.play(-1, fade_ms=fade_ms // 2)
+
+    def play(self, scene, fade_ms=MUSIC_FADE_MS):
+        """Fade out the current track and fade in a scene's track; returns at once"""
+        if scene == self.current or scene in self.missing or not pygame.mixer.get_init():
+            return
+        if self.current is not None and self.tracks.get(self.current) == self.tracks.get(scene):
+            self.current = scene  # Same file under another scene name: let it play on
+            return
+        self.current = scene
+        self._submit(self._switch, scene, fade_ms)
+
+    def stop(self, fade_ms=MUSIC_FADE_MS):
+        if self.current is None or not pygame.mixer.get_init():
+            return
+        self.current = None
+        self._submit(self._fade_out, fade_ms)
+
+audio = AudioManager(os.path.join(BASE_DIR, "resources", "sounds"), MUSIC_TRACKS)
+audio.register(grim_sound, 0.6)
+
+def synth_tone(waveform, start_hz, end_hz, seconds, seed=0):
+    """A short effect generated in the mixer's own format: a pitch sweep with a fast attack
+    and exponential decay"""
+    freq, size, channels = pygame.mixer.get_init()
+    count = int(freq * seconds)
+    floats = size == 32
+    samples = array("f" if floats else "h", bytes((4 if floats else 2) * count * channels))
+    rng = random.Random(seed)
+    peak = 1.0 if floats else 32767 * 0.8
+    phase = 0.0
+    noise = 0.0
+    attack = max(1, int(freq * 0.005))
+    for i in range(count):
+        t = i / count
+        hz = start_hz + (end_hz - start_hz) * t
+        phase += hz / freq
+        if waveform == "sine":
+            value = math.sin(2 * math.pi * phase)
+        elif waveform == "square":
+            value = 0.6 if phase % 1.0 < 0.5 else -0.6
+        else:
+            # Noise held for one period of the sweep, so the "pitch" colours it
+            if phase >= 1.0:
+                phase -= 1.0
+                noise = rng.uniform(-1, 1)
+            value = noise
+        envelope = min(1.0, i / attack) * math.exp(-4 * t)
+        sample = value * envelope * peak
+        for c in range(channels):
+            samples[i * channels + c] = sample if floats else int(sample)
+    return pygame.mixer.Sound(buffer=samples.tobytes())
+
+class SfxBank:
+    """Sound effects decoded once, played on a fixed pool of reserved channels.
+
+    play() reuses the preloaded Sound objects and the per-channel bookkeeping lists,
+    so it can be called from the frame loop freely. When every channel is busy the
+    lowest priority, oldest effect is cut off, but only for an effect of at least its priority.
+    """
+    def __init__(self, directory, table, channels=SFX_CHANNELS):
+        self.enabled = bool(pygame.mixer.get_init())
+        self.sounds = {}
+        self.priority = {}
+        self.last = {}
+        self.channels = []
+        if not self.enabled:
+            return
+        # Effects get the first channels to themselves; Sound.play() keeps the rest
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channels + 8))
+        pygame.mixer.set_reserved(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.playing = [0] * channels  # Priority of what each channel plays
+        self.started = [0.0] * channels
+        for name, (filename, priority, share, tone) in table.items():
+            path = os.path.join(directory, filename)
+            try:
+                sound = pygame.mixer.Sound(path) if os.path.exists(path) else synth_tone(*tone, seed=zlib.crc32(name.encode()))
+            except pygame.error as exc:
+                print(f"Could not load sound effect {path}: {exc}")
+                sound = synth_tone(*tone)
+            self.sounds[name] = audio.register(sound, share)
+            self.priority[name] = priority
+            self.last[name] = 0.0
+
+    def play(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if now - self.last[name] < SFX_MIN_INTERVAL:
+            return
+        priority = self.priority[name]
+        victim = -1
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                victim = i
+                break
+            if self.playing[i] <= priority and (victim < 0 or self.playing[i] < self.playing[victim] or
+                                                (self.playing[i] == self.playing[victim] and self.started[i] < self.started[victim])):
+                victim = i
+        if victim < 0:
+            return  # Every channel holds something more important
+        self.channels[victim].play(self.sounds[name])
+        self.playing[victim] = priority
+        self.started[victim] = now
+        self.last[name] = now
+
+sfx = SfxBank(os.path.join(BASE_DIR, "resources", "sounds", "sfx"), SFX)
 
 # ------------------- Input / Button UI -------------------
 class InputBox:
@@ -439,11 +2293,13 @@ def draw_cursor(surface):
     mouse_x, mouse_y = pygame.mouse.get_pos()
     surface.blit(crosshair_img, crosshair_img.get_rect(center=(mouse_x, mouse_y)))
 # ------------------- Settings Screen -------------------
+@scene
 def settings_screen():
     back_btn = Button((50, 50, 150, 50), "BACK",color=ERROR_COLOR, text_color=WHITE, font=custom_font_login)
     mute_btn = Button((WIN_W//2 - 150, 250, 300, 60), "Mute: OFF", text_color=WHITE, font=custom_font_login)
     vol_up_btn = Button((WIN_W//2 + 50, 350, 135, 50), "VOL +", text_color=WHITE, font=custom_font_login)
     vol_down_btn = Button((WIN_W//2 - 180, 350, 125, 50), "VOL -", text_color=WHITE, font=custom_font_login)
+    fullscreen_btn = Button((WIN_W//2 - 200, 440, 400, 60), "FULLSCREEN: OFF", text_color=WHITE, font=custom_font_login)
     
     running = True
     while running:
@@ -458,15 +2314,18 @@ def settings_screen():
             
             if mute_btn.handle_event(event):
                 SETTINGS['muted'] = not SETTINGS['muted']
-                apply_volume_settings()
+                audio.apply_volume()
             
             if vol_up_btn.handle_event(event):
                 SETTINGS['volume'] = min(1.0, SETTINGS['volume'] + 0.1)
-                apply_volume_settings()
+                audio.apply_volume()
             
             if vol_down_btn.handle_event(event):
                 SETTINGS['volume'] = max(0.0, SETTINGS['volume'] - 0.1)
-                apply_volume_settings()
+                audio.apply_volume()
+
+            if fullscreen_btn.handle_event(event):
+                toggle_fullscreen()
         
         
         screen.blit(settings_bg, (0, 0))  # draw image
@@ -478,6 +2337,8 @@ def settings_screen():
         draw_text(screen, f"Volume: {int(SETTINGS['volume'] * 100)}%", (WIN_W//2, 320), color=WHITE, font=BIG, center=True)
         vol_up_btn.draw(screen)
         vol_down_btn.draw(screen)
+        fullscreen_btn.text = f"FULLSCREEN: {'ON' if SETTINGS['fullscreen'] else 'OFF'}"
+        fullscreen_btn.draw(screen)
         back_btn.draw(screen)
 
         draw_cursor(screen)
@@ -485,6 +2346,7 @@ def settings_screen():
        
 
 # ------------------- Auth Screen -------------------
+@scene
 def login_register_screen():
     user_box = InputBox((WIN_W//2 - 100, 280, 340, 40), "ENTER USERNAME", font=custom_font_login)
     pass_box = InputBox((WIN_W//2 - 100, 340, 340, 40), "ENTER PASSWORD", is_password=True, font=custom_font_login)
@@ -494,23 +2356,12 @@ def login_register_screen():
     
     info_msg = ""
     info_color = INFO_COLOR
+    pending = None  # (action, username, job) while the worker hashes a password
     
-    pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "loginsound.mp3"))
-    apply_volume_settings()
-    pygame.mixer.music.play(-1)
-    
-    gif_login_background = Image.open(os.path.join(BASE_DIR, "resources", "images", "background.gif"))
-    bg_frames = []
+    audio.play("login")
+    audio.preload("menu")
     
-    try:
-        while True:
-            frame = gif_login_background.copy().convert("RGBA")
-            frame = frame.resize((WIN_W, WIN_H))
-            pygame_frame = pygame.image.frombytes(frame.tobytes(), frame.size, "RGBA").convert_alpha()
-            bg_frames.append(pygame_frame)
-            gif_login_background.seek(gif_login_background.tell() + 1)
-    except EOFError:
-        pass
+    bg_frames = load_gif_frames(os.path.join(IMAGE_DIR, "background.gif"), (WIN_W, WIN_H))
     
     bg_frame_index = 0
     
@@ -535,36 +2386,41 @@ def login_register_screen():
             elif res_pass == "tab":
                 pass_box.active = False
                 user_box.active = True
-            elif res_user == "enter" or res_pass == "enter":
+            elif (res_user == "enter" or res_pass == "enter") and not pending:
                 username = user_box.text.strip()
-                password = pass_box.text
-                ok, txt = validate_user(username, password)
-                if ok:
-                    return username
-                else:
-                    info_msg = txt
-                    info_color = ERROR_COLOR
+                pending = ("login", username, begin_validate_user(username, pass_box.text))
+                info_msg = "Checking..."
+                info_color = INFO_COLOR
             
-            if login_btn.handle_event(event):
+            if login_btn.handle_event(event) and not pending:
                 username = user_box.text.strip()
-                password = pass_box.text
-                ok, txt = validate_user(username, password)
-                if ok:
-                    return username
-                else:
-                    info_msg = txt
-                    info_color = ERROR_COLOR
+                pending = ("login", username, begin_validate_user(username, pass_box.text))
+                info_msg = "Checking..."
+                info_color = INFO_COLOR
             
-            if reg_btn.handle_event(event):
+            if reg_btn.handle_event(event) and not pending:
                 username = user_box.text.strip()
                 password = pass_box.text
                 if not username or not password:
                     info_msg = "Enter username and password to register."
                     info_color = ERROR_COLOR
                 else:
-                    ok, txt = create_user(username, password)
-                    info_msg = txt
-                    info_color = SUCCESS_COLOR if ok else ERROR_COLOR
+                    pending = ("register", username, begin_create_user(username, password))
+                    info_msg = "Creating account..."
+                    info_color = INFO_COLOR
+        
+        # Password hashing runs on the credential worker; pick up the answer once it is ready
+        if pending and pending[2].done():
+            action, username, job = pending
+            pending = None
+            if action == "login":
+                ok, txt = finish_validate_user(username, job)
+                if ok:
+                    return username
+            else:
+                ok, txt = finish_create_user(username, job)
+            info_msg = txt
+            info_color = SUCCESS_COLOR if ok else ERROR_COLOR
         
         user_box.update(dt)
         pass_box.update(dt)
@@ -588,20 +2444,13 @@ def login_register_screen():
         pygame.display.flip()
 
 # ------------------- Story Intro Screen -------------------
+@scene
 def story_intro_screen():
-    pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "STORY.MP3"))
-    apply_volume_settings()
-    pygame.mixer.music.play(-1)
+    audio.play("story")
 
-    gif = Image.open(os.path.join(BASE_DIR, "resources", "images", "STORY SCENE.gif"))
-    frames = []
-    durations = []
-    
-    for frame in ImageSequence.Iterator(gif):
-        frame_copy = frame.convert("RGBA").copy()
-        frame_copy = frame_copy.resize((WIN_W, WIN_H))
-        frames.append(pygame.image.frombytes(frame_copy.tobytes(), frame_copy.size, "RGBA").convert_alpha())
-        durations.append(frame.info.get('duration', 100))
+    frames, durations = load_optional_frames("STORY SCENE.gif", (WIN_W, WIN_H), with_durations=True)
+    if not frames:
+        return  # Cutscene not installed
     
     start_time = pygame.time.get_ticks()
     frame_index = 0
@@ -626,19 +2475,13 @@ def story_intro_screen():
         
         draw_cursor(screen)
         pygame.display.flip()
+        clock.tick(60)
 
 # ------------------- Tutorial Screen -------------------
+@scene
 def tutorial_screen():
     # --- Load tutorial GIF (500x300) ---
-    tutorial_gif_path = Image.open(os.path.join(BASE_DIR, "resources", "images", "Tutorial.gif"))
-    tutorial_frames = []
-    durations = []  # store frame durations for smoother playback
-    
-    for frame in ImageSequence.Iterator(tutorial_gif_path):
-        frame_copy = frame.convert("RGBA").copy()
-        frame_copy = frame_copy.resize((500, 300))  # resize to 500x300
-        tutorial_frames.append(pygame.image.frombytes(frame_copy.tobytes(), frame_copy.size, "RGBA").convert_alpha())
-        durations.append(frame.info.get('duration', 100))  # default 100ms if not set
+    tutorial_frames, durations = load_optional_frames("Tutorial.gif", (500, 300), with_durations=True)
 
     back_btn = Button((50, 50, 150, 40), "BACK", font=custom_font_login, color=ERROR_COLOR, text_color=WHITE)
     frame_index = 0
@@ -657,7 +2500,7 @@ def tutorial_screen():
             
         # --- Frame update ---
         now = pygame.time.get_ticks()
-        if now - last_frame_time >= durations[frame_index]:
+        if tutorial_frames and now - last_frame_time >= durations[frame_index]:
             frame_index = (frame_index + 1) % len(tutorial_frames)
             last_frame_time = now
         
@@ -682,7 +2525,8 @@ def tutorial_screen():
         # Center
         gif_x = WIN_W // 2 - 250  # center horizontally
         gif_y = 400               # vertical position
-        screen.blit(tutorial_frames[frame_index], (gif_x, gif_y))
+        if tutorial_frames:
+            screen.blit(tutorial_frames[frame_index], (gif_x, gif_y))
         
         
         back_btn.draw(screen)
@@ -690,6 +2534,7 @@ def tutorial_screen():
         pygame.display.flip()
 
 # ------------------- Leaderboard Screen -------------------
+@scene
 def leaderboard_screen(current_username=None):
     back_btn = Button((50, 50, 150, 40), "BACK", font=custom_font_login, color=ERROR_COLOR, text_color=WHITE)
     leaderboard = get_leaderboard()
@@ -747,6 +2592,7 @@ def leaderboard_screen(current_username=None):
         pygame.display.flip()
 
 # ------------------- Main Menu -------------------
+@scene
 def main_menu_screen(username):
     logout_btn = Button((WIN_W - 200, 30, 200, 50), "LOG OUT", text_color=WHITE,font=custom_font_login)
     start_btn = Button((WIN_W//2 - 175, 220, 360, 54), "START GAME", text_color=WHITE, font=custom_font_login)
@@ -757,26 +2603,15 @@ def main_menu_screen(username):
     user_state = users_data['users'].get(username)
     can_continue = user_state and user_state.get('character') is not None
     continue_btn = Button((WIN_W//2 - 130, 430, 260, 54), "CONTINUE", text_color=WHITE, font=custom_font_login) if can_continue else None
+    expedition_btn = Button((WIN_W//2 - 130, 500, 260, 54), "EXPEDITION", text_color=WHITE, font=custom_font_login) if can_continue else None
     
-    exit_btn = Button((WIN_W//2 - 130, 500 if can_continue else 430, 260, 54), "EXIT", text_color=WHITE, font=custom_font_login)
+    exit_btn = Button((WIN_W//2 - 130, 570 if can_continue else 430, 260, 54), "EXIT", text_color=WHITE, font=custom_font_login)
     info = f"LOGGED IN AS {username}"
     
-    pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "intro.mp3"))
-    apply_volume_settings()
-    pygame.mixer.music.play(-1)
+    audio.play("menu")
+    audio.preload("story", "game", "login")
     
-    gif_main_menu_background = Image.open(os.path.join(BASE_DIR, "resources", "images", "MAINMENUBACK.gif"))
-    bg_frames = []
-    
-    try:
-        while True:
-            frame = gif_main_menu_background.copy().convert("RGBA")
-            frame = frame.resize((WIN_W, WIN_H))
-            pygame_frame = pygame.image.frombytes(frame.tobytes(), frame.size, "RGBA").convert_alpha()
-            bg_frames.append(pygame_frame)
-            gif_main_menu_background.seek(gif_main_menu_background.tell() + 1)
-    except EOFError:
-        pass
+    bg_frames = load_gif_frames(os.path.join(IMAGE_DIR, "MAINMENUBACK.gif"), (WIN_W, WIN_H))
     
     bg_frame_index = 0
     
@@ -789,7 +2624,6 @@ def main_menu_screen(username):
                 sys.exit()
             
             if logout_btn.handle_event(event):
-                pygame.mixer.music.stop()
                 return "logout"
             
             if settings_btn.handle_event(event):
@@ -809,15 +2643,16 @@ def main_menu_screen(username):
                 continue
             
             if start_btn.handle_event(event):
-                pygame.mixer.music.stop()
                 story_intro_screen()
                 choice = character_select_screen(username, is_new_game=True)
                 if choice:
                     return "start_game"
             
             if continue_btn and continue_btn.handle_event(event):
-                pygame.mixer.music.stop()
                 return "start_game"
+
+            if expedition_btn and expedition_btn.handle_event(event):
+                return "expedition"
         
         screen.blit(bg_frames[bg_frame_index], (0, 0))
         if pygame.time.get_ticks() % 10 == 0:
@@ -831,6 +2666,7 @@ def main_menu_screen(username):
         leaderboard_btn.draw(screen)
         if continue_btn:
             continue_btn.draw(screen)
+            expedition_btn.draw(screen)
         logout_btn.draw(screen)
         settings_btn.draw(screen)
         exit_btn.draw(screen)
@@ -840,6 +2676,7 @@ def main_menu_screen(username):
         pygame.display.flip()
 
 # ------------------- Character Select Screen -------------------
+@scene
 def character_select_screen(username, is_new_game=False):
     user_data = users_data['users'][username]
     if user_data.get('character') is not None and not is_new_game:
@@ -856,23 +2693,12 @@ def character_select_screen(username, is_new_game=False):
     running = True
     selected_character = None
 
-    character_select_screen = Image.open(os.path.join(BASE_DIR, "resources", "images", "Character_select.gif"))
-    bg_frames = []
-
-    try:
-        while True:
-            frame = character_select_screen.copy().convert("RGBA")
-            frame = frame.resize((WIN_W, WIN_H))
-            pygame_frame = pygame.image.frombytes(frame.tobytes(), frame.size, "RGBA").convert_alpha()
-            bg_frames.append(pygame_frame)
-            character_select_screen.seek(character_select_screen.tell() + 1)
-    except EOFError:
-        pass
+    bg_frames = load_optional_frames("Character_select.gif", (WIN_W, WIN_H)) or [Door_selec_bg]
     
     bg_frame_index = 0
     
+    audio.stop()
     while running:
-        pygame.mixer.music.stop()
         dt = clock.tick(60) / 1000.0
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -890,21 +2716,7 @@ def character_select_screen(username, is_new_game=False):
             
             if selected_character:
                 if is_new_game:
-                    users_data['users'][username].update({
-                        "current_maze": 1,
-                        "maze_seeds": {},
-                        "x": None,
-                        "y": None,
-                        "health": CHARACTERS[selected_character]['health'],
-                        "lives": MAX_LIVES,
-                        "points": 100,
-                        "materials": {"wood": 0, "rope": 0, "metal": 0, "sail": 0},
-                        "completed_quizzes": [],
-                        "achievements": [],
-                        "kills": 0,
-                        "enemies_state": [],
-                        "in_boss_fight": False
-                    })
+                    reset_progress(users_data['users'][username], selected_character)
                 users_data['users'][username]['character'] = selected_character
                 save_users()
                 return selected_character
@@ -941,44 +2753,755 @@ def character_select_screen(username, is_new_game=False):
         draw_cursor(screen)
         pygame.display.flip()
 
-# ------------------- EXPANDED QUESTION POOL (30 questions) -------------------
-QUESTIONS = [
-    # EASY (15 questions)
-    {"id": "e1", "q": "What is 5 + 5?", "choices": ["10", "15", "20", "5"], "answer": 0, "hint": "Basic addition", "difficulty": "easy"},
-    {"id": "e2", "q": "What color is the sky on a clear day?", "choices": ["Blue", "Green", "Red", "Yellow"], "answer": 0, "hint": "Look up", "difficulty": "easy"},
-    {"id": "e3", "q": "How many days in a week?", "choices": ["7", "5", "6", "8"], "answer": 0, "hint": "Count them", "difficulty": "easy"},
-    {"id": "e4", "q": "What is 10 - 3?", "choices": ["7", "6", "8", "5"], "answer": 0, "hint": "Simple subtraction", "difficulty": "easy"},
-    {"id": "e5", "q": "What animal says 'meow'?", "choices": ["Cat", "Dog", "Cow", "Bird"], "answer": 0, "hint": "Feline friend", "difficulty": "easy"},
-    {"id": "e6", "q": "What is 2 x 4?", "choices": ["8", "6", "10", "12"], "answer": 0, "hint": "Basic multiplication", "difficulty": "easy"},
-    {"id": "e7", "q": "How many legs does a spider have?", "choices": ["8", "6", "4", "10"], "answer": 0, "hint": "Arachnid", "difficulty": "easy"},
-    {"id": "e8", "q": "What is the capital of France?", "choices": ["Paris", "London", "Berlin", "Madrid"], "answer": 0, "hint": "City of lights", "difficulty": "easy"},
-    {"id": "e9", "q": "What is 100 / 10?", "choices": ["10", "5", "20", "1"], "answer": 0, "hint": "Simple division", "difficulty": "easy"},
-    {"id": "e10", "q": "How many months in a year?", "choices": ["12", "10", "11", "13"], "answer": 0, "hint": "Calendar year", "difficulty": "easy"},
-    {"id": "e11", "q": "What is frozen water called?", "choices": ["Ice", "Steam", "Rain", "Snow"], "answer": 0, "hint": "Cold solid", "difficulty": "easy"},
-    {"id": "e12", "q": "What planet do we live on?", "choices": ["Earth", "Mars", "Venus", "Jupiter"], "answer": 0, "hint": "Our home", "difficulty": "easy"},
-    {"id": "e13", "q": "How many sides does a triangle have?", "choices": ["3", "4", "5", "6"], "answer": 0, "hint": "Tri means three", "difficulty": "easy"},
-    {"id": "e14", "q": "What is the opposite of hot?", "choices": ["Cold", "Warm", "Cool", "Freezing"], "answer": 0, "hint": "Temperature opposite", "difficulty": "easy"},
-    {"id": "e15", "q": "What do bees make?", "choices": ["Honey", "Milk", "Butter", "Cheese"], "answer": 0, "hint": "Sweet and sticky", "difficulty": "easy"},
-    
-    # AVERAGE (10 questions)
-    {"id": "a1", "q": "What is 15 x 8?", "choices": ["120", "110", "130", "100"], "answer": 0, "hint": "Multiply carefully", "difficulty": "average"},
-    {"id": "a2", "q": "Who wrote 'Romeo and Juliet'?", "choices": ["Shakespeare", "Dickens", "Hemingway", "Tolkien"], "answer": 0, "hint": "English playwright", "difficulty": "average"},
-    {"id": "a3", "q": "What is the square root of 144?", "choices": ["12", "14", "10", "16"], "answer": 0, "hint": "12 squared", "difficulty": "average"},
-    {"id": "a4", "q": "What element has the symbol 'O'?", "choices": ["Oxygen", "Gold", "Silver", "Iron"], "answer": 0, "hint": "We breathe it", "difficulty": "average"},
-    {"id": "a5", "q": "In what year did World War 2 end?", "choices": ["1945", "1944", "1946", "1943"], "answer": 0, "hint": "Mid 1940s", "difficulty": "average"},
-    {"id": "a6", "q": "What is the speed of light (approx)?", "choices": ["300,000 km/s", "150,000 km/s", "500,000 km/s", "100,000 km/s"], "answer": 0, "hint": "Very fast", "difficulty": "average"},
-    {"id": "a7", "q": "What is the largest ocean?", "choices": ["Pacific", "Atlantic", "Indian", "Arctic"], "answer": 0, "hint": "Biggest body of water", "difficulty": "average"},
-    {"id": "a8", "q": "What gas do plants absorb?", "choices": ["CO2", "O2", "N2", "H2"], "answer": 0, "hint": "Photosynthesis", "difficulty": "average"},
-    {"id": "a9", "q": "Who painted the Mona Lisa?", "choices": ["Da Vinci", "Picasso", "Van Gogh", "Monet"], "answer": 0, "hint": "Renaissance artist", "difficulty": "average"},
-    {"id": "a10", "q": "What is the derivative of x^2?", "choices": ["2x", "x", "x^2", "2"], "answer": 0, "hint": "Calculus power rule", "difficulty": "average"},
-    
-    # DIFFICULT (5 questions)
-    {"id": "d1", "q": "What is the Planck constant (approx)?", "choices": ["6.63e-34 J·s", "3.14e-34 J·s", "9.81e-34 J·s", "1.60e-34 J·s"], "answer": 0, "hint": "Quantum physics", "difficulty": "difficult"},
-    {"id": "d2", "q": "Who proved Fermat's Last Theorem?", "choices": ["Andrew Wiles", "Euler", "Gauss", "Riemann"], "answer": 0, "hint": "1990s mathematician", "difficulty": "difficult"},
-    {"id": "d3", "q": "What is the Schrödinger equation for?", "choices": ["Quantum mechanics", "Relativity", "Thermodynamics", "Electromagnetism"], "answer": 0, "hint": "Wave function", "difficulty": "difficult"},
-    {"id": "d4", "q": "What is the Goldbach conjecture about?", "choices": ["Even numbers", "Odd numbers", "Prime gaps", "Perfect numbers"], "answer": 0, "hint": "Unsolved math problem", "difficulty": "difficult"},
-    {"id": "d5", "q": "What is Gödel's incompleteness theorem?", "choices": ["Math limits", "Physics theory", "Logic paradox", "Set theory"], "answer": 0, "hint": "Provability limits", "difficulty": "difficult"}
-]
+# ------------------- Question Bank -------------------
+class QuestionBank:
+    """Questions indexed by id, difficulty and subject.
+
+    Only the index (ids, difficulty, subject) is held for every question; the question
+    text comes in pages of QUESTION_PAGE_SIZE through load_page and is kept in a small
+    LRU, so banks with tens of thousands of questions stay cheap.
+    """
+    def __init__(self, index, load_page, name=""):
+        self.name = name
+        self.load_page = load_page
+        self.ids = [qid for qid, difficulty, subject in index]
+        self.ordinals = {qid: i for i, qid in enumerate(self.ids)}
+        self.by_difficulty = {}
+        self.by_subject = {}
+        self.by_both = {}
+        for i, (qid, difficulty, subject) in enumerate(index):
+            self.by_difficulty.setdefault(difficulty, []).append(i)
+            self.by_subject.setdefault(subject, []).append(i)
+            self.by_both.setdefault((difficulty, subject), []).append(i)
+        self.difficulties = [difficulty for qid, difficulty, subject in index]
+        self.everything = list(range(len(self.ids)))
+        # Only to read saves from before completion was stored by id (see CompletionTracker)
+        self.fingerprint = format(zlib.crc32("\n".join(self.ids).encode("utf-8")), "08x")
+        self.pages = OrderedDict()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, qid):
+        return qid in self.ordinals
+
+    def by_ordinal(self, ordinal):
+        page_no = ordinal // QUESTION_PAGE_SIZE
+        page = self.pages.get(page_no)
+        if page is None:
+            page = self.load_page(page_no)
+            self.pages[page_no] = page
+            if len(self.pages) > QUESTION_PAGE_CACHE:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(page_no)
+        return page[ordinal - page_no * QUESTION_PAGE_SIZE]
+
+    def get(self, qid):
+        ordinal = self.ordinals.get(qid)
+        return None if ordinal is None else self.by_ordinal(ordinal)
+
+    def candidates(self, difficulty=None, subject=None):
+        """Ordinals matching the filters (a shared list, do not modify)"""
+        if difficulty and subject:
+            return self.by_both.get((difficulty, subject), [])
+        if difficulty:
+            return self.by_difficulty.get(difficulty, [])
+        if subject:
+            return self.by_subject.get(subject, [])
+        return self.everything
+
+    def sample(self, count, rng=random):
+        """count distinct random questions (all of them, shuffled, when the bank is smaller)"""
+        ordinals = rng.sample(range(len(self.ids)), min(count, len(self.ids)))
+        return [self.by_ordinal(o) for o in ordinals]
+
+def _question_index_row(q):
+    return q["id"], q.get("difficulty", "easy"), q.get("subject", "general")
+
+def load_json_question_bank(path):
+    with open(path, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    # The JSON bank is edited by hand; say what is wrong instead of failing mid-quiz
+    for problem in validate_questions(questions, os.path.basename(path)):
+        print(f"Question bank: {problem}", file=sys.stderr)
+    pages = [questions[i:i + QUESTION_PAGE_SIZE] for i in range(0, len(questions), QUESTION_PAGE_SIZE)]
+    return QuestionBank([_question_index_row(q) for q in questions], pages.__getitem__, path)
+
+def load_sqlite_question_bank(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    rows = conn.execute("SELECT rowid, id, difficulty, subject FROM questions ORDER BY rowid").fetchall()
+    rowids = [row[0] for row in rows]
+
+    def load_page(page_no):
+        first = page_no * QUESTION_PAGE_SIZE
+        last = min(first + QUESTION_PAGE_SIZE, len(rowids)) - 1
+        page = conn.execute("SELECT id, difficulty, subject, data FROM questions WHERE rowid BETWEEN ? AND ? ORDER BY rowid",
+                            (rowids[first], rowids[last])).fetchall()
+        return [dict(json.loads(data), id=qid, difficulty=difficulty, subject=subject) for qid, difficulty, subject, data in page]
+
+    return QuestionBank([row[1:] for row in rows], load_page, path)
+
+def load_question_bank(path):
+    if path.lower().endswith(".db"):
+        return load_sqlite_question_bank(path)
+    if path.lower().endswith(".pqp"):
+        return load_question_pack(path)
+    return load_json_question_bank(path)
+
+def build_question_db(sources, target):
+    """Write one SQLite bank from JSON question files, in a single transaction"""
+    conn = sqlite3.connect(target)
+    conn.execute("CREATE TABLE IF NOT EXISTS questions (id TEXT PRIMARY KEY, difficulty TEXT NOT NULL, subject TEXT NOT NULL, data TEXT NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS questions_difficulty ON questions (difficulty, subject)")
+    rows = []
+    for source in sources:
+        with open(source, "r", encoding="utf-8") as f:
+            rows.extend((*_question_index_row(q), json.dumps({k: v for k, v in q.items() if k not in ("id", "difficulty", "subject")}))
+                        for q in json.load(f))
+    # Same difficulty and subject end up on neighbouring pages, so filtered picks hit few pages
+    rows.sort(key=lambda row: (row[1], row[2]))
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO questions (id, difficulty, subject, data) VALUES (?, ?, ?, ?)", rows)
+    conn.close()
+    return len(rows)
+
+def question_db_command(args):
+    count = build_question_db(args.sources, args.target)
+    print(f"Wrote {count} questions to {args.target}")
+    return 0
+
+# ------------------- Question Packs -------------------
+# Header: magic, version, max choices, question count, string count, then the offsets of
+# the string offset table, string bytes, question records, choice string ids and
+# permutation tables. Every section starts on a 4-byte boundary so it can be cast in place.
+PACK_MAGIC = b"PVQP"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sHHIIIIIII")
+# id, text, hint, subject, first choice id slot, difficulty level, choice count, answer
+PACK_RECORD = struct.Struct("<IIIIIBBBx")
+
+def _permutation_tables(k):
+    """All orderings of k choices and, per ordering, where each choice lands"""
+    perms = list(itertools.permutations(range(k)))
+    inverse = []
+    for perm in perms:
+        where = [0] * k
+        for pos, choice in enumerate(perm):
+            where[choice] = pos
+        inverse.append(tuple(where))
+    return perms, inverse
+
+CHOICE_PERMUTATIONS = {k: _permutation_tables(k) for k in range(1, MAX_CHOICES + 1)}
+
+def shuffle_choices(question, rng=random):
+    """Random display order of a question's choices as (order, answer position).
+    order[i] is the bank index of the choice shown at position i; both come from the
+    shared permutation tables, so nothing is copied."""
+    tables = CHOICE_PERMUTATIONS.get(len(question["choices"]))
+    if tables is None:
+        # More choices than the tables cover (a hand-edited bank): shuffle the slow way
+        order = tuple(rng.sample(range(len(question["choices"])), len(question["choices"])))
+        return order, order.index(question["answer"])
+    perms, inverse = tables
+    row = rng.randrange(len(perms))
+    return perms[row], inverse[row][question["answer"]]
+
+def validate_questions(questions, source=""):
+    """Problems with a list of question dicts, as messages; empty when all is well"""
+    errors = []
+    for n, q in enumerate(questions, 1):
+        where = f"{source} #{n}" + (f" ({q.get('id')})" if isinstance(q, dict) and q.get("id") else "")
+        if not isinstance(q, dict):
+            errors.append(f"{where}: not an object")
+            continue
+        if not isinstance(q.get("id"), str) or not q["id"]:
+            errors.append(f"{where}: missing id")
+        if not isinstance(q.get("q"), str) or not q["q"].strip():
+            errors.append(f"{where}: missing question text")
+        choices = q.get("choices")
+        if not isinstance(choices, list) or not all(isinstance(c, str) and c.strip() for c in choices):
+            errors.append(f"{where}: choices must be a list of non-empty strings")
+            continue
+        if not 2 <= len(choices) <= MAX_CHOICES:
+            errors.append(f"{where}: {len(choices)} choices, expected 2 to {MAX_CHOICES}")
+        seen = set()
+        for choice in choices:
+            key = " ".join(choice.split()).casefold()
+            if key in seen:
+                errors.append(f"{where}: duplicate choice {choice!r}")
+            seen.add(key)
+        answer = q.get("answer")
+        if not isinstance(answer, int) or isinstance(answer, bool) or not 0 <= answer < len(choices):
+            errors.append(f"{where}: answer {answer!r} out of range for {len(choices)} choices")
+        if q.get("difficulty", "easy") not in DIFFICULTY_ORDER:
+            errors.append(f"{where}: unknown difficulty {q.get('difficulty')!r}")
+        for field in ("subject", "hint"):
+            if not isinstance(q.get(field, ""), str):
+                errors.append(f"{where}: {field} must be a string")
+    return errors
+
+def _pad4(buf):
+    buf.extend(bytes(-len(buf) % 4))
+
+def compile_question_pack(questions):
+    """Pack bytes for already validated questions, interning every string once"""
+    strings, string_ids = [], {}
+    def intern(text):
+        i = string_ids.get(text)
+        if i is None:
+            i = string_ids[text] = len(strings)
+            strings.append(text)
+        return i
+    # Same difficulty and subject on neighbouring pages, as in the SQLite bank
+    questions = sorted(questions, key=lambda q: (difficulty_level(q.get("difficulty", "easy")), q.get("subject", "general")))
+    records, choice_ids = bytearray(), array("I")
+    for q in questions:
+        records += PACK_RECORD.pack(intern(q["id"]), intern(q["q"]), intern(q.get("hint", "")), intern(q.get("subject", "general")),
+                                    len(choice_ids), difficulty_level(q.get("difficulty", "easy")), len(q["choices"]), q["answer"])
+        choice_ids.extend(intern(choice) for choice in q["choices"])
+    blob, offsets = bytearray(), array("I", [0])
+    for text in strings:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        choice_ids.byteswap()
+    max_choices = max((len(q["choices"]) for q in questions), default=0)
+    perm_bytes = bytearray()
+    for k in range(1, max_choices + 1):
+        perms, inverse = CHOICE_PERMUTATIONS[k]
+        for row in perms + inverse:
+            perm_bytes += bytes(row)
+
+    body = bytearray(PACK_HEADER.size)
+    sections = []
+    for section in (offsets.tobytes(), blob, records, choice_ids.tobytes(), perm_bytes):
+        _pad4(body)
+        sections.append(len(body))
+        body += section
+    PACK_HEADER.pack_into(body, 0, PACK_MAGIC, PACK_VERSION, max_choices, len(questions), len(strings), *sections)
+    return bytes(body)
+
+def load_question_pack(path):
+    """Memory-map a compiled pack. Nothing is parsed up front beyond the small header:
+    the string tables are cast in place, the index is one struct pass over fixed-size
+    records, and question text is decoded a page at a time."""
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(data)
+    magic, version, max_choices, count, nstrings, offsets_at, blob_at, records_at, choices_at, perms_at = PACK_HEADER.unpack_from(view)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"{path} is not a version {PACK_VERSION} question pack")
+    if sys.byteorder == "little":
+        offsets = view[offsets_at:offsets_at + 4 * (nstrings + 1)].cast("I")
+        choice_slots = view[choices_at:perms_at].cast("I")
+    else:
+        offsets, choice_slots = array("I", view[offsets_at:blob_at]), array("I", view[choices_at:perms_at])
+        offsets.byteswap()
+        choice_slots.byteswap()
+    # The pack carries its own permutation tables; they match the ones built here
+    for k in range(1, max_choices + 1):
+        if k not in CHOICE_PERMUTATIONS:
+            CHOICE_PERMUTATIONS[k] = _permutation_tables(k)
+    interned = {}
+
+    def string(i):
+        text = interned.get(i)
+        if text is None:
+            text = interned[i] = str(view[blob_at + offsets[i]:blob_at + offsets[i + 1]], "utf-8")
+        return text
+
+    records = list(PACK_RECORD.iter_unpack(view[records_at:records_at + PACK_RECORD.size * count]))
+    index = [(string(r[0]), DIFFICULTY_ORDER[r[5]], string(r[3])) for r in records]
+    interned.clear()  # Ids stay referenced by the index; question text is not worth keeping twice
+
+    def load_page(page_no):
+        page = []
+        for r in records[page_no * QUESTION_PAGE_SIZE:(page_no + 1) * QUESTION_PAGE_SIZE]:
+            qid, text, hint, subject, first, level, nchoices, answer = r
+            page.append({
+                "id": index[len(page) + page_no * QUESTION_PAGE_SIZE][0],
+                "subject": string(subject),
+                "difficulty": DIFFICULTY_ORDER[level],
+                "q": string(text),
+                "choices": [string(choice_slots[first + c]) for c in range(nchoices)],
+                "answer": answer,
+                "hint": string(hint)
+            })
+        return page
+
+    bank = QuestionBank(index, load_page, path)
+    bank.mapping = data  # Keeps the map open for as long as the bank lives
+    return bank
+
+def question_pack_command(args):
+    questions, errors, owners = [], [], {}
+    for source in args.sources:
+        with open(source, "r", encoding="utf-8") as f:
+            batch = json.load(f)
+        errors.extend(validate_questions(batch, source))
+        for n, q in enumerate(batch, 1):
+            if isinstance(q, dict) and isinstance(q.get("id"), str):
+                if q["id"] in owners:
+                    errors.append(f"{source} #{n} ({q['id']}): duplicate id, first seen in {owners[q['id']]}")
+                owners.setdefault(q["id"], f"{source} #{n}")
+        questions.extend(batch)
+    if errors:
+        for error in errors:
+            print(error)
+        print(f"{len(errors)} problem(s); no pack written")
+        return 1
+    with open(args.target + ".tmp", "wb") as f:
+        f.write(compile_question_pack(questions))
+    os.replace(args.target + ".tmp", args.target)
+    print(f"Wrote {len(questions)} questions to {args.target}")
+    return 0
+
+QUESTION_BANK = load_question_bank(QUESTION_BANK_FILE)
+
+# ------------------- Quiz Completion Tracking -------------------
+def _b64_bits(bits):
+    return base64.b64encode(bytes(bits).rstrip(b"\0")).decode("ascii")
+
+class CompletionTracker:
+    """Quiz tiles and questions a player has finished, kept apart as bitsets.
+
+    Tiles get one bitmap per maze (bit row * cols + col), questions one bitmap by
+    question-bank ordinal, so every check is a single bit test. Unseen questions wait
+    in per-difficulty pools with swap-remove, so drawing one is O(1) too. Answered
+    questions are saved as their ids, not ordinals, so adding, removing or reordering
+    questions (or switching to a .db/.pqp bank) keeps every player's progress.
+    """
+    def __init__(self, bank):
+        self.bank = bank
+        self.tiles = {}  # maze key -> [cols, bytearray]
+        self.questions = bytearray((len(bank) + 7) // 8)
+        self.retired = []  # Answered ids the bank no longer has; kept in case they come back
+        self.pools = {}  # difficulty -> unseen ordinals, built on first draw
+        self.slots = {}  # ordinal -> index in its pool
+
+    @classmethod
+    def from_profile(cls, record, bank):
+        tracker = cls(bank)
+        progress = record.get("quiz_progress")
+        if progress is not None:
+            for key, (cols, bits) in progress.get("tiles", {}).items():
+                tracker.tiles[key] = [cols, bytearray(base64.b64decode(bits))]
+            for qid in progress.get("seen", []):
+                if qid in bank:
+                    tracker.mark_question(qid)
+                else:
+                    tracker.retired.append(qid)
+            if "questions" in progress and progress.get("bank") == bank.fingerprint:
+                # Earlier saves held a bitmap by ordinal, readable only against the same bank
+                raw = base64.b64decode(progress["questions"])[:len(tracker.questions)]
+                tracker.questions[:len(raw)] = raw
+        else:
+            # Saves from before bitsets: one list mixing tile ids and question ids
+            for quiz_id in record.get("completed_quizzes", []):
+                parsed = _parse_tile_quiz_id(quiz_id)
+                if parsed:
+                    tracker.mark_tile(parsed[0], parsed[1], parsed[2], COLS)
+                else:
+                    tracker.mark_question(quiz_id)
+            record["quiz_progress"] = tracker.to_profile()
+        record.pop("completed_quizzes", None)
+        return tracker
+
+    def seen_ids(self):
+        """Ids of every answered question, sorted"""
+        ids = self.bank.ids
+        seen = [ids[(i << 3) + bit] for i, byte in enumerate(self.questions) if byte for bit in SET_BITS[byte]]
+        return sorted(seen + self.retired)
+
+    def to_profile(self):
+        return {
+            "seen": self.seen_ids(),
+            "tiles": {key: [cols, _b64_bits(bits)] for key, (cols, bits) in self.tiles.items()}
+        }
+
+    def has_tile(self, maze_key, col, row):
+        entry = self.tiles.get(str(maze_key))
+        if entry is None or col >= entry[0]:
+            return False
+        i = row * entry[0] + col
+        bits = entry[1]
+        return (i >> 3) < len(bits) and bits[i >> 3] >> (i & 7) & 1 == 1
+
+    def mark_tile(self, maze_key, col, row, cols):
+        entry = self.tiles.get(str(maze_key))
+        if entry is None or entry[0] != cols:
+            entry = self.tiles[str(maze_key)] = [cols, bytearray()]
+        i = row * cols + col
+        bits = entry[1]
+        if (i >> 3) >= len(bits):
+            bits.extend(bytes((i >> 3) + 1 - len(bits)))
+        bits[i >> 3] |= 1 << (i & 7)
+
+    def has_question(self, qid):
+        ordinal = self.bank.ordinals.get(qid)
+        return ordinal is not None and self.questions[ordinal >> 3] >> (ordinal & 7) & 1 == 1
+
+    def mark_question(self, qid):
+        ordinal = self.bank.ordinals.get(qid)
+        if ordinal is None:
+            return
+        self.questions[ordinal >> 3] |= 1 << (ordinal & 7)
+        slot = self.slots.pop(ordinal, None)
+        if slot is not None:
+            pool = self.pools[self.bank.difficulties[ordinal]]
+            last = pool.pop()
+            if last != ordinal:
+                pool[slot] = last
+                self.slots[last] = slot
+
+    def _pool(self, difficulty):
+        pool = self.pools.get(difficulty)
+        if pool is None:
+            bits = self.questions
+            pool = self.pools[difficulty] = [o for o in self.bank.candidates(difficulty) if not bits[o >> 3] >> (o & 7) & 1]
+            for slot, ordinal in enumerate(pool):
+                self.slots[ordinal] = slot
+        return pool
+
+    def unseen_count(self, difficulty=None):
+        if difficulty:
+            return len(self._pool(difficulty))
+        return sum(len(self._pool(d)) for d in self.bank.by_difficulty)
+
+    def draw_unseen(self, difficulty=None, rng=random):
+        """Random unseen question of that difficulty (any difficulty if None), or None"""
+        if difficulty:
+            pool = self._pool(difficulty)
+            return self.bank.by_ordinal(pool[rng.randrange(len(pool))]) if pool else None
+        total = self.unseen_count()
+        if not total:
+            return None
+        pick = rng.randrange(total)
+        for d in self.bank.by_difficulty:
+            pool = self._pool(d)
+            if pick < len(pool):
+                return self.bank.by_ordinal(pool[pick])
+            pick -= len(pool)
+
+# ------------------- Adaptive Question Scheduling -------------------
+def _smoothed_accuracy(attempts, correct):
+    return (correct + 1) / (attempts + 2)
+
+def _update_entry(entry, correct, latency_ms):
+    """[attempts, correct, avg_ms] after one more answer"""
+    attempts, right, avg_ms = entry
+    avg_ms = latency_ms if attempts == 0 else avg_ms + LATENCY_SMOOTHING * (latency_ms - avg_ms)
+    return [attempts + 1, right + (1 if correct else 0), round(avg_ms)]
+
+def difficulty_level(difficulty):
+    return DIFFICULTY_ORDER.index(difficulty) if difficulty in DIFFICULTY_ORDER else len(DIFFICULTY_ORDER)
+
+def target_level(by_difficulty):
+    """Easiest difficulty the player has not mastered yet (the hardest once all are)"""
+    for level, difficulty in enumerate(DIFFICULTY_ORDER):
+        attempts, correct, avg_ms = by_difficulty.get(difficulty, (0, 0, 0))
+        if _smoothed_accuracy(attempts, correct) < ADAPTIVE_TARGET_ACCURACY:
+            return level
+    return len(DIFFICULTY_ORDER) - 1
+
+def build_question_queues(bank, unseen, questions, by_difficulty, now, rng):
+    """Score the bank once: a heap of fresh questions nearest the player's level, and a
+    heap of review questions, due and weak ones first. Keys end with the ordinal."""
+    level = target_level(by_difficulty)
+    time_limit_ms = QUIZ_TIME_LIMIT * 1000
+    fresh, review = [], []
+    for ordinal, qid in enumerate(bank.ids):
+        if ordinal & 2047 == 2047:
+            time.sleep(0)  # Big banks: hand the GIL back to the frame loop now and then
+        jitter = rng.random()
+        if unseen(ordinal):
+            fresh.append((abs(difficulty_level(bank.difficulties[ordinal]) - level), jitter, ordinal))
+        entry = questions.get(qid)
+        if entry is None:
+            score = 1.0  # Never asked: between a known weak spot and a known strength
+        else:
+            attempts, correct, avg_ms, box, due = entry
+            score = 1 - _smoothed_accuracy(attempts, correct) + 0.5 * min(avg_ms / time_limit_ms, 1)
+            if due <= now:
+                score += 1.0
+        review.append((-score, jitter, ordinal))
+    heapq.heapify(fresh)
+    heapq.heapify(review)
+    return level, fresh, review
+
+scheduler_worker = BackgroundWorker("question-scheduler")
+
+class QuestionScheduler:
+    """Per-player adaptive question order with spaced repetition.
+
+    Accuracy and response time are kept per question and per difficulty in the
+    profile's question_stats. The bank is scored into priority queues at session start
+    and again whenever the player's level changes, so picking a question in play is a
+    heap pop. Rebuilds run one at a time on scheduler_worker; level changes during a
+    rebuild are folded into the next one, and until queues land picks fall back to the
+    plain samplers instead of waiting.
+    """
+    def __init__(self, bank, tracker, record, rng=random):
+        self.bank = bank
+        self.tracker = tracker
+        self.rng = rng
+        stats = record.get("question_stats") or {}
+        self.questions = dict(stats.get("questions", {}))  # qid -> [attempts, correct, avg_ms, box, due]
+        self.by_difficulty = dict(stats.get("difficulty", {}))  # difficulty -> [attempts, correct, avg_ms]
+        self.level = target_level(self.by_difficulty)
+        self.fresh = None
+        self.review = None
+        self.pending = None
+
+    def to_profile(self):
+        return {"questions": self.questions, "difficulty": self.by_difficulty}
+
+    def start(self):
+        """Queue a rebuild on the worker from a snapshot of the stats"""
+        if self.pending is not None and not self.pending.done():
+            return self  # _collect starts another if the level moved meanwhile
+        unseen_bits = bytes(self.tracker.questions)
+        unseen = lambda o: not unseen_bits[o >> 3] >> (o & 7) & 1
+        self.pending = scheduler_worker.submit(build_question_queues, self.bank, unseen, dict(self.questions),
+                                               dict(self.by_difficulty), time.time(), random.Random(self.rng.random()))
+        return self
+
+    def _collect(self):
+        if self.pending is None or not self.pending.done():
+            return
+        job, self.pending = self.pending, None
+        try:
+            level, self.fresh, self.review = job.wait()
+        except Exception as exc:
+            print(f"Question scheduling failed: {exc}")
+            return
+        if level != self.level:
+            self.start()  # Answers came in while the queues were built
+
+    def next_fresh(self):
+        """Unseen question closest to the player's level, or None when all are seen"""
+        self._collect()
+        tracker = self.tracker
+        while self.fresh:
+            ordinal = heapq.heappop(self.fresh)[-1]
+            if tracker.questions[ordinal >> 3] >> (ordinal & 7) & 1:
+                continue  # Answered since the queue was built
+            return self.bank.by_ordinal(ordinal)
+        # Queue still building or used up: fall back to the plain unseen sampler
+        if self.level < len(DIFFICULTY_ORDER):
+            question = tracker.draw_unseen(DIFFICULTY_ORDER[self.level], self.rng)
+            if question:
+                return question
+        return tracker.draw_unseen(rng=self.rng)
+
+    def review_round(self, count):
+        """count questions for a boss round, weakest and most overdue first"""
+        self._collect()
+        picked = []
+        while self.review and len(picked) < count:
+            picked.append(self.bank.by_ordinal(heapq.heappop(self.review)[-1]))
+        self.start()  # Fresh review order for the next round
+        # Queues not built yet: a random round now beats a frozen boss screen
+        return picked if picked else self.bank.sample(count, self.rng)
+
+    def record(self, question, correct, latency):
+        """Fold one answer into the stats; latency in seconds"""
+        latency_ms = latency * 1000
+        qid, difficulty = question["id"], question.get("difficulty")
+        attempts, right, avg_ms, box, due = self.questions.get(qid, (0, 0, 0, 0, 0))
+        attempts, right, avg_ms = _update_entry([attempts, right, avg_ms], correct, latency_ms)
+        # Leitner boxes: a right answer doubles the wait before the next review, a wrong one resets it
+        box = min(box + 1, REVIEW_MAX_BOX) if correct else 0
+        due = int(time.time() + (REVIEW_BASE_INTERVAL * 2 ** (box - 1) if box else 0))
+        self.questions[qid] = [attempts, right, avg_ms, box, due]
+        if difficulty:
+            self.by_difficulty[difficulty] = _update_entry(self.by_difficulty.get(difficulty, [0, 0, 0]), correct, latency_ms)
+        level = target_level(self.by_difficulty)
+        if level != self.level:
+            self.level = level
+            self.start()
+
+# ------------------- Quiz Telemetry -------------------
+class QuizTelemetry:
+    """Answer events in a preallocated ring buffer of array columns.
+
+    log() runs on the frame loop and only stores numbers into existing slots: no
+    per-event objects, locks or file I/O. A background thread turns batches into
+    JSONL lines; if it falls a whole buffer behind, new events are counted and dropped.
+    """
+    SOURCES = ("quiz", "boss")
+
+    def __init__(self, path, names=(), capacity=TELEMETRY_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.names = []  # Interned strings: question ids, usernames, characters
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+        self.time = array("d", bytes(8 * capacity))
+        self.question = array("i", bytes(4 * capacity))
+        self.choice = array("b", bytes(capacity))  # Index in the bank's choice order, -1 on timeout
+        self.correct = array("b", bytes(capacity))
+        self.latency = array("i", bytes(4 * capacity))  # Milliseconds
+        self.user = array("i", bytes(4 * capacity))
+        self.character = array("i", bytes(4 * capacity))
+        self.maze = array("i", bytes(4 * capacity))
+        self.source = array("b", bytes(capacity))
+        self.head = 0  # Events logged; only log() moves it
+        self.tail = 0  # Events written out; only flush() moves it
+        self.dropped = 0
+        self.session = (-1, -1, 0)
+        self.lock = threading.Lock()  # Between the flusher thread and the exit flush, never the frame loop
+        self.wake = threading.Event()
+        self.thread = None
+
+    def intern(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def begin_session(self, username, character, maze):
+        """Who and where later events belong to; interns outside the frame loop"""
+        self.session = (self.intern(username), self.intern(character), maze if isinstance(maze, int) else 0)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="quiz-telemetry", daemon=True)
+            self.thread.start()
+
+    def log(self, source, question_id, choice, correct, latency):
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+        i = head % self.capacity
+        qid = self.ids.get(question_id)
+        self.time[i] = time.time()
+        self.question[i] = qid if qid is not None else self.intern(question_id)
+        self.choice[i] = choice
+        self.correct[i] = 1 if correct else 0
+        self.latency[i] = int(latency * 1000)
+        self.user[i], self.character[i], self.maze[i] = self.session
+        self.source[i] = 1 if source == "boss" else 0
+        self.head = head + 1
+        if head + 1 - self.tail >= self.capacity // 2:
+            self.wake.set()
+
+    def flush(self):
+        """Append everything logged so far to the events file; returns the event count"""
+        with self.lock:
+            head, tail = self.head, self.tail
+            if head == tail:
+                return 0
+            names, lines = self.names, []
+            for n in range(tail, head):
+                i = n % self.capacity
+                user, character = self.user[i], self.character[i]
+                lines.append(json.dumps({
+                    "t": round(self.time[i], 3),
+                    "user": names[user] if user >= 0 else None,
+                    "character": names[character] if character >= 0 else None,
+                    "maze": self.maze[i],
+                    "source": self.SOURCES[self.source[i]],
+                    "question": names[self.question[i]],
+                    "choice": self.choice[i] if self.choice[i] >= 0 else None,
+                    "correct": bool(self.correct[i]),
+                    "latency_ms": self.latency[i]
+                }, separators=(",", ":")) + "\n")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            self.tail = head
+            if self.dropped:
+                print(f"Quiz telemetry dropped {self.dropped} events")
+                self.dropped = 0
+            return head - tail
+
+    def _run(self):
+        while True:
+            self.wake.wait(TELEMETRY_FLUSH_INTERVAL)
+            self.wake.clear()
+            try:
+                self.flush()
+            except OSError as exc:
+                print(f"Could not write {self.path}: {exc}")
+
+quiz_telemetry = QuizTelemetry(TELEMETRY_FILE, QUESTION_BANK.ids)
+atexit.register(quiz_telemetry.flush)
+
+def _correlation(xs, ys):
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    return sxy / math.sqrt(sxx * syy) if sxx and syy else None
+
+def quiz_report(events):
+    """Per-question rows from answer events. p_correct is the classical difficulty index;
+    discrimination is the point-biserial correlation between answering the question right
+    and the same player's accuracy on every other question."""
+    per_question, per_user, per_pair = {}, {}, {}
+    for event in events:
+        qid, user, correct = event["question"], event.get("user"), 1 if event["correct"] else 0
+        per_question.setdefault(qid, []).append((user, correct, event.get("latency_ms") or 0))
+        totals = per_user.setdefault(user, [0, 0])
+        totals[0] += 1
+        totals[1] += correct
+        pair = per_pair.setdefault((user, qid), [0, 0])
+        pair[0] += 1
+        pair[1] += correct
+    rows = []
+    for qid in sorted(per_question):
+        answers = per_question[qid]
+        xs, ys = [], []
+        for user, correct, latency in answers:
+            n, right = per_user[user]
+            pn, pright = per_pair[(user, qid)]
+            if n > pn:
+                xs.append(correct)
+                ys.append((right - pright) / (n - pn))
+        ordinal = QUESTION_BANK.ordinals.get(qid)
+        discrimination = _correlation(xs, ys) if len(xs) > 1 else None
+        rows.append({
+            "id": qid,
+            "difficulty": QUESTION_BANK.difficulties[ordinal] if ordinal is not None else "",
+            "answers": len(answers),
+            "players": len({user for user, correct, latency in answers}),
+            "p_correct": round(sum(correct for user, correct, latency in answers) / len(answers), 3),
+            "mean_latency_ms": round(sum(latency for user, correct, latency in answers) / len(answers)),
+            "discrimination": round(discrimination, 3) if discrimination is not None else None
+        })
+    return rows
+
+def read_events(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by a crash
+            if isinstance(event, dict) and "question" in event and "correct" in event:
+                yield event
+
+def quiz_report_command(args):
+    try:
+        rows = quiz_report(read_events(args.events))
+    except FileNotFoundError:
+        print(f"No quiz events in {args.events}")
+        return 1
+    print(f"{'id':<10}{'difficulty':<12}{'answers':>8}{'players':>8}{'p_correct':>10}{'latency':>9}{'discrim':>9}")
+    for row in rows:
+        disc = "-" if row["discrimination"] is None else f"{row['discrimination']:.2f}"
+        print(f"{row['id']:<10}{row['difficulty']:<12}{row['answers']:>8}{row['players']:>8}"
+              f"{row['p_correct']:>10.2f}{row['mean_latency_ms']:>7}ms{disc:>9}")
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["id"])
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
 
 # ------------------- Part 2: Game Classes -------------------
 def generate_maze(seed=None):
@@ -1029,6 +3552,7 @@ def generate_maze(seed=None):
     
     return maze
 
+# World coordinates: where a tile would be on screen with the camera at (0, 0)
 def tile_to_screen(col, row):
     x = col * TILE + (WIN_W - COLS * TILE) // 2  # Center the maze horizontally
     y = row * TILE + 100
@@ -1067,6 +3591,7 @@ class Enemy:
             self.dmg = self.base_dmg + (self.level - 1) * ENEMY_SCALE_PER_SEC_DMG * 10
             self.speed = ENEMY_BASE_SPEED + min(ENEMY_MAX_SPEED_BONUS, (level - 1) * 10)
             self.last_attack_time = 0
+        self.animator = Animator(ANIMATION_SETS["Enemy"], "walk")
 
 class Player:
     def __init__(self, character='Tank'):
@@ -1089,27 +3614,32 @@ class Player:
         self.last_attack_time = 0  # NEW: Track last attack time for cooldown
         self.is_moving = False
         self.is_attacking = False
+        self.animator = Animator(ANIMATION_SETS.get(character))
 
 class GameMaze:
     def __init__(self, seed=None):
         self.grid = generate_maze(seed)
+        self.rows, self.cols = len(self.grid), len(self.grid[0])
         self.quiz_tiles = set()
         self.door_tiles = set()
+        self.chunks = {}  # (chunk col, chunk row) -> pre-rendered wall and path tiles
+        self.chunk_items = {}  # (chunk col, chunk row) -> [(col, row, tile)] quizzes and doors in it
         # REMOVED: destructibles initialization
-        rows, cols = ROWS, COLS
-        for r in range(rows):
-            for c in range(cols):
+        for r in range(self.rows):
+            for c in range(self.cols):
                 v = self.grid[r][c]
                 if v == 2:
                     self.quiz_tiles.add((c, r))
                 elif v == 3:
                     self.door_tiles.add((c, r))
+                if v in (2, 3):
+                    self.chunk_items.setdefault((c // CHUNK_TILES, r // CHUNK_TILES), []).append((c, r, v))
                 # REMOVED: destructible blocks initialization
     
     def get_empty_path_tiles(self):
         empties = []
-        for r in range(ROWS):
-            for c in range(COLS):
+        for r in range(self.rows):
+            for c in range(self.cols):
                 if self.grid[r][c] == 0 and \
                    (c, r) not in self.quiz_tiles and \
                    (c, r) not in self.door_tiles:
@@ -1117,7 +3647,7 @@ class GameMaze:
         return empties
     
     def is_blocked(self, c, r):
-        if r < 0 or r >= ROWS or c < 0 or c >= COLS:
+        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
             return True
         if self.grid[r][c] == 1:
             return True
@@ -1144,21 +3674,15 @@ class HUD:
 hud = HUD()
 
 # ------------------- Victory Video Screen -------------------
+@scene
 def victory_video_screen():
     # Play victory music
-    pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "Credit.MP3"))
-    apply_volume_settings()
-    pygame.mixer.music.play(-1)
+    audio.play("victory")
 
     # Load GIF frames
-    Video_credit = Image.open(os.path.join(BASE_DIR, "resources", "images", "CREDITS.gif"))
-    frames = []
-    durations = []
-
-    for frame in ImageSequence.Iterator(Video_credit):
-        frame_copy = frame.convert("RGBA").resize((WIN_W, WIN_H))
-        frames.append(pygame.image.frombytes(frame_copy.tobytes(), frame_copy.size, "RGBA").convert_alpha())
-        durations.append(frame.info.get("duration", 100))  # Default 100ms per frame
+    frames, durations = load_optional_frames("CREDITS.gif", (WIN_W, WIN_H), with_durations=True)
+    if not frames:
+        return  # Cutscene not installed, go straight to the credits
     frame_index = 0
 
     total_duration = sum(durations)  # total time of GIF
@@ -1211,15 +3735,10 @@ def victory_video_screen():
         pygame.display.flip()
 """
 # ------------------- Credits Screen -------------------
+@scene
 def credits_screen(username):
-    pygame.mixer.music.stop()
-
-    # --- PLAY NEW CREDITS MUSIC ---
-    # Load your credits music file here
-    credits_music = os.path.join(BASE_DIR, "resources", "sounds", "credits_music.mp3")
-    pygame.mixer.music.load(credits_music)# play credits music
-    apply_volume_settings()          
-    pygame.mixer.music.play(-1)# -1 = loop forever
+    # --- PLAY CREDITS MUSIC ---
+    audio.play("credits")
     """
     credits_text = [
         ("PROVENTURE", 2.0, HUGE, (255, 215, 0)),
@@ -1298,19 +3817,119 @@ def credits_screen(username):
 
         pygame.display.flip()
 
+# ------------------- Question Layout -------------------
+QUESTION_TEXT_WIDTH = WIN_W - 160
+CHOICE_MIN_WIDTH = 400
+CHOICE_PADDING = 16
+CHOICE_SPACING = 20
+
+def wrap_text(text, font, max_width):
+    """Split text into lines no wider than max_width, measuring with font.size"""
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if font.size(candidate)[0] <= max_width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            # A single word wider than the box gets broken by characters
+            while font.size(word)[0] > max_width and len(word) > 1:
+                cut = len(word) - 1
+                while cut > 1 and font.size(word[:cut])[0] > max_width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+def render_lines(lines, font, color):
+    """Lines centred on one transparent surface, as narrow as the widest line"""
+    line_h = font.get_linesize()
+    rendered = [font.render(line, True, color) for line in lines]
+    width = max([1] + [text_surface.get_width() for text_surface in rendered])
+    surf = pygame.Surface((width, max(1, line_h * len(lines))), pygame.SRCALPHA)
+    for i, text_surface in enumerate(rendered):
+        surf.blit(text_surface, text_surface.get_rect(midtop=(width // 2, i * line_h)))
+    return surf.convert_alpha()
+
+class QuestionLayout:
+    """A question and its answer buttons, wrapped, sized and rendered once.
+    style "image" draws buttons with button_img, "panel" as the boss fight's outlined boxes."""
+    def __init__(self, text, choices, top, question_font, choice_font, style="image"):
+        self.question_surface = render_lines(wrap_text(text, question_font, QUESTION_TEXT_WIDTH), question_font, WHITE)
+        self.question_pos = self.question_surface.get_rect(midtop=(WIN_W // 2, top)).topleft
+        text_width = QUESTION_TEXT_WIDTH - 2 * CHOICE_PADDING
+        labels = [render_lines(wrap_text(choice, choice_font, text_width), choice_font, WHITE) for choice in choices]
+        # Every button gets the width of the widest label so the column lines up
+        width = min(max([CHOICE_MIN_WIDTH] + [label.get_width() + 2 * CHOICE_PADDING for label in labels]), QUESTION_TEXT_WIDTH)
+        self.rects = []
+        self.normal = []
+        self.hover = []
+        y = top + self.question_surface.get_height() + CHOICE_SPACING
+        for label in labels:
+            height = max(50, label.get_height() + CHOICE_PADDING)
+            rect = pygame.Rect(WIN_W // 2 - width // 2, y, width, height)
+            self.rects.append(rect)
+            self.normal.append(self._button(rect, label, style, BUTTON_COLOR))
+            self.hover.append(self._button(rect, label, style, BUTTON_HOVER))
+            y += height + CHOICE_SPACING
+        self.bottom = y
+
+    @staticmethod
+    def _button(rect, label, style, color):
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        local = surf.get_rect()
+        if style == "image":
+            surf.blit(pygame.transform.scale(button_img, rect.size), (0, 0))
+        else:
+            pygame.draw.rect(surf, color, local, border_radius=5)
+            pygame.draw.rect(surf, WHITE, local, 2, border_radius=5)
+        surf.blit(label, label.get_rect(center=local.center))
+        return surf.convert_alpha()
+
+    def choice_at(self, pos):
+        for i, rect in enumerate(self.rects):
+            if rect.collidepoint(pos):
+                return i
+        return None
+
+    def draw(self, surf, mouse_pos):
+        surf.blit(self.question_surface, self.question_pos)
+        hovered = self.choice_at(mouse_pos)
+        for i, rect in enumerate(self.rects):
+            surf.blit(self.hover[i] if i == hovered else self.normal[i], rect)
+
+_question_layouts = OrderedDict()
+
+def question_layout(question, order, top, question_font, choice_font, style="image"):
+    """Cached QuestionLayout for this question, choice order (bank indices), fonts and style"""
+    key = (question.get("id"), question["q"], order, top, question_font, choice_font, style)
+    layout = _question_layouts.get(key)
+    if layout is None:
+        choices = [question["choices"][i] for i in order]
+        layout = _question_layouts[key] = QuestionLayout(question["q"], choices, top, question_font, choice_font, style)
+        if len(_question_layouts) > 64:
+            _question_layouts.popitem(last=False)
+    else:
+        _question_layouts.move_to_end(key)
+    return layout
+
 # ------------------- Educational Boss Fight Screen -------------------
 # ------------------- Educational Boss Fight Screen -------------------
-def boss_fight_screen(player, username):
-    pygame.mixer.music.stop()
-    pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "boss_music.mp3"))
-    pygame.mixer.music.play(-1)
+@scene
+def boss_fight_screen(player, username, scheduler=None):
+    audio.play("boss")
 
     # Initialize boss
     boss_hp = BOSS_HP
     boss_max_hp = BOSS_HP
     player_start_health = player.health
-    boss_idle_index = 0
-    boss_idle_timer = 0
+    character_sprites = ANIMATION_SETS.get(player.character)
+    boss_sprite = Animator(character_sprites.scaled((400, 400), "boss") if character_sprites else None, "boss")
     
     # State variables
     current_question = None
@@ -1322,13 +3941,16 @@ def boss_fight_screen(player, username):
     intro_timer = 0
     intro_duration = 3.5
     
-    # Question pool - shuffle all questions
-    available_questions = QUESTIONS.copy()
-    random.shuffle(available_questions)
+    # Question pool - the player's weakest and most overdue questions first
+    if scheduler:
+        available_questions = scheduler.review_round(BOSS_QUESTION_COUNT)
+    else:
+        available_questions = QUESTION_BANK.sample(BOSS_QUESTION_COUNT)
+    choice_order, answer = (), None
     question_index = 0
 
-    # Initialize answer_rects at the beginning of the function
-    answer_rects = []
+    # Layout of the question on screen, built once per question
+    layout = None
     
     running = True
     while running:
@@ -1341,25 +3963,28 @@ def boss_fight_screen(player, username):
             
             if stage == "question" and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 # Check if player clicked on an answer
-                mouse_pos = pygame.mouse.get_pos()
-                for i, rect in enumerate(answer_rects):
-                    if rect.collidepoint(mouse_pos):
-                        # Answer selected
-                        if i == current_question["answer"]:
-                            # Correct answer - damage boss
-                            boss_hp -= 50  # Fixed damage per correct answer
-                            stage = "result"
-                            result_timer = 0
-                            result_text = "CORRECT! Boss takes 50 damage!"
-                            result_color = SUCCESS_COLOR
-                        else:
-                            # Wrong answer - damage player
-                            player.health -= BOSS_DMG
-                            stage = "result"
-                            result_timer = 0
-                            result_text = f"WRONG! You take {BOSS_DMG} damage!"
-                            result_color = ERROR_COLOR
-                        break
+                i = layout.choice_at(pygame.mouse.get_pos()) if layout else None
+                if i is not None:
+                    # Answer selected
+                    latency = time.time() - question_start_time
+                    quiz_telemetry.log("boss", current_question["id"], choice_order[i], i == answer, latency)
+                    if scheduler:
+                        scheduler.record(current_question, i == answer, latency)
+                    sfx.play("correct" if i == answer else "wrong")
+                    if i == answer:
+                        # Correct answer - damage boss
+                        boss_hp -= 50  # Fixed damage per correct answer
+                        stage = "result"
+                        result_timer = 0
+                        result_text = "CORRECT! Boss takes 50 damage!"
+                        result_color = SUCCESS_COLOR
+                    else:
+                        # Wrong answer - damage player
+                        player.health -= BOSS_DMG
+                        stage = "result"
+                        result_timer = 0
+                        result_text = f"WRONG! You take {BOSS_DMG} damage!"
+                        result_color = ERROR_COLOR
         
         # Update timers
         if stage == "intro":
@@ -1369,8 +3994,8 @@ def boss_fight_screen(player, username):
                 # Load first question
                 if question_index < len(available_questions):
                     current_question = available_questions[question_index]
-                    # FIX: Shuffle the answer choices while preserving the correct answer
-                    current_question = shuffle_question_choices(current_question)
+                    choice_order, answer = shuffle_choices(current_question)
+                    layout = question_layout(current_question, choice_order, 160, BIG, FONT, style="panel")
                     question_start_time = time.time()
                 else:
                     # No more questions, player wins by default
@@ -1380,6 +4005,10 @@ def boss_fight_screen(player, username):
             # Check for timeout
             elapsed_time = time.time() - question_start_time
             if elapsed_time >= time_limit:
+                sfx.play("wrong")
+                quiz_telemetry.log("boss", current_question["id"], -1, False, time_limit)
+                if scheduler:
+                    scheduler.record(current_question, False, time_limit)
                 # Timeout - damage player
                 player.health -= BOSS_DMG
                 stage = "result"
@@ -1401,8 +4030,8 @@ def boss_fight_screen(player, username):
                     if question_index < len(available_questions):
                         stage = "question"
                         current_question = available_questions[question_index]
-                        # FIX: Shuffle the answer choices for the new question
-                        current_question = shuffle_question_choices(current_question)
+                        choice_order, answer = shuffle_choices(current_question)
+                        layout = question_layout(current_question, choice_order, 160, BIG, FONT, style="panel")
                         question_start_time = time.time()
                     else:
                         # No more questions, check who won
@@ -1416,36 +4045,11 @@ def boss_fight_screen(player, username):
         # Draw boss
         screen.blit(grim_image, (60, 200))
         
-# --- Draw correct GIF (boss version) ---
-        boss_idle_timer += dt
-        if boss_idle_timer >= 0.10:  
-            boss_idle_timer = 0
-
-            if player.character == "Tank":
-                boss_idle_index = (boss_idle_index + 1) % len(Tank_image_boss)
-                frame = Tank_image_boss[boss_idle_index]
-
-            elif player.character == "Assassin":
-                boss_idle_index = (boss_idle_index + 1) % len(Assasin_image_boss)
-                frame = Assasin_image_boss[boss_idle_index]
-
-            elif player.character == "Knight":
-                boss_idle_index = (boss_idle_index + 1) % len(Knight_image_boss)
-                frame = Knight_image_boss[boss_idle_index]
-
-            else:
-                frame = player_image  # fallback
-        else:
-            if player.character == "Tank":
-                frame = Tank_image_boss[boss_idle_index]
-            elif player.character == "Assassin":
-                frame = Assasin_image_boss[boss_idle_index]
-            elif player.character == "Knight":
-                frame = Knight_image_boss[boss_idle_index]
-            else:
-                frame = player_image  # fallback
-        big_frame = pygame.transform.scale(frame, (400,400))
-        screen.blit(big_frame, (WIN_W - 400, 150))
+        # --- Player's boss-fight sprite, scaled up once when the fight starts ---
+        boss_sprite.update(dt)
+        if boss_sprite.frame:
+            atlas, rect = boss_sprite.frame
+            screen.blit(atlas, (WIN_W - 400, 150), rect)
         
         # Draw boss health bar
         pygame.draw.rect(screen, (255, 0, 0), (WIN_W//2 - 200, 50, 400, 30))
@@ -1475,25 +4079,8 @@ def boss_fight_screen(player, username):
                             (50, 120, timer_width, 20))
             draw_text(screen, f"Time: {time_left:.1f}s", (WIN_W // 2, 120), color=WHITE, font=FONT, center=True)
             
-            # Draw question
-            draw_text(screen, current_question["q"], (WIN_W // 2, 180), color=WHITE, font=BIG, center=True)
-            
-            # Draw choices
-            answer_rects = []  # Reset answer_rects for this question
-            button_height = 50
-            for i, choice in enumerate(current_question["choices"]):
-                rect = pygame.Rect(WIN_W//2 - 200, 220 + i * 70, 400, button_height)
-                answer_rects.append(rect)
-                
-                # Draw button
-                color = BUTTON_COLOR
-                if rect.collidepoint(pygame.mouse.get_pos()):
-                    color = BUTTON_HOVER
-                
-                pygame.draw.rect(screen, color, rect, border_radius=5)
-                pygame.draw.rect(screen, WHITE, rect, 2, border_radius=5)
-                draw_text(screen, choice, (WIN_W//2, 220 + i * 70 + button_height//2), 
-                         color=WHITE, font=FONT, center=True)
+            # Draw question and choices
+            layout.draw(screen, pygame.mouse.get_pos())
         
         elif stage == "result":
             # Show result
@@ -1520,9 +4107,7 @@ def boss_fight_screen(player, username):
             
             # Check for click to exit
             if pygame.mouse.get_pressed()[0]:
-                pygame.mixer.music.stop()
-                pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "INGAME_SOUND.mp3"))
-                pygame.mixer.music.play(-1)
+                audio.play("game")
                 player.lives -= 1
                 if player.lives <= 0:
                     return False
@@ -1535,48 +4120,8 @@ def boss_fight_screen(player, username):
     
     return False
 
-def shuffle_question_choices(question):
-    """Shuffle choices and keep correct answer index accurate"""
-    # Copy choices and correct answer before shuffling
-    choices = question["choices"][:]  # new list, not shared
-    correct_answer_text = choices[question["answer"]]
-
-    # Shuffle safely
-    random.shuffle(choices)
-
-    # Find the new index of the correct answer
-    new_correct_index = choices.index(correct_answer_text)
-
-    # Return a clean new question dictionary
-    return {
-        "q": question["q"],
-        "choices": choices,
-        "answer": new_correct_index,
-        "difficulty": question.get("difficulty", "easy"),
-        "id": question.get("id", 0)
-    }
-"""
-# NEW FUNCTION: Shuffle question choices while preserving correct answer
-def shuffle_question_choices(question):
-    #Shuffle answer choices while keeping track of the correct answer
-    # Create a copy to avoid modifying the original
-    shuffled_question = question.copy()
-    
-    # Get the current correct answer and choices
-    correct_index = shuffled_question["answer"]
-    choices = shuffled_question["choices"]
-    correct_answer = choices[correct_index]
-    
-    # Shuffle the choices
-    random.shuffle(choices)
-    
-    # Find the new index of the correct answer
-    new_correct_index = choices.index(correct_answer)
-    shuffled_question["answer"] = new_correct_index
-    
-    return shuffled_question
-"""
 # ------------------- Door Selection Screen -------------------
+@scene
 def door_selection_screen(current_maze):
     options = []
     
@@ -1627,34 +4172,23 @@ def door_selection_screen(current_maze):
 
 # ------------------- Quiz Screen -------------------
 # ------------------- Quiz Screen -------------------
-def quiz_screen(question_data, player):
+@scene
+def quiz_screen(question_data, player, scheduler=None):
     start_time = time.time()
     time_left = QUIZ_TIME_LIMIT
     
-    # FIX: Shuffle the question choices while preserving correct answer
-    question_data = shuffle_question_choices(question_data)
+    # Shuffle the choices as an index permutation; answer is the correct choice's position
+    order, answer = shuffle_choices(question_data)
     
     # Knight ability: remove 2 wrong choices (after shuffling)
-    if player.character == "Knight" and len(question_data["choices"]) > 2:
-        correct_index = question_data["answer"]
-        wrong_indices = [i for i in range(len(question_data["choices"])) if i != correct_index]
-        if len(wrong_indices) >= 2:
-            # Keep only the correct answer and one wrong answer
-            indices_to_remove = random.sample(wrong_indices, 2)
-            # Remove the wrong choices (in reverse order to avoid index issues)
-            indices_to_remove.sort(reverse=True)
-            for idx in indices_to_remove:
-                question_data["choices"].pop(idx)
-                # Adjust the correct answer index if necessary
-                if idx < correct_index:
-                    correct_index -= 1
-            question_data["answer"] = correct_index
-    
-    choice_buttons = []
-    button_height = 50
-    for i, choice in enumerate(question_data["choices"]):
-        rect = pygame.Rect(WIN_W//2 - 200, 200 + i * 70, 400, button_height)
-        choice_buttons.append(Button(rect, choice, font=custom_font_login, text_color=WHITE))
+    if player.character == "Knight" and len(order) > 2:
+        wrong_positions = [i for i in range(len(order)) if i != answer]
+        if len(wrong_positions) >= 2:
+            removed = random.sample(wrong_positions, 2)
+            order = tuple(choice for i, choice in enumerate(order) if i not in removed)
+            answer = order.index(question_data["answer"])
+    
+    layout = question_layout(question_data, order, 160, BIG, custom_font_login)
     
     back_btn = Button((50, 50, 150, 40), "BACK", font=custom_font_login, color=ERROR_COLOR, text_color=WHITE)
     
@@ -1675,16 +4209,21 @@ def quiz_screen(question_data, player):
             if back_btn.handle_event(event):
                 return False, None
             
-            for i, btn in enumerate(choice_buttons):
-                if btn.handle_event(event) and selected_answer is None:
+            if event.type == pygame.MOUSEBUTTONDOWN and selected_answer is None:
+                i = layout.choice_at(event.pos)
+                if i is not None:
                     selected_answer = i
-                    if i == question_data["answer"]:
+                    latency = time.time() - start_time
+                    quiz_telemetry.log("quiz", question_data["id"], order[i], i == answer, latency)
+                    if scheduler:
+                        scheduler.record(question_data, i == answer, latency)
+                    sfx.play("correct" if i == answer else "wrong")
+                    if i == answer:
                         result_msg = "Correct!"
                         result_color = SUCCESS_COLOR
                     else:
                         result_msg = f"Wrong! Correct: {question_data['choices'][question_data['answer']]}"
                         result_color = ERROR_COLOR
-                    break
         
         if selected_answer is not None:
             time_left = 0
@@ -1698,12 +4237,8 @@ def quiz_screen(question_data, player):
                         (50, 120, timer_width, 20))
         draw_text(screen, f"Time: {time_left:.1f}s", (WIN_W // 2, 129), color=WHITE, font=FONT, center=True)
         
-        # Draw question
-        draw_text(screen, question_data["q"], (WIN_W // 2, 180),color=WHITE, font=BIG, center=True)
-        
-        # Draw choices
-        for btn in choice_buttons:
-            btn.draw(screen)
+        # Draw question and choices
+        layout.draw(screen, pygame.mouse.get_pos())
         
         # Draw result
         if result_msg:
@@ -1713,8 +4248,15 @@ def quiz_screen(question_data, player):
         draw_cursor(screen)
         pygame.display.flip()
     
+    if selected_answer is None:
+        # Ran out of time
+        sfx.play("wrong")
+        quiz_telemetry.log("quiz", question_data["id"], -1, False, QUIZ_TIME_LIMIT)
+        if scheduler:
+            scheduler.record(question_data, False, QUIZ_TIME_LIMIT)
+    
     # Determine rewards
-    if selected_answer == question_data["answer"]:
+    if selected_answer is not None and selected_answer == answer:
         if question_data["difficulty"] == "easy":
             rewards = QUIZ_EASY_ITEMS
         elif question_data["difficulty"] == "average":
@@ -1744,6 +4286,7 @@ def quiz_screen(question_data, player):
     return False, None
 
 # ------------------- Game Over Screen -------------------
+@scene
 def game_over_screen(player, username):
     buyback_btn = Button((WIN_W//2 - 190, 450, 390, 60), f"BUYBACK ({BUYBACK_COST} PTS)", font=custom_font_login, text_color=WHITE)
     retry_btn = Button((WIN_W//2 - 300, 400, 160, 50), "RETRY", font=custom_font_login, text_color=WHITE)
@@ -1787,15 +4330,105 @@ def game_over_screen(player, username):
         menu_btn.draw(screen)
         draw_cursor(screen)
         pygame.display.flip()
+        clock.tick(60)
     
     return "menu"
 
+# ------------------- Frame Profiler -------------------
+PROFILER_HISTORY = 240  # Frames in the frame-time graph
+PROFILER_REFRESH = 0.25  # Seconds between updates of the numbers (averaged over that window)
+PROFILER_GRAPH_MS = 50  # Frame time at the top of the graph
+
+class FrameProfiler:
+    """F3 overlay: FPS, a frame-time graph and where each frame's time went.
+
+    The game loop calls frame() once per frame and mark(scope) after each part; the
+    time since the previous mark is charged to that scope. While the overlay is hidden
+    both return after one attribute check.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.history = array("f", [0.0]) * PROFILER_HISTORY  # Frame times in ms, a ring
+        self.head = 0
+        self.totals = {}  # scope -> ns since the last refresh, in the order scopes first ran
+        self.frames = 0
+        self.worst = 0.0
+        self.last = 0
+        self.frame_start = 0
+        self.panel = None
+        self.next_refresh = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.totals.clear()
+        self.frames = 0
+        self.worst = 0.0
+        self.panel = None
+
+    def frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        ms = (now - self.frame_start) / 1e6
+        self.history[self.head] = ms
+        self.head = (self.head + 1) % PROFILER_HISTORY
+        self.worst = max(self.worst, ms)
+        self.frames += 1
+        self.frame_start = self.last = now
+
+    def mark(self, scope):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.totals[scope] = self.totals.get(scope, 0) + now - self.last
+        self.last = now
+
+    def _refresh(self):
+        frames = max(1, self.frames)
+        panel = pygame.Surface((300, 30 + 16 * len(self.totals)), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        panel.blit(SMALL.render(f"FPS {clock.get_fps():.1f}   worst frame {self.worst:.1f} ms", True, WHITE), (8, 6))
+        for i, (scope, ns) in enumerate(self.totals.items()):
+            ms = ns / frames / 1e6
+            color = ERROR_COLOR if ms > 4 and "idle" not in scope else WHITE
+            value = SMALL.render(f"{ms:.2f} ms", True, color)
+            panel.blit(SMALL.render(scope, True, color), (8, 26 + 16 * i))
+            panel.blit(value, (292 - value.get_width(), 26 + 16 * i))
+            self.totals[scope] = 0
+        self.panel = panel
+        self.frames = 0
+        self.worst = 0.0
+
+    def draw(self, surf):
+        """Draw the overlay; its own cost shows up as the 'profiler' scope"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.panel is None or now >= self.next_refresh:
+            self._refresh()
+            self.next_refresh = now + PROFILER_REFRESH
+        x = WIN_W - 310
+        surf.blit(self.panel, (x, 10))
+        graph = pygame.Rect(x, 14 + self.panel.get_height(), 300, 70)
+        pygame.draw.rect(surf, (0, 0, 0), graph)
+        scale = graph.h / PROFILER_GRAPH_MS
+        budget_y = graph.bottom - int(1000 / 60 * scale)
+        pygame.draw.line(surf, (0, 160, 0), (graph.x, budget_y), (graph.right - 1, budget_y))
+        step = graph.w / PROFILER_HISTORY
+        points = [(graph.x + i * step, graph.bottom - 1 - min(graph.h - 1, self.history[(self.head + i) % PROFILER_HISTORY] * scale))
+                  for i in range(PROFILER_HISTORY)]
+        pygame.draw.lines(surf, (255, 210, 0), False, points)
+        self.mark("profiler")
+
+profiler = FrameProfiler()
+
 # ------------------- Main Game Loop -------------------
 # ------------------- Main Game Loop -------------------
+@scene
 def game_screen(username):
-    pygame.mixer.music.load(os.path.join(BASE_DIR, "resources", "sounds", "INGAME_SOUND.mp3"))
-    apply_volume_settings()
-    pygame.mixer.music.play(-1)
+    audio.play("game")  # No-op on maze transitions, where it is already playing
+    audio.preload("boss", "victory")
 
     user_data = users_data['users'][username]
     character = user_data['character']
@@ -1817,7 +4450,9 @@ def game_screen(username):
     
     current_maze = user_data.get('current_maze', 1)
     maze_seeds = user_data.get('maze_seeds', {})
-    completed_quizzes = user_data.get('completed_quizzes', [])
+    tracker = CompletionTracker.from_profile(user_data, QUESTION_BANK)
+    scheduler = QuestionScheduler(QUESTION_BANK, tracker, user_data).start()
+    quiz_telemetry.begin_session(username, character, current_maze)
     in_boss_fight = user_data.get('in_boss_fight', False)
     
     # Generate or load maze
@@ -1825,13 +4460,7 @@ def game_screen(username):
         maze_seeds[current_maze] = random.randint(1, 1000000)
     
     maze = GameMaze(maze_seeds[current_maze])
-    
-    # Create quiz position mapping
-    quiz_positions = {}
-    for r in range(ROWS):
-        for c in range(COLS):
-            if maze.grid[r][c] == 2:
-                quiz_positions[(c, r)] = f"maze{current_maze}_quiz_{c}_{r}"
+    camera = maze_camera(maze)
     
     # Place player at start if not continuing from saved position
     if user_data.get('x') is not None and user_data.get('y') is not None:
@@ -1875,12 +4504,11 @@ def game_screen(username):
     # Game state
     paused = False
     current_quiz = None
-    quiz_completed = completed_quizzes.copy()
     current_quiz_position = None
     
     # If continuing in boss fight, go directly to boss
     if in_boss_fight:
-        victory = boss_fight_screen(player, username)
+        victory = boss_fight_screen(player, username, scheduler)
         if victory:
             victory_video_screen()
             credits_screen(username)
@@ -1893,7 +4521,8 @@ def game_screen(username):
                 "lives": MAX_LIVES,
                 "points": player.points,
                 "materials": {"wood": 0, "rope": 0, "metal": 0, "sail": 0},
-                "completed_quizzes": [],
+                "quiz_progress": {},
+                "question_stats": scheduler.to_profile(),
                 "enemies_state": [],
                 "in_boss_fight": False
             })
@@ -1904,7 +4533,9 @@ def game_screen(username):
     
     running = True
     while running:
+        profiler.frame()
         dt = clock.tick(60) / 1000.0
+        profiler.mark("clock.tick (idle)")
         game_time += dt
         
         # Handle events
@@ -1920,7 +4551,8 @@ def game_screen(username):
                     "kills": player.kills,
                     "current_maze": current_maze,
                     "maze_seeds": maze_seeds,
-                    "completed_quizzes": quiz_completed,
+                    "quiz_progress": tracker.to_profile(),
+                    "question_stats": scheduler.to_profile(),
                     "enemies_state": [{"x": e.x, "y": e.y, "hp": e.hp, "level": getattr(e, 'level', 1)} for e in enemies],
                     "in_boss_fight": in_boss_fight
                 })
@@ -1931,27 +4563,28 @@ def game_screen(username):
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     paused = not paused
+                elif event.key == pygame.K_F3:
+                    profiler.toggle()
                 elif event.key == pygame.K_e and not paused and not player.is_respawning:
                     player_col, player_row = screen_to_tile(player.x, player.y)
                     
                     # Check for quiz interaction
-                    if (player_col, player_row) in quiz_positions:
-                        quiz_id = quiz_positions[(player_col, player_row)]
-                        
+                    if (player_col, player_row) in maze.quiz_tiles:
                         # Check if quiz already completed
-                        if quiz_id in quiz_completed:
+                        if tracker.has_tile(current_maze, player_col, player_row):
                             hud.add("Quiz already completed!", color=ERROR_COLOR)
                         else:
-                            # Get available questions (not completed)
-                            available_questions = [q for q in QUESTIONS if q["id"] not in quiz_completed]
-                            if available_questions:
-                                current_quiz = random.choice(available_questions)
+                            # Pick a question the player has not answered yet
+                            question = scheduler.next_fresh()
+                            if question:
+                                current_quiz = question
                                 current_quiz_position = (player_col, player_row)
                             else:
                                 hud.add("No more quizzes available!", color=INFO_COLOR)
                     
                     # Check for door interaction
                     if (player_col, player_row) in maze.door_tiles:
+                        sfx.play("door")
                         door_choice = door_selection_screen(current_maze)
                         if door_choice:
                             if door_choice == "shipyard":
@@ -1959,7 +4592,7 @@ def game_screen(username):
                                 if can_build:
                                     hud.add("Entering shipyard... Prepare for BOSS FIGHT!", color=(255, 215, 0))
                                     in_boss_fight = True
-                                    victory = boss_fight_screen(player, username)
+                                    victory = boss_fight_screen(player, username, scheduler)
                                     if victory:
                                         victory_video_screen()
                                         credits_screen(username)
@@ -1972,7 +4605,8 @@ def game_screen(username):
                                             "lives": MAX_LIVES,
                                             "points": player.points,
                                             "materials": {"wood": 0, "rope": 0, "metal": 0, "sail": 0},
-                                            "completed_quizzes": [],
+                                            "quiz_progress": {},
+                                            "question_stats": scheduler.to_profile(),
                                             "enemies_state": [],
                                             "in_boss_fight": False
                                         })
@@ -2011,7 +4645,8 @@ def game_screen(username):
                                         "kills": player.kills,    # Keep kill count
                                         "current_maze": new_maze,  # Update to new maze
                                         "maze_seeds": maze_seeds,
-                                        "completed_quizzes": quiz_completed,  # Keep completed quizzes
+                                        "quiz_progress": tracker.to_profile(),  # Keep completed quizzes
+                                        "question_stats": scheduler.to_profile(),
                                         "enemies_state": [],  # Reset enemies for new maze
                                         "in_boss_fight": False
                                     })
@@ -2027,6 +4662,7 @@ def game_screen(username):
                 if current_time - player.last_attack_time >= 1.0:
                     player.last_attack_time = current_time
                     player.is_attacking = True
+                    sfx.play("swing")
 
                     # Attack all enemies in range
                     for enemy in enemies[:]:
@@ -2038,29 +4674,31 @@ def game_screen(username):
                             if player.character == "Assassin" and random.random() < CHARACTERS['Assassin']['crit_chance']:
                                 damage = enemy.hp
                                 hud.add("CRITICAL HIT!", color=(255, 215, 0))
+                                sfx.play("crit")
+                            else:
+                                sfx.play("hit")
                             
                             enemy.hp -= damage
                             
                             if enemy.hp <= 0:
+                                sfx.play("enemy_death")
                                 enemies.remove(enemy)
                                 player.kills += 1
                                 player.points += 50 + (getattr(enemy, 'level', 1) * 5)
                                 player.health = min(player.max_health, player.health + 10)
                                 hud.add(f"Enemy defeated! +{50 + (getattr(enemy, 'level', 1) * 5)} points", color=SUCCESS_COLOR)
         
+        profiler.mark("events")
         if paused or current_quiz or player.is_respawning:
             if current_quiz:
-                success, quiz_id = quiz_screen(current_quiz, player)
+                success, quiz_id = quiz_screen(current_quiz, player, scheduler)
                 
                 # Mark the quiz as completed regardless of success
                 if current_quiz_position:
-                    position_id = quiz_positions[current_quiz_position]
-                    if position_id not in quiz_completed:
-                        quiz_completed.append(position_id)
+                    tracker.mark_tile(current_maze, current_quiz_position[0], current_quiz_position[1], COLS)
                 
                 # Also mark the question ID as completed
-                if current_quiz["id"] not in quiz_completed:
-                    quiz_completed.append(current_quiz["id"])
+                tracker.mark_question(current_quiz["id"])
                 
                 current_quiz = None
                 current_quiz_position = None
@@ -2074,9 +4712,11 @@ def game_screen(username):
                     hud.add("Respawned!", color=SUCCESS_COLOR)
             
             screen.blit(maze_bg, (0, 0))
-            draw_maze(maze, quiz_positions, quiz_completed)
-            draw_enemies(enemies)
-            draw_player(player)
+            camera.follow(player.x, player.y)
+            draw_maze(maze, tracker, current_maze, camera)
+            draw_enemies(enemies, camera)
+            draw_player(player, camera)
+            render_queue.flush(screen)
             draw_hud(player, current_maze)
             
             if paused:
@@ -2087,7 +4727,10 @@ def game_screen(username):
                 draw_text(screen, "Press ESC to continue", (WIN_W // 2, WIN_H // 2 + 60), color=WHITE, font=BIG, center=True)
                 
             draw_cursor(screen)
+            profiler.mark("draw (paused)")
+            profiler.draw(screen)
             pygame.display.flip()
+            profiler.mark("display.flip")
             continue
         
         # Handle player movement
@@ -2117,6 +4760,7 @@ def game_screen(username):
         if not maze.is_blocked(new_col, new_row):
             player.x = new_x
             player.y = new_y
+        animate_player(player, dt)
         
         # Character abilities
         now = time.time()
@@ -2142,6 +4786,7 @@ def game_screen(username):
                 enemy_spawn_interval = max(ENEMY_SPAWN_INTERVAL_MIN, 
                                          ENEMY_SPAWN_INTERVAL - (game_time / 60))
         
+        profiler.mark("simulation")
         # Update enemies
         for enemy in enemies[:]:
             dx = player.x - enemy.x
@@ -2150,6 +4795,7 @@ def game_screen(username):
             
             enemy.x += (dx / dist) * enemy.speed * dt
             enemy.y += (dy / dist) * enemy.speed * dt
+            enemy.animator.update(dt)
             
             enemy_rect = pygame.Rect(enemy.x - 20, enemy.y - 20, 40, 40)
             player_rect = pygame.Rect(player.x - PLAYER_RADIUS, player.y - PLAYER_RADIUS, 
@@ -2160,15 +4806,17 @@ def game_screen(username):
             if enemy_rect.colliderect(player_rect) and current_time - enemy.last_attack_time >= 1.0:
                 enemy.last_attack_time = current_time
                 player.health -= enemy.dmg
+                sfx.play("player_hurt")
                 hud.add(f"Enemy hit you for {enemy.dmg} damage!", color=ERROR_COLOR)
         
+        profiler.mark("enemy update")
         # Check if player died
         if player.health <= 0:
             player.lives -= 1
             player.death_position = (player.x, player.y)
             
             if player.lives <= 0:
-                pygame.mixer.music.stop() #player dead end music
+                audio.stop() #player dead end music
                 result = game_over_screen(player, username)
                 if result == "continue":
                     pass
@@ -2182,7 +4830,8 @@ def game_screen(username):
                         "lives": player.lives,
                         "points": player.points,
                         "materials": player.materials,
-                        "completed_quizzes": [],
+                        "quiz_progress": {},
+                        "question_stats": scheduler.to_profile(),
                         "enemies_state": [],
                         "in_boss_fight": False
                     })
@@ -2195,17 +4844,27 @@ def game_screen(username):
             player.respawn_timer = RESPAWN_TIMER
             hud.add(f"Respawning in {RESPAWN_TIMER} seconds...", color=ERROR_COLOR)
         
+        profiler.mark("simulation")
         # Draw everything
         screen.blit(maze_bg, (0, 0))
-        draw_maze(maze, quiz_positions, quiz_completed)
-        draw_enemies(enemies)
-        draw_player(player)
+        camera.follow(player.x, player.y)
+        draw_maze(maze, tracker, current_maze, camera)
+        profiler.mark("draw_maze")
+        draw_enemies(enemies, camera)
+        profiler.mark("draw_enemies")
+        draw_player(player, camera)
+        profiler.mark("draw_player")
+        render_queue.flush(screen)
+        profiler.mark("render_queue.flush")
         draw_hud(player, current_maze)
         hud.update()
         hud.draw(screen)
         
         draw_cursor(screen)
+        profiler.mark("draw_hud")
+        profiler.draw(screen)
         pygame.display.flip()
+        profiler.mark("display.flip")
     
     # Save game state when exiting
     users_data['users'][username].update({
@@ -2218,180 +4877,165 @@ def game_screen(username):
         "kills": player.kills,
         "current_maze": current_maze,
         "maze_seeds": maze_seeds,
-        "completed_quizzes": quiz_completed,
+        "quiz_progress": tracker.to_profile(),
+        "question_stats": scheduler.to_profile(),
         "enemies_state": [{"x": e.x, "y": e.y, "hp": e.hp, "level": getattr(e, 'level', 1)} for e in enemies],
         "in_boss_fight": in_boss_fight
     })
     save_users()
 
-def draw_maze(maze, quiz_positions, quiz_completed):
-    for r in range(ROWS):
-        for c in range(COLS):
+# ------------------- Camera -------------------
+class Camera:
+    """The part of the world that is on screen. A maze that fits keeps the camera at
+    (0, 0), the fixed layout; along a side that does not fit it follows the player,
+    stopping at the maze edges."""
+    def __init__(self, world_rect, view_size=(WIN_W, WIN_H)):
+        self.world = pygame.Rect(world_rect) if world_rect else None  # None: unbounded, always centered
+        self.w, self.h = view_size
+        self.x = self.y = 0
+
+    @staticmethod
+    def _axis(center, start, length, view):
+        if length <= view:
+            return 0 if 0 <= start and start + length <= view else start - (view - length) // 2
+        return min(max(center - view // 2, start), start + length - view)
+
+    def follow(self, x, y):
+        if self.world is None:
+            self.x, self.y = int(x) - self.w // 2, int(y) - self.h // 2
+            return
+        self.x = self._axis(int(x), self.world.x, self.world.w, self.w)
+        self.y = self._axis(int(y), self.world.y, self.world.h, self.h)
+
+    @property
+    def view(self):
+        return pygame.Rect(self.x, self.y, self.w, self.h)
+
+def maze_camera(maze):
+    return Camera((*tile_to_screen(0, 0), maze.cols * TILE, maze.rows * TILE))
+
+def render_tiles(grid, rows, cols):
+    """The wall and path tiles of grid[rows][cols] on one surface"""
+    surf = pygame.Surface((len(cols) * TILE, len(rows) * TILE), pygame.SRCALPHA).convert_alpha()  # Unused grid values stay see-through
+    for y, r in enumerate(rows):
+        row = grid[r]
+        for x, c in enumerate(cols):
+            tile = row[c]
+            img = wall_img if tile == 1 else path_img if tile in (0, 2, 3) else None
+            if img:
+                surf.blit(img, (x * TILE, y * TILE))
+    return memory_monitor.track("maze chunks", [surf])[0]
+
+def maze_chunk(maze, cx, cy):
+    """The tiles of one chunk, rendered the first time it is on screen"""
+    surf = maze.chunks.get((cx, cy))
+    if surf is None:
+        surf = maze.chunks[(cx, cy)] = render_tiles(maze.grid, range(cy * CHUNK_TILES, min(maze.rows, (cy + 1) * CHUNK_TILES)),
+                                                    range(cx * CHUNK_TILES, min(maze.cols, (cx + 1) * CHUNK_TILES)))
+    return surf
+
+def visible_chunks(maze, camera):
+    ox, oy = tile_to_screen(0, 0)
+    span = CHUNK_TILES * TILE
+    view = camera.view.inflate(0, 2 * TILE)  # Labels stick out above their tile
+    first_cx, last_cx = max(0, (view.left - ox) // span), min((maze.cols - 1) // CHUNK_TILES, (view.right - 1 - ox) // span)
+    first_cy, last_cy = max(0, (view.top - oy) // span), min((maze.rows - 1) // CHUNK_TILES, (view.bottom - 1 - oy) // span)
+    for cy in range(first_cy, last_cy + 1):
+        for cx in range(first_cx, last_cx + 1):
+            yield cx, cy, ox + cx * span - camera.x, oy + cy * span - camera.y
+
+# ------------------- Render Queue -------------------
+# Draw order of the game world, bottom to top
+LAYER_TILES = 0
+LAYER_TILE_ITEMS = 1
+LAYER_LABELS = 2
+LAYER_ENEMIES = 3
+LAYER_HEALTH_BARS = 4
+LAYER_PLAYER = 5
+
+ENEMY_BAR_SIZE = (40, 6)
+
+class RenderQueue:
+    """Blits collected over a frame, then drawn in one Surface.blits call sorted by
+    layer and source surface (the sort is stable, so a layer keeps its queue order)"""
+    def __init__(self):
+        self.items = []
+
+    def add(self, layer, source, dest, area=None):
+        self.items.append((layer, id(source), source, dest, area))
+
+    def flush(self, surf):
+        self.items.sort(key=lambda item: (item[0], item[1]))
+        surf.blits([item[2:] for item in self.items], doreturn=False)
+        self.items.clear()
+
+render_queue = RenderQueue()
+
+def health_bar_frames(size, back=(255, 0, 0), fill=(0, 255, 0)):
+    """One bar per filled pixel width, so drawing a bar is a single blit"""
+    w, h = size
+    bars = []
+    for filled in range(w + 1):
+        bar = pygame.Surface(size).convert()
+        bar.fill(back)
+        bar.fill(fill, (0, 0, filled, h))
+        bars.append(bar)
+    return bars
+
+ENEMY_BARS = health_bar_frames(ENEMY_BAR_SIZE)
+
+# Maze decorations built once instead of every frame
+completed_quiz_block = question_block.copy()
+completed_quiz_block.fill((100, 100, 100, 180), special_flags=pygame.BLEND_RGBA_MULT)
+TILE_LABELS = {
+    "quiz": SMALL.render("Quiz", True, WHITE),
+    "completed": SMALL.render("Completed", True, (150, 150, 150)),
+    "door": SMALL.render("Door", True, WHITE)
+}
+
+def draw_maze(maze, tracker, maze_id, camera, queue=render_queue):
+    """Only the chunks that overlap the screen, plus the quizzes and doors in them"""
+    for cx, cy, x, y in visible_chunks(maze, camera):
+        queue.add(LAYER_TILES, maze_chunk(maze, cx, cy), (x, y))
+        for c, r, tile in maze.chunk_items.get((cx, cy), ()):
             x, y = tile_to_screen(c, r)
-            if maze.grid[r][c] == 1:
-                screen.blit(wall_img, (x, y))
-            elif maze.grid[r][c] == 0:
-                screen.blit(path_img, (x, y))
-            elif maze.grid[r][c] == 2:
-                screen.blit(path_img, (x, y))
-                
-                # Check if this quiz is completed
-                quiz_id = quiz_positions.get((c, r))
-                if quiz_id and quiz_id in quiz_completed:
-                    # Draw completed quiz (grayed out)
-                    completed_block = question_block.copy()
-                    completed_block.fill((100, 100, 100, 180), special_flags=pygame.BLEND_RGBA_MULT)
-                    screen.blit(completed_block, (x, y))
-                    draw_text(screen, "Completed", (x + 5, y - 15), color=(150, 150, 150), font=SMALL)
+            x -= camera.x
+            y -= camera.y
+            if tile == 2:
+                # Completed quizzes are grayed out
+                if tracker.has_tile(maze_id, c, r):
+                    queue.add(LAYER_TILE_ITEMS, completed_quiz_block, (x, y))
+                    queue.add(LAYER_LABELS, TILE_LABELS["completed"], (x + 5, y - 15))
                 else:
-                    # Draw active quiz
-                    screen.blit(question_block, (x, y))
-                    draw_text(screen, "Quiz", (x + 5, y - 15), color=WHITE, font=SMALL)
-            
-            elif maze.grid[r][c] == 3:
-                screen.blit(path_img, (x, y))
-                screen.blit(door_block, (x, y))
-                draw_text(screen, "Door", (x, y - 15), color=WHITE, font=SMALL)
-def draw_enemies(enemies):
-    for enemy in enemies:
-        frame_index = int(pygame.time.get_ticks() / 100) % len(frames)
-        screen.blit(frames[frame_index], (enemy.x - 30, enemy.y - 30))
-        
-        bar_width = 40
-        bar_height = 6
-        health_ratio = enemy.hp / enemy.max_hp
-        pygame.draw.rect(screen, (255, 0, 0), 
-                        (enemy.x - bar_width//2, enemy.y - 40, bar_width, bar_height))
-        pygame.draw.rect(screen, (0, 255, 0), 
-                        (enemy.x - bar_width//2, enemy.y - 40, bar_width * health_ratio, bar_height))
-
-def draw_player(player):
-    if not player.is_respawning:
-
-        # ------------------------- TANK---------------------------
-        if player.character == "Tank":
-
-            # ---- TANK ATTACK ----
-            if getattr(player, "is_attacking", False):
-                global tank_attack_frame_index, tank_attack_frame_timer
-                tank_attack_frame_timer += 0.016
-
-                if tank_attack_frame_timer >= 0.30:
-                    # advance linearly so attack plays once
-                    tank_attack_frame_index += 1
-                    tank_attack_frame_timer = 0
-
-                    # if reached last frame, stop attacking and reset
-                    if tank_attack_frame_index >= len(Tank_image_attack):
-                        player.is_attacking = False
-                        tank_attack_frame_index = 0
-
-                # draw current attack frame
-                if Tank_image_attack:
-                    screen.blit(Tank_image_attack[tank_attack_frame_index], (player.x - 25, player.y - 25))
-                return
-
-            # ---- TANK WALK ----
-            if player.is_moving:
-                global tank_walk_frame_index, tank_walk_frame_timer
-                tank_walk_frame_timer += 0.016
-                if tank_walk_frame_timer >= 0.09:
-                    tank_walk_frame_index = (tank_walk_frame_index + 1) % len(Tank_image_run)
-                    tank_walk_frame_timer = 0
-                screen.blit(Tank_image_run[tank_walk_frame_index], (player.x - 25, player.y - 25))
-
-            # ---- TANK IDLE ----
+                    queue.add(LAYER_TILE_ITEMS, question_block, (x, y))
+                    queue.add(LAYER_LABELS, TILE_LABELS["quiz"], (x + 5, y - 15))
             else:
-                global tank_frame_index, tank_frame_timer
-                tank_frame_timer += 0.016
-                if tank_frame_timer >= 0.1:
-                    tank_frame_index = (tank_frame_index + 1) % len(Tank_image)
-                    tank_frame_timer = 0
-                screen.blit(Tank_image[tank_frame_index], (player.x - 25, player.y - 25))
-
-        # ----------------------- ASSASSIN ---------------------------
-        elif player.character == "Assassin":
-
-            # ---- ASSASSIN ATTACK ----
-            if getattr(player, "is_attacking", False):
-                global assassin_attack_frame_index, assassin_attack_frame_timer
-                assassin_attack_frame_timer += 0.016
-
-                if assassin_attack_frame_timer >= 0.05:
-                    assassin_attack_frame_index += 1
-                    assassin_attack_frame_timer = 0
-
-                    if assassin_attack_frame_index >= len(Assasin_image_attack):
-                        player.is_attacking = False
-                        assassin_attack_frame_index = 0
-
-                if Assasin_image_attack:
-                    screen.blit(Assasin_image_attack[assassin_attack_frame_index], (player.x - 25, player.y - 25))
-                return
-
-            # ---- ASSASSIN WALK ----
-            if player.is_moving:
-                global assassin_walk_frame_index, assassin_walk_frame_timer
-                assassin_walk_frame_timer += 0.016
-                if assassin_walk_frame_timer >= 0.07:
-                    assassin_walk_frame_index = (assassin_walk_frame_index + 1) % len(Assasin_image_run)
-                    assassin_walk_frame_timer = 0
-                screen.blit(Assasin_image_run[assassin_walk_frame_index], (player.x - 25, player.y - 25))
-
-            # ---- ASSASSIN IDLE ----
-            else:
-                global assassin_frame_index, assassin_frame_timer
-                assassin_frame_timer += 0.016
-                if assassin_frame_timer >= 0.08:
-                    assassin_frame_index = (assassin_frame_index + 1) % len(Assasin_image)
-                    assassin_frame_timer = 0
-                screen.blit(Assasin_image[assassin_frame_index], (player.x - 25, player.y - 25))
-
-        #---------------KNIGHT----------------
-        elif player.character == "Knight":
-
-            # ---- KNIGHT ATTACK ----
-            if getattr(player, "is_attacking", False):
-                global knight_attack_frame_index, knight_attack_frame_timer
-                knight_attack_frame_timer += 0.016
-
-                if knight_attack_frame_timer >= 0.06:
-                    knight_attack_frame_index += 1
-                    knight_attack_frame_timer = 0
-
-                    if knight_attack_frame_index >= len(Knight_image_attack):
-                        player.is_attacking = False
-                        knight_attack_frame_index = 0
-
-                if Knight_image_attack:
-                    screen.blit(Knight_image_attack[knight_attack_frame_index], (player.x - 25, player.y - 25))
-                return
+                queue.add(LAYER_TILE_ITEMS, door_block, (x, y))
+                queue.add(LAYER_LABELS, TILE_LABELS["door"], (x, y - 15))
 
-            # ---- KNIGHT WALK ----
-            if player.is_moving:
-                global knight_walk_frame_index, knight_walk_frame_timer
-                knight_walk_frame_timer += 0.016
-                if knight_walk_frame_timer >= 0.10:
-                    knight_walk_frame_index = (knight_walk_frame_index + 1) % len(Knight_image_run)
-                    knight_walk_frame_timer = 0
-                screen.blit(Knight_image_run[knight_walk_frame_index], (player.x - 25, player.y - 25))
-
-            # ---- KNIGHT IDLE ----
-            else:
-                global knight_frame_index, knight_frame_timer
-                knight_frame_timer += 0.016
-                if knight_frame_timer >= 0.12:
-                    knight_frame_index = (knight_frame_index + 1) % len(Knight_image)
-                    knight_frame_timer = 0
-                screen.blit(Knight_image[knight_frame_index], (player.x - 25, player.y - 25))
-
-        # --------------------- DEFAULT (fallback) ---------------------
-        else:
-            return
+def draw_enemies(enemies, camera, queue=render_queue):
+    bar_width, bar_height = ENEMY_BAR_SIZE
+    view = camera.view.inflate(80, 100)  # Sprite and health bar reach past the enemy's position
+    for enemy in enemies:
+        if not view.collidepoint(enemy.x, enemy.y):
+            continue
+        x, y = enemy.x - camera.x, enemy.y - camera.y
+        atlas, rect = enemy.animator.frame
+        queue.add(LAYER_ENEMIES, atlas, (x - 30, y - 30), rect)
+        filled = int(bar_width * max(0, min(1, enemy.hp / enemy.max_hp)))
+        queue.add(LAYER_HEALTH_BARS, ENEMY_BARS[filled], (x - bar_width // 2, y - 40))
+
+def draw_player(player, camera, queue=render_queue):
+    x, y = player.x - camera.x, player.y - camera.y
+    if not player.is_respawning:
+        frame = player.animator.frame
+        if frame:
+            atlas, rect = frame
+            queue.add(LAYER_PLAYER, atlas, (x - 25, y - 25), rect)
 
     if player.is_respawning:
-        draw_text(screen, f"Respawning: {player.respawn_timer:.1f}s",
-              (player.x - 50, player.y - 60), color=ERROR_COLOR, font=FONT)
+        queue.add(LAYER_PLAYER, FONT.render(f"Respawning: {player.respawn_timer:.1f}s", True, ERROR_COLOR),
+                  (x - 50, y - 60))
 
 def draw_hud(player, maze_id):
     draw_text(screen, f"Points: {player.points}", (20, 20), color=WHITE)
@@ -2416,8 +5060,433 @@ def draw_hud(player, maze_id):
     text_rect = text_surface.get_rect(center=(WIN_W // 2, WIN_H - 30))
     screen.blit(text_surface, text_rect)
 
+# ------------------- Expedition Mode -------------------
+EXPEDITION_CHUNK = 16  # Tiles per side of a generated chunk; rooms sit on the odd local cells
+EXPEDITION_EDGE_OPENINGS = 2  # Passages through each border a chunk shares with a neighbour
+EXPEDITION_QUIZ_CHANCE = 0.6
+EXPEDITION_DOOR_CHANCE = 0.15
+EXPEDITION_PREFETCH = 2  # Chunks generated ahead in the direction of travel
+EXPEDITION_CACHE_CHUNKS = 24  # Chunks kept in memory (each holds a pre-rendered 640x640 surface)
+
+def _chunk_seed(seed, *key):
+    # Not hash(): it has to give the same chunks in every run
+    return zlib.crc32(repr((seed,) + key).encode("ascii"))
+
+def generate_expedition_chunk(seed, cx, cy):
+    """Tiles of one chunk (same values as generate_maze). Each chunk owns its west and
+    north border; the cells next to every border are rooms, so an opening there always
+    joins two mazes and the whole world stays connected."""
+    n = EXPEDITION_CHUNK
+    rng = random.Random(_chunk_seed(seed, cx, cy))
+    grid = [[1] * n for _ in range(n)]
+    x, y = rng.randrange(1, n, 2), rng.randrange(1, n, 2)
+    grid[y][x] = 0
+    stack = [(x, y)]
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 < x + dx < n and 0 < y + dy < n and grid[y + dy][x + dx] == 1]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        grid[y + dy // 2][x + dx // 2] = 0
+        grid[y + dy][x + dx] = 0
+        stack.append((x + dx, y + dy))
+    for y in rng.sample(range(1, n, 2), EXPEDITION_EDGE_OPENINGS):
+        grid[y][0] = 0
+    for x in rng.sample(range(1, n, 2), EXPEDITION_EDGE_OPENINGS):
+        grid[0][x] = 0
+    # The starting chunk stays empty so the player never spawns on a quiz or door
+    if (cx, cy) != (0, 0):
+        rooms = [(x, y) for y in range(1, n, 2) for x in range(1, n, 2)]
+        rng.shuffle(rooms)
+        if rng.random() < EXPEDITION_QUIZ_CHANCE:
+            x, y = rooms.pop()
+            grid[y][x] = 2
+        if rng.random() < EXPEDITION_DOOR_CHANCE:
+            x, y = rooms.pop()
+            grid[y][x] = 3
+    return grid
+
+class ExpeditionChunk:
+    def __init__(self, key, grid):
+        self.key = key
+        self.grid = grid
+        self.surface = None
+        n = EXPEDITION_CHUNK
+        self.items = [(key[0] * n + x, key[1] * n + y, tile) for y, row in enumerate(grid) for x, tile in enumerate(row) if tile in (2, 3)]
+
+class ExpeditionWorld:
+    """An unbounded maze made of seeded chunks. Chunks around and ahead of the player
+    are generated on a worker thread and rendered one per frame before they come into
+    view; past EXPEDITION_CACHE_CHUNKS the least recently used ones the player is not
+    near are dropped, and come back identical if the player returns.
+    World tile (col, row) is at (col * TILE, row * TILE)."""
+    def __init__(self, seed, done=()):
+        self.seed = seed
+        self.done = set(done)  # World tiles of answered quizzes
+        self.chunks = OrderedDict()  # key -> ExpeditionChunk, least recently used first
+        self.pending = set()
+        self.jobs = queue.Queue()
+        self.ready = queue.Queue()
+        self.thread = None
+
+    def _run(self):
+        while True:
+            key = self.jobs.get()
+            if key is None:
+                return
+            self.ready.put((key, generate_expedition_chunk(self.seed, *key)))
+
+    def close(self):
+        """Stop the worker so the world and its chunk surfaces can be freed"""
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread = None
+
+    def request(self, key):
+        if key in self.chunks or key in self.pending:
+            return
+        self.pending.add(key)
+        self.jobs.put(key)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="expedition", daemon=True)
+            self.thread.start()
+
+    def chunk(self, key):
+        """The chunk at key, generated right here if the worker has not got to it yet.
+        Only for the tiles the player touches; drawing uses drawable() and never waits."""
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = ExpeditionChunk(key, generate_expedition_chunk(self.seed, *key))
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def drawable(self, key):
+        """The chunk at key if it is generated and rendered, else None"""
+        chunk = self.chunks.get(key)
+        return chunk if chunk is not None and chunk.surface is not None else None
+
+    def surface(self, chunk):
+        if chunk.surface is None:
+            chunk.surface = render_tiles(chunk.grid, range(EXPEDITION_CHUNK), range(EXPEDITION_CHUNK))
+        return chunk.surface
+
+    def tile(self, col, row):
+        cx, x = divmod(col, EXPEDITION_CHUNK)
+        cy, y = divmod(row, EXPEDITION_CHUNK)
+        return self.chunk((cx, cy)).grid[y][x]
+
+    def is_blocked(self, col, row):
+        return self.tile(col, row) == 1
+
+    def update(self, x, y, move_x, move_y):
+        """Once a frame: collect finished chunks, queue the ones the player is heading for,
+        render at most one (nearest first) so frame times stay flat, and evict"""
+        while not self.ready.empty():
+            key, grid = self.ready.get()
+            self.pending.discard(key)
+            if key not in self.chunks:
+                self.chunks[key] = ExpeditionChunk(key, grid)
+                self.chunks.move_to_end(key, last=False)  # Not used yet
+        span = EXPEDITION_CHUNK * TILE
+        pcx, pcy = int(x // span), int(y // span)
+        sx = (move_x > 0) - (move_x < 0)
+        sy = (move_y > 0) - (move_y < 0)
+        # The 3x3 block around the player covers the screen; the same block further along
+        # the direction of travel is what comes into view next. The player's own chunk
+        # comes first so it is the first one rendered.
+        wanted = []
+        for step in range(EXPEDITION_PREFETCH + 1):
+            for dy in (0, -1, 1):
+                for dx in (0, -1, 1):
+                    key = (pcx + sx * step + dx, pcy + sy * step + dy)
+                    if key not in wanted:
+                        wanted.append(key)
+        for key in wanted:
+            self.request(key)
+        for key in wanted:
+            chunk = self.chunks.get(key)
+            if chunk and chunk.surface is None:
+                self.surface(chunk)
+                break
+        if len(self.chunks) > EXPEDITION_CACHE_CHUNKS:
+            keep = set(wanted)
+            unused = [key for key in self.chunks if key not in keep]
+            for key in unused[:len(self.chunks) - EXPEDITION_CACHE_CHUNKS]:
+                del self.chunks[key]
+
+def draw_expedition(world, camera, queue=render_queue):
+    span = EXPEDITION_CHUNK * TILE
+    view = camera.view.inflate(0, 2 * TILE)  # Labels stick out above their tile
+    for cy in range(view.top // span, (view.bottom - 1) // span + 1):
+        for cx in range(view.left // span, (view.right - 1) // span + 1):
+            chunk = world.drawable((cx, cy))
+            if chunk is None:
+                continue  # Still on its way; the background shows for a frame or two
+            queue.add(LAYER_TILES, chunk.surface, (cx * span - camera.x, cy * span - camera.y))
+            for c, r, tile in chunk.items:
+                x, y = c * TILE - camera.x, r * TILE - camera.y
+                if tile == 2:
+                    if (c, r) in world.done:
+                        queue.add(LAYER_TILE_ITEMS, completed_quiz_block, (x, y))
+                        queue.add(LAYER_LABELS, TILE_LABELS["completed"], (x + 5, y - 15))
+                    else:
+                        queue.add(LAYER_TILE_ITEMS, question_block, (x, y))
+                        queue.add(LAYER_LABELS, TILE_LABELS["quiz"], (x + 5, y - 15))
+                else:
+                    queue.add(LAYER_TILE_ITEMS, door_block, (x, y))
+                    queue.add(LAYER_LABELS, TILE_LABELS["door"], (x, y - 15))
+
+@scene
+def expedition_screen(username):
+    """Explore an endless maze answering quizzes; a door leads back to camp"""
+    audio.play("game")
+    user_data = users_data['users'][username]
+    player = Player(user_data['character'])
+    player.points = user_data.get('points', player.points)
+    player.materials = user_data.get('materials', player.materials).copy()
+    state = user_data.get('expedition') or {}
+    world = ExpeditionWorld(state.get('seed') or random.randint(1, 1000000), map(tuple, state.get('done', [])))
+    player.x = state.get('x', 1.5 * TILE)
+    player.y = state.get('y', 1.5 * TILE)
+    best = state.get('best', 0)
+    camera = Camera(None)
+    tracker = CompletionTracker.from_profile(user_data, QUESTION_BANK)
+    scheduler = QuestionScheduler(QUESTION_BANK, tracker, user_data).start()
+    quiz_telemetry.begin_session(username, player.character, 0)
+    hud.add("Expedition: find quizzes, a door takes you back to camp", color=INFO_COLOR)
+
+    try:
+        running = True
+        while running:
+            profiler.frame()
+            dt = clock.tick(60) / 1000.0
+            profiler.mark("clock.tick (idle)")
+            col, row = int(player.x // TILE), int(player.y // TILE)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
+                    elif event.key == pygame.K_e:
+                        tile = world.tile(col, row)
+                        if tile == 2:
+                            if (col, row) in world.done:
+                                hud.add("Quiz already completed!", color=ERROR_COLOR)
+                            else:
+                                question = scheduler.next_fresh()
+                                if question:
+                                    quiz_screen(question, player, scheduler)
+                                    tracker.mark_question(question["id"])
+                                    world.done.add((col, row))
+                                else:
+                                    hud.add("No more quizzes available!", color=INFO_COLOR)
+                        elif tile == 3:
+                            sfx.play("door")
+                            running = False
+
+            profiler.mark("events")
+            keys = pygame.key.get_pressed()
+            move_x = keys[pygame.K_d] - keys[pygame.K_a]
+            move_y = keys[pygame.K_s] - keys[pygame.K_w]
+            player.is_moving = bool(move_x or move_y)
+            step = player.speed * dt * (0.7071 if move_x and move_y else 1)
+            new_x, new_y = player.x + move_x * step, player.y + move_y * step
+            if not world.is_blocked(int(new_x // TILE), int(new_y // TILE)):
+                player.x, player.y = new_x, new_y
+            animate_player(player, dt)
+            profiler.mark("simulation")
+            world.update(player.x, player.y, move_x, move_y)
+            best = max(best, abs(col - 1) + abs(row - 1))
+            profiler.mark("chunk streaming")
+
+            screen.blit(maze_bg, (0, 0))
+            camera.follow(player.x, player.y)
+            draw_expedition(world, camera)
+            profiler.mark("draw_expedition")
+            draw_player(player, camera)
+            profiler.mark("draw_player")
+            render_queue.flush(screen)
+            profiler.mark("render_queue.flush")
+            draw_text(screen, f"Points: {player.points}", (20, 20), color=WHITE)
+            draw_text(screen, f"Distance: {abs(col - 1) + abs(row - 1)} (best {best})", (20, 45), color=WHITE)
+            draw_text(screen, "WASD: Move | E: Interact | ESC: Back to menu", (WIN_W // 2, WIN_H - 30), color=INFO_COLOR, font=SMALL, center=True)
+            hud.update()
+            hud.draw(screen)
+            draw_cursor(screen)
+            profiler.mark("draw_hud")
+            profiler.draw(screen)
+            pygame.display.flip()
+            profiler.mark("display.flip")
+    finally:
+        world.close()
+
+    user_data.update({
+        "points": player.points,
+        "materials": player.materials,
+        "quiz_progress": tracker.to_profile(),
+        "question_stats": scheduler.to_profile(),
+        "expedition": {"seed": world.seed, "x": player.x, "y": player.y, "best": best,
+                       "done": sorted(world.done)}
+    })
+    save_users()
+
+# ------------------- Classroom Account Tools -------------------
+ACCOUNT_EXPORT_FIELDS = ["username", "character", "points", "high_score", "total_items", "wins", "kills",
+                         "current_maze", "created", "last_login"]
+
+def import_accounts(rows, reset=False, quick=False, progress=None):
+    """Create/update accounts from CSV rows; everything lands in one save_users() call.
+    progress(done, total) is called as passwords finish hashing."""
+    creates, updates, problems = {}, {}, []
+    for line, row in enumerate(rows, start=2):
+        username = (row.get("username") or "").strip()
+        password = row.get("password") or ""
+        character = (row.get("character") or "").strip().capitalize() or None
+        if not username:
+            problems.append(f"line {line}: missing username")
+        elif character and character not in CHARACTERS:
+            problems.append(f"line {line}: unknown character {character!r}")
+        elif username in creates or username in updates:
+            problems.append(f"line {line}: {username} appears twice")
+        elif username in users_data['users']:
+            updates[username] = (password, character)
+        elif not password:
+            problems.append(f"line {line}: new account {username} needs a password")
+        else:
+            creates[username] = (password, character)
+
+    # Full work factor unless asked otherwise, so accounts that never log in are as strong
+    # as the rest. Key derivation releases the GIL, so the hashes are computed in parallel.
+    kdf, params = ("pbkdf2_sha256", str(PROVISION_PBKDF2_ITERATIONS)) if quick else (None, None)
+    to_hash = [(u, p) for u, (p, c) in list(creates.items()) + list(updates.items()) if p]
+    hashes = {}
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        results = pool.map(lambda item: hash_password(item[1], kdf, params), to_hash)
+        for done, ((username, password), stored) in enumerate(zip(to_hash, results), start=1):
+            hashes[username] = stored
+            if progress:
+                progress(done, len(to_hash))
+
+    for username, (password, character) in creates.items():
+        users_data['users'][username] = new_user_record(hashes[username], character)
+    for username, (password, character) in updates.items():
+        record = users_data['users'][username]
+        if password:
+            record['password_hash'] = hashes[username]
+            record.pop('password', None)
+        if reset and (character or record.get('character')):
+            reset_progress(record, character or record['character'])
+        elif character:
+            record['character'] = character
+    if creates or updates:
+        try:
+            save_users()
+        except UsernameTaken as err:
+            for username in err.usernames:
+                del creates[username]
+                problems.append(f"{username}: created by another game meanwhile")
+    return len(creates), len(updates), problems
+
+def stale_accounts(inactive_days, now=None):
+    cutoff = (now or time.time()) - inactive_days * 86400
+    return [username for username, record in users_data['users'].items()
+            if max(record.get('created') or 0, record.get('last_login') or 0) < cutoff]
+
+def accounts_command(args):
+    refresh_users()
+    started = time.perf_counter()
+    if args.action == "import":
+        def report(done, total):
+            if done % 20 == 0 or done == total:
+                left = (time.perf_counter() - started) / done * (total - done)
+                print(f"\rHashed {done}/{total} passwords, about {left:.0f}s left ", end="\n" if done == total else "", flush=True)
+
+        with open(args.csv, newline="", encoding="utf-8-sig") as f:
+            created, updated, problems = import_accounts(csv.DictReader(f), args.reset_progress, args.quick_hash, report)
+        for problem in problems:
+            print(f"Skipped {problem}")
+        print(f"Created {created}, updated {updated}, skipped {len(problems)} in {time.perf_counter() - started:.2f}s")
+        if args.quick_hash:
+            print("Passwords were hashed at the quick provisioning factor; each is upgraded at its account's first login")
+            return 1 if problems else 0
+        # Only a login or a re-import can upgrade these: the passwords themselves are not stored
+        weak = sorted(username for username, record in users_data['users'].items()
+                      if (record.get('password_hash') or record.get('password')) and hash_outdated(record.get('password_hash')))
+        if weak:
+            print(f"{len(weak)} accounts have a password hash below the current work factor "
+                  f"(upgraded at their next login, or re-import their passwords now): {', '.join(weak)}")
+        return 1 if problems else 0
+
+    if args.action == "export":
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, ACCOUNT_EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for username, record in sorted(users_data['users'].items()):
+                writer.writerow(dict(record, username=username))
+        print(f"Exported {len(users_data['users'])} accounts to {args.csv}")
+        return 0
+
+    stale = stale_accounts(args.inactive_days)
+    if args.dry_run:
+        for username in stale:
+            print(username)
+        print(f"{len(stale)} accounts inactive for {args.inactive_days:g} days")
+        return 0
+    if stale and not args.delete:
+        # Archive first: a crash in between leaves a duplicate, never a lost account
+        archive = load_json_or_default(args.archive, DEFAULT_USERS)
+        for username in stale:
+            archive['users'][username] = dict(users_data['users'][username], archived=time.time())
+        atomic_write(args.archive, archive)
+    for username in stale:
+        del users_data['users'][username]
+    if stale:
+        save_users()
+    print(f"{'Deleted' if args.delete else 'Archived'} {len(stale)} accounts in {time.perf_counter() - started:.2f}s")
+    return 0
+
+# ------------------- Test Scenes -------------------
+def remove_scene_test_user():
+    if users_data['users'].pop(SCENE_TEST_USER, None) is not None:
+        save_users()
+
+def run_test_scene(name, character="Knight"):
+    """Start scene name straight away with a fresh test account, for profiling a hot path"""
+    refresh_users()
+    users_data['users'][SCENE_TEST_USER] = new_user_record(None, character)  # No password: nobody can log in to it
+    atexit.register(remove_scene_test_user)
+    if name == "game_screen":
+        game_screen(SCENE_TEST_USER)
+    else:
+        boss_fight_screen(Player(character), SCENE_TEST_USER)
+    return 0
+
 # ------------------- Main Application Loop -------------------
+COMMANDS = {
+    "convert-save": convert_save_command,
+    "accounts": accounts_command,
+    "question-db": question_db_command,
+    "question-pack": question_pack_command,
+    "build-assets": build_assets_command,
+    "asset-manifest": asset_manifest_command,
+    "quiz-report": quiz_report_command,
+    "compare-frames": compare_frames_command,
+}
+
 def main():
+    if ARGS.command:
+        sys.exit(COMMANDS[ARGS.command](ARGS))
+    if ARGS.scene:
+        sys.exit(run_test_scene(ARGS.scene))
+
     while True:
         username = login_register_screen()
         if not username:
@@ -2429,6 +5498,8 @@ def main():
                 break
             elif result == "start_game":
                 game_screen(username)
+            elif result == "expedition":
+                expedition_screen(username)
 
 if __name__ == "__main__":
     main()
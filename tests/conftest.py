@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_question(qid, difficulty="easy", **fields):
+    question = {"id": qid, "subject": "math", "difficulty": difficulty, "q": f"Question {qid}?",
+                "choices": ["1", "2", "3", "4"], "answer": 0, "hint": ""}
+    question.update(fields)
+    return question
+
+
+@pytest.fixture
+def write_bank(tmp_path):
+    """Write question dicts to a JSON bank in tmp_path and load it like the game does"""
+    import ProVenture
+
+    def write(questions, name="questions.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps(questions), encoding="utf-8")
+        return ProVenture.load_question_bank(str(path))
+    return write
+
+
+@pytest.fixture
+def isolated_users(tmp_path, monkeypatch):
+    """Point the game's account store at an empty users.json in tmp_path"""
+    import ProVenture
+
+    store = ProVenture.JsonUserStore(str(tmp_path / "users.json"))
+    monkeypatch.setattr(ProVenture, "user_store", store)
+    monkeypatch.setattr(ProVenture, "users_data", store.load())
+    return store
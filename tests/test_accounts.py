@@ -0,0 +1,30 @@
+import ProVenture as pv
+
+
+def test_import_creates_updates_and_reports_progress(isolated_users, monkeypatch):
+    monkeypatch.setattr(pv, "PBKDF2_ITERATIONS", 2000)
+    pv.users_data["users"]["ana"] = pv.new_user_record(None, "Tank")
+    pv.users_data["users"]["ana"]["password"] = "old"
+    rows = [{"username": "ana", "password": "new-pass", "character": ""},
+            {"username": "ben", "password": "b3n", "character": "knight"},
+            {"username": "cy", "password": "", "character": ""},
+            {"username": "ben", "password": "again", "character": ""}]
+    calls = []
+    created, updated, problems = pv.import_accounts(rows, progress=lambda done, total: calls.append((done, total)))
+
+    assert (created, updated) == (1, 1) and len(problems) == 2
+    assert calls == [(1, 2), (2, 2)]
+    saved = isolated_users.load()["users"]
+    assert "password" not in saved["ana"] and pv.verify_password("new-pass", saved["ana"]["password_hash"]) == (True, False)
+    assert saved["ben"]["character"] == "Knight"
+
+
+def test_quick_hash_is_upgraded_at_first_login(isolated_users, monkeypatch):
+    monkeypatch.setattr(pv, "PBKDF2_ITERATIONS", 2000)
+    monkeypatch.setattr(pv, "PROVISION_PBKDF2_ITERATIONS", 100)
+    pv.import_accounts([{"username": "ben", "password": "b3n", "character": ""}], quick=True)
+
+    stored = isolated_users.load()["users"]["ben"]["password_hash"]
+    assert stored.split("$")[1] == "100" and pv.hash_outdated(stored)
+    ok, upgraded = pv.check_credentials("b3n", stored, None)
+    assert ok and upgraded.split("$")[1] == "2000"
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+import ProVenture as pv
+
+
+def sample_save():
+    return {"users": {
+        "ana": {"points": 120, "quiz_progress": {"seen": ["e1", "m4", "h2"],
+                                                 "tiles": {"1": [30, "AAEC"], "3": [30, "gA=="]}},
+                "enemies_state": [{"x": 10, "y": 4.5, "hp": 30, "level": 2}], "materials": {"wood": 1}},
+        "ben": {"points": 100, "quiz_progress": {}, "enemies_state": []},
+        "cy": {"points": 90, "completed_quizzes": ["maze1_quiz_2_3", "e7"]},
+        "dee": {"quiz_progress": {"bank": "0badf00d", "questions": "Bw==", "tiles": {}}},
+    }}
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma"])
+def test_json_binary_json_round_trip(tmp_path, compression):
+    data = sample_save()
+    source, binary, back = tmp_path / "users.json", tmp_path / "users.pvs", tmp_path / "back.json"
+    pv.atomic_write(str(source), data)
+    pv.atomic_write(str(binary), pv.read_save_file(str(source)), compression)
+    pv.atomic_write(str(back), pv.read_save_file(str(binary)))
+    assert pv.canonical_save(pv.read_save_file(str(back))) == pv.canonical_save(data)
+    assert pv.read_save_file(str(binary))["users"]["ana"]["quiz_progress"] == data["users"]["ana"]["quiz_progress"]
+
+
+def test_quiz_progress_is_packed():
+    data = sample_save()
+    body = pv.encode_binary_save(data, "none")
+    assert b'"seen"' not in body and b"AAEC" not in body
+    # Anything not shaped like to_profile output stays in the JSON part untouched
+    assert b'"bank":"0badf00d"' in body
+    assert pv.decode_binary_save(body) == json.loads(json.dumps(data))
@@ -0,0 +1,42 @@
+import base64
+
+import ProVenture as pv
+from conftest import make_question
+
+
+def test_progress_survives_bank_edits(write_bank):
+    bank = write_bank([make_question(f"q{i}") for i in range(20)])
+    tracker = pv.CompletionTracker(bank)
+    for qid in ("q0", "q7", "q19"):
+        tracker.mark_question(qid)
+    tracker.mark_tile(3, 4, 2, pv.COLS)
+    record = {"quiz_progress": tracker.to_profile()}
+
+    # Insert at the front, drop one answered question, reverse the rest
+    edited = [make_question("new")] + [make_question(f"q{i}") for i in reversed(range(20)) if i != 7]
+    restored = pv.CompletionTracker.from_profile(record, write_bank(edited, "edited.json"))
+    assert restored.has_question("q0") and restored.has_question("q19")
+    assert not restored.has_question("new")
+    assert restored.has_tile(3, 4, 2)
+    assert restored.unseen_count() == len(edited) - 2
+
+    # A question removed and later put back is still answered
+    back = pv.CompletionTracker.from_profile({"quiz_progress": restored.to_profile()},
+                                             write_bank([make_question(f"q{i}") for i in range(20)], "back.json"))
+    assert [qid for qid in bank.ids if back.has_question(qid)] == ["q0", "q7", "q19"]
+
+
+def test_reads_legacy_ordinal_bitmap(write_bank):
+    bank = write_bank([make_question(f"q{i}") for i in range(10)])
+    bits = bytes([0b00000101])  # ordinals 0 and 2
+    legacy = {"quiz_progress": {"bank": bank.fingerprint, "questions": base64.b64encode(bits).decode(), "tiles": {}}}
+    tracker = pv.CompletionTracker.from_profile(legacy, bank)
+    assert tracker.seen_ids() == ["q0", "q2"]
+
+
+def test_reads_completed_quizzes_list(write_bank):
+    bank = write_bank([make_question(f"q{i}") for i in range(5)])
+    record = {"completed_quizzes": ["q3", "maze1_quiz_2_3"]}
+    tracker = pv.CompletionTracker.from_profile(record, bank)
+    assert tracker.has_question("q3") and tracker.has_tile(1, 2, 3)
+    assert "completed_quizzes" not in record and record["quiz_progress"]["seen"] == ["q3"]
@@ -0,0 +1,40 @@
+import pytest
+
+import ProVenture as pv
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    # Same code paths, a work factor tests can afford
+    monkeypatch.setattr(pv, "PBKDF2_ITERATIONS", 1000)
+    monkeypatch.setattr(pv, "SCRYPT_N", 2 ** 10)
+
+
+@pytest.mark.parametrize("kdf", ["pbkdf2_sha256", "scrypt"])
+def test_hash_and_verify(kdf):
+    stored = pv.hash_password("hunter2", kdf)
+    assert stored.startswith(kdf + "$") and "hunter2" not in stored
+    assert pv.hash_password("hunter2", kdf) != stored  # salted
+    assert pv.verify_password("hunter2", stored)[0]
+    assert not pv.verify_password("hunter3", stored)[0]
+
+
+def test_weaker_hash_is_upgraded_at_login(monkeypatch):
+    old = pv.hash_password("hunter2", "pbkdf2_sha256", "500")
+    assert pv.verify_password("hunter2", old) == (True, True)
+    ok, new_hash = pv.check_credentials("hunter2", old, None)
+    assert ok and new_hash.split("$")[1] == "1000"
+    assert pv.verify_password("hunter2", new_hash) == (True, False)
+    assert pv.check_credentials("wrong", old, None) == (False, None)
+
+
+def test_plaintext_account_gets_hashed():
+    ok, new_hash = pv.check_credentials("letmein", None, "letmein")
+    assert ok and pv.verify_password("letmein", new_hash) == (True, False)
+    assert pv.check_credentials("nope", None, "letmein") == (False, None)
+
+
+def test_worker_runs_off_the_calling_thread():
+    job = pv.credential_worker.submit(pv.check_credentials, "letmein", None, "letmein")
+    ok, new_hash = job.wait()
+    assert job.done() and ok and new_hash
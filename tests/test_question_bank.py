@@ -0,0 +1,56 @@
+import argparse
+import json
+import random
+
+import pytest
+
+import ProVenture as pv
+from conftest import make_question
+
+
+def test_validator_flags_bad_questions():
+    questions = [make_question("a1", answer=4),
+                 make_question("a2", choices=["Paris", " paris ", "Rome"]),
+                 make_question("a3", difficulty="impossible"),
+                 make_question("a4")]
+    errors = pv.validate_questions(questions, "bank.json")
+    assert any("(a1): answer 4 out of range" in e for e in errors)
+    assert any("(a2): duplicate choice" in e for e in errors)
+    assert any("(a3): unknown difficulty" in e for e in errors)
+    assert not any("(a4)" in e for e in errors)
+
+
+def test_pack_rejects_duplicate_ids_across_sources(tmp_path, capsys):
+    first, second = tmp_path / "one.json", tmp_path / "two.json"
+    first.write_text(json.dumps([make_question("x1"), make_question("x2")]))
+    second.write_text(json.dumps([make_question("x2")]))
+    target = tmp_path / "bank.pqp"
+    args = argparse.Namespace(sources=[str(first), str(second)], target=str(target))
+    assert pv.question_pack_command(args) == 1
+    assert "duplicate id, first seen in" in capsys.readouterr().out
+    assert not target.exists()
+
+
+def test_pack_round_trips_the_json_bank(tmp_path):
+    questions = [make_question(f"q{i}", ("easy", "average", "difficult")[i % 3], subject=("math", "art")[i % 2],
+                               choices=[f"c{i}", "é", "two words", "c"][:2 + i % 3], answer=i % 2,
+                               hint=f"hint {i}" if i % 4 else "") for i in range(40)]
+    source, target = tmp_path / "bank.json", tmp_path / "bank.pqp"
+    source.write_text(json.dumps(questions), encoding="utf-8")
+    assert pv.question_pack_command(argparse.Namespace(sources=[str(source)], target=str(target))) == 0
+
+    packed, plain = pv.load_question_bank(str(target)), pv.load_question_bank(str(source))
+    assert sorted(packed.ids) == sorted(plain.ids)  # The pack may group questions differently
+    for qid in plain.ids:
+        assert packed.get(qid) == plain.get(qid)
+
+
+@pytest.mark.parametrize("choices", [["Yes", "Yes", "No", "No"], ["same"] * 3, [str(n % 2) for n in range(pv.MAX_CHOICES + 2)]])
+def test_shuffle_tracks_the_answer_by_position(choices):
+    rng = random.Random(7)
+    for answer in range(len(choices)):
+        question = {"choices": choices, "answer": answer}
+        for _ in range(50):
+            order, position = pv.shuffle_choices(question, rng)
+            assert sorted(order) == list(range(len(choices)))
+            assert order[position] == answer
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+import ProVenture as pv
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(monkeypatch):
+    monkeypatch.setattr(pv, "_last_backup", {})
+    monkeypatch.setattr(pv, "SAVE_FSYNC", "none")
+
+
+def test_hand_edited_save_loads_with_a_warning(tmp_path, capsys):
+    path = str(tmp_path / "users.json")
+    pv.atomic_write(path, {"users": {"ana": {"points": 100}}})
+    with open(path) as f:
+        data = json.load(f)
+    data["users"]["ana"]["points"] = 500  # teacher fixes a score, keeps the old _checksum
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+    assert pv.load_json_or_default(path, pv.DEFAULT_USERS) == {"users": {"ana": {"points": 500}}}
+    assert "does not match its checksum" in capsys.readouterr().err
+    assert not any(name.startswith("users.json.corrupt") for name in os.listdir(tmp_path))
+
+
+def test_unreadable_save_is_recovered_from_backup(tmp_path, capsys):
+    path = str(tmp_path / "users.json")
+    pv.atomic_write(path, {"users": {"ana": {"points": 100}}})
+    pv.atomic_write(path, {"users": {"ana": {"points": 200}}})
+    with open(path, "r+b") as f:
+        f.truncate(20)
+
+    assert pv.load_json_or_default(path, pv.DEFAULT_USERS) == {"users": {"ana": {"points": 100}}}
+    err = capsys.readouterr().err
+    assert "Error loading" in err and "Recovered" in err
+    assert any(name.startswith("users.json.corrupt") for name in os.listdir(tmp_path))
+
+
+def test_backups_rotate_once_per_interval(tmp_path, monkeypatch):
+    path = str(tmp_path / "users.json")
+    clock = [1000.0]
+    monkeypatch.setattr(pv.time, "monotonic", lambda: clock[0])
+    for points in range(5):
+        pv.atomic_write(path, {"users": {"ana": {"points": points}}})
+    # Only the first replacement of the session made a generation
+    assert os.path.exists(path + ".1") and not os.path.exists(path + ".2")
+    assert pv.read_save_file(path + ".1")["users"]["ana"]["points"] == 0
+
+    clock[0] += pv.SAVE_BACKUP_INTERVAL
+    pv.atomic_write(path, {"users": {"ana": {"points": 5}}})
+    assert pv.read_save_file(path + ".1")["users"]["ana"]["points"] == 4
+    assert pv.read_save_file(path + ".2")["users"]["ana"]["points"] == 0
@@ -0,0 +1,37 @@
+import random
+
+import ProVenture as pv
+from conftest import make_question
+
+
+def make_scheduler(write_bank):
+    bank = write_bank([make_question(f"{d[0]}{i}", d) for d in ("easy", "average", "difficult") for i in range(30)])
+    tracker = pv.CompletionTracker(bank)
+    return pv.QuestionScheduler(bank, tracker, {}, random.Random(1))
+
+
+def test_fresh_questions_follow_the_players_level(write_bank):
+    scheduler = make_scheduler(write_bank)
+    scheduler.start().pending.wait()
+    assert scheduler.next_fresh()["difficulty"] == "easy"
+
+    for i in range(10):
+        scheduler.record(make_question(f"e{i}", "easy"), True, 2.0)
+        scheduler.tracker.mark_question(f"e{i}")
+    assert scheduler.level == 1
+    scheduler.pending.wait()
+    assert scheduler.next_fresh()["difficulty"] == "average"
+
+
+def test_picks_do_not_wait_for_a_rebuild(write_bank, monkeypatch):
+    class Stalled:
+        def submit(self, fn, *args):
+            return pv.PendingResult()  # Never finishes
+
+    monkeypatch.setattr(pv, "scheduler_worker", Stalled())
+    scheduler = make_scheduler(write_bank).start()
+    assert len(scheduler.review_round(3)) == 3
+    assert scheduler.next_fresh() is not None
+    first = scheduler.pending
+    scheduler.record(make_question("e0", "easy"), False, 9.0)
+    assert scheduler.pending is first  # Coalesced: still one rebuild in flight
@@ -0,0 +1,61 @@
+import pytest
+
+import ProVenture as pv
+
+
+def open_pair(tmp_path):
+    path = str(tmp_path / "users.db")
+    first, second = pv.SharedUserStore(path), pv.SharedUserStore(path)
+    return first, first.load(), second, second.load()
+
+
+def test_concurrent_create_of_same_username_fails(tmp_path):
+    first, first_data, second, second_data = open_pair(tmp_path)
+    first_data["users"]["ana"] = {"password_hash": "first", "points": 100}
+    second_data["users"]["ana"] = {"password_hash": "second", "points": 100}
+    second_data["users"]["ben"] = {"password_hash": "ben", "points": 100}
+    first.save(first_data)
+
+    with pytest.raises(pv.UsernameTaken) as err:
+        second.save(second_data)
+    assert err.value.usernames == ["ana"]
+    assert second_data["users"]["ana"]["password_hash"] == "first"
+
+    users = pv.SharedUserStore(str(tmp_path / "users.db")).load()["users"]
+    assert users["ana"]["password_hash"] == "first"
+    assert users["ben"]["password_hash"] == "ben"
+
+
+def test_nested_edits_from_two_processes_merge(tmp_path):
+    first, first_data, second, second_data = open_pair(tmp_path)
+    first_data["users"]["ana"] = {"materials": {"wood": 0, "rope": 0}, "question_stats": {}, "points": 100}
+    first.save(first_data)
+    second.refresh(second_data)
+
+    first_data["users"]["ana"]["materials"]["wood"] = 3
+    first_data["users"]["ana"]["question_stats"]["q1"] = [1, 0]
+    first.save(first_data)
+    second_data["users"]["ana"]["materials"]["rope"] = 2
+    second_data["users"]["ana"]["question_stats"]["q2"] = [0, 1]
+    second_data["users"]["ana"]["points"] = 90
+    second.save(second_data)
+
+    ana = pv.SharedUserStore(str(tmp_path / "users.db")).load()["users"]["ana"]
+    assert ana["materials"] == {"wood": 3, "rope": 2}
+    assert ana["question_stats"] == {"q1": [1, 0], "q2": [0, 1]}
+    assert ana["points"] == 90
+
+
+def test_refresh_keeps_unsaved_nested_changes(tmp_path):
+    first, first_data, second, second_data = open_pair(tmp_path)
+    first_data["users"]["ana"] = {"materials": {"wood": 0, "rope": 0}}
+    first.save(first_data)
+    second.refresh(second_data)
+    ana = second_data["users"]["ana"]
+
+    first_data["users"]["ana"]["materials"]["wood"] = 5
+    first.save(first_data)
+    ana["materials"]["rope"] = 1
+    assert second.refresh(second_data)
+    assert second_data["users"]["ana"] is ana
+    assert ana["materials"] == {"wood": 5, "rope": 1}
@@ -0,0 +1,32 @@
+import ProVenture as pv
+
+
+def test_logged_answers_reach_the_report(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    telemetry = pv.QuizTelemetry(path, ["e1", "e2"], capacity=64)
+    for user, right in (("ana", True), ("ben", True), ("cy", False), ("dee", False)):
+        telemetry.session = (telemetry.intern(user), telemetry.intern("Tank"), 2)
+        for qid in ("e1", "e2", "e3"):
+            telemetry.log("quiz", qid, 0 if right else 1, right, 1.5)
+    telemetry.log("boss", "e1", -1, False, 10.0)
+    assert telemetry.flush() == 13 and telemetry.flush() == 0
+
+    events = list(pv.read_events(path))
+    assert events[0] == {"t": events[0]["t"], "user": "ana", "character": "Tank", "maze": 2, "source": "quiz",
+                         "question": "e1", "choice": 0, "correct": True, "latency_ms": 1500}
+    assert events[-1]["source"] == "boss" and events[-1]["choice"] is None
+
+    rows = {row["id"]: row for row in pv.quiz_report(events)}
+    e1 = rows["e1"]
+    assert (e1["answers"], e1["players"], e1["p_correct"]) == (5, 4, 0.4)
+    assert e1["discrimination"] > 0.8  # The strong players got it right
+    assert rows["e2"]["p_correct"] == 0.5 and rows["e2"]["mean_latency_ms"] == 1500
+
+
+def test_full_buffer_drops_instead_of_blocking(tmp_path, capsys):
+    telemetry = pv.QuizTelemetry(str(tmp_path / "events.jsonl"), capacity=4)
+    for _ in range(6):
+        telemetry.log("quiz", "e1", 0, True, 1.0)
+    assert telemetry.dropped == 2
+    assert telemetry.flush() == 4
+    assert "dropped 2 events" in capsys.readouterr().out